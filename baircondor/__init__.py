@@ -1,3 +1,27 @@
-from baircondor.api import CondorConfig, interactive, submit
+"""baircondor: HTCondor job submission helper.
 
-__all__ = ["CondorConfig", "submit", "interactive"]
+The public API is loaded on first attribute access, so ``import baircondor.cli`` (and
+therefore every ``baircondor`` CLI call) doesn't pay for pydantic, rich or asyncio.
+"""
+
+__all__ = [
+    "CondorConfig",
+    "submit",
+    "submit_many",
+    "interactive",
+    "asubmit",
+    "ainteractive",
+    "wait",
+]
+
+
+def __getattr__(name: str):
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from baircondor import api
+
+    # importing api also imports the baircondor.submit *module*, which rebinds the
+    # package attribute ``submit``; the public names below must win over submodules
+    for public in __all__:
+        globals()[public] = getattr(api, public)
+    return globals()[name]
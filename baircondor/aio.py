@@ -0,0 +1,209 @@
+"""Asyncio-native submission: the same run dirs as submit.py, without blocking the loop.
+
+Host, conda and git probes run concurrently as asyncio subprocesses, and so does
+``condor_submit`` itself, so callers can ``asyncio.gather`` many submissions at once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+import subprocess
+import sys
+import weakref
+from pathlib import Path
+
+from .config import _conda_base_from_exe, _conda_lookup, _conda_store, resolve_conda
+from .history import append_entry
+from .meta import (
+    _TRACKED_ONLY_STATUS,
+    GIT_DEFAULTS,
+    _git_commands,
+    _git_lookup,
+    _git_result,
+    _git_store,
+)
+from .submit import (
+    INTERACTIVE_COMMAND,
+    _log,
+    _log_submit_paths,
+    _new_run_dir,
+    _prepare_batch,
+    _record_submit,
+    _resolve_job,
+    _strip_command,
+    _validate_conda,
+    _write_run_files,
+)
+
+# in-flight submissions per event loop when the caller doesn't pass its own semaphore
+DEFAULT_CONCURRENCY = 32
+
+_limits: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def default_limit() -> asyncio.Semaphore:
+    """Return the running loop's shared submission semaphore (``DEFAULT_CONCURRENCY`` slots)."""
+    loop = asyncio.get_running_loop()
+    sem = _limits.get(loop)
+    if sem is None:
+        sem = _limits[loop] = asyncio.Semaphore(DEFAULT_CONCURRENCY)
+    return sem
+
+
+async def arun_submit(args) -> Path:
+    job = _resolve_job(args)
+    command = _strip_command(args.command)
+
+    submit_host, conda, git = await _probe(job, resolve_conda(job["cfg"], args, autodetect=False))
+    _validate_conda(conda)
+    conda = await asyncio.to_thread(_prepare_batch, job, conda)
+    run_dir = _new_run_dir(job, getattr(args, "tag", None))
+
+    job_sub = _write_run_files(run_dir, job, conda, "batch", command, submit_host, git=git)
+
+    cmd = ["condor_submit", str(job_sub)]
+    _log_submit_paths(job_sub, run_dir, job["repo_dir"], job["quiet"])
+    if args.dry_run:
+        _log(f"🧪 [dry-run] would run: {' '.join(cmd)}", job["quiet"])
+        return run_dir
+
+    result = await _run(cmd)
+    _record_submit(
+        result,
+        run_dir,
+        job["quiet"],
+        job["jobname"],
+        job["resources"]["gpus"],
+        command,
+        job["user"],
+        job["project"],
+        exit_on_failure=False,  # under asyncio.gather, only this task should fail
+    )
+    return run_dir
+
+
+async def arun_interactive(args) -> Path:
+    job = _resolve_job(args, default_jobname="interactive")
+
+    submit_host, conda, git = await _probe(job, resolve_conda(job["cfg"], args, autodetect=False))
+    _validate_conda(conda)
+    run_dir = _new_run_dir(job, getattr(args, "tag", None))
+
+    job_sub = _write_run_files(
+        run_dir, job, conda, "interactive", INTERACTIVE_COMMAND, submit_host, git=git
+    )
+
+    cmd = ["condor_submit", "-interactive", str(job_sub)]
+    _log(f"📂 Run dir  : {run_dir}", job["quiet"])
+    if args.dry_run:
+        _log(f"🧪 [dry-run] would run: {' '.join(cmd)}", job["quiet"])
+        return run_dir
+
+    append_entry(
+        run_dir,
+        job["jobname"],
+        None,
+        job["resources"]["gpus"],
+        INTERACTIVE_COMMAND,
+        job["user"],
+        project=job["project"],
+    )
+
+    # the interactive session owns the terminal, so don't capture its output
+    proc = await asyncio.create_subprocess_exec(*cmd)
+    if await proc.wait() != 0:
+        sys.exit(proc.returncode)
+    _log(f"✅ Interactive session ended. Run dir: {run_dir}", job["quiet"])
+    return run_dir
+
+
+# ── probes ───────────────────────────────────────────────────────────────────
+
+
+async def _probe(job: dict, conda: dict) -> tuple[str, dict, dict]:
+    """Run the host, conda base and git probes concurrently."""
+    submit_host, conda_base, git = await asyncio.gather(
+        _get_submit_host(), _conda_base(conda), _git_info(job["repo_dir"], job["git_options"])
+    )
+    if conda_base:
+        conda = {**conda, "conda_base": conda_base}
+    return submit_host, conda, git
+
+
+async def _get_submit_host() -> str:
+    try:
+        result = await _run(["hostname", "-f"])
+    except OSError:
+        result = None
+    if result is None or result.returncode != 0:
+        return socket.getfqdn().lower()
+    return result.stdout.strip().lower()
+
+
+async def _conda_base(conda: dict) -> str | None:
+    """Auto-detect the conda base only when an env is requested without one."""
+    if not conda.get("env") or conda.get("conda_base"):
+        return None
+    base, key = _conda_lookup()
+    if base is not None:
+        return base
+    try:
+        result = await _run(["conda", "info", "--base"])
+    except OSError:
+        result = None
+    if result and result.returncode == 0 and result.stdout.strip():
+        base = str(Path(result.stdout.strip()).expanduser())
+    else:
+        base = _conda_base_from_exe()
+    _conda_store(key, base)
+    return base
+
+
+async def _git_info(repo_dir: Path, options: dict | None = None) -> dict:
+    options = {**GIT_DEFAULTS, **(options or {})}
+    info, located = _git_lookup(repo_dir, options)
+    if info is not None:
+        return info
+
+    commands = _git_commands(options)
+    untracked_checked = options["untracked"]
+    try:
+        commit, branch, status = await asyncio.gather(
+            _run(commands["commit"], cwd=repo_dir),
+            _run(commands["branch"], cwd=repo_dir),
+            _run(commands["status"], cwd=repo_dir, timeout=options["status_timeout"]),
+            return_exceptions=True,
+        )
+        if isinstance(status, asyncio.TimeoutError):
+            status = await _run(_TRACKED_ONLY_STATUS, cwd=repo_dir)
+            untracked_checked = False
+    except OSError:
+        return {"is_repo": False}
+    results = {"commit": commit, "branch": branch, "status": status}
+    if any(isinstance(r, BaseException) or r.returncode != 0 for r in results.values()):
+        return {"is_repo": False}
+
+    info = _git_result({name: r.stdout.strip() for name, r in results.items()}, untracked_checked)
+    _git_store(located, options, info)
+    return info
+
+
+async def _run(
+    cmd: list[str], cwd: Path | None = None, timeout: float | None = None
+) -> subprocess.CompletedProcess:
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return subprocess.CompletedProcess(
+        cmd, proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+    )
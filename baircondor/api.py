@@ -10,16 +10,29 @@ Usage::
 
     # Or with plain kwargs
     submit(["python", "train.py"], gpus=1, dry_run=True)
+
+    # From asyncio code, many submissions at once (bounded by a semaphore)
+    await asyncio.gather(*(asubmit(["python", "train.py", "--seed", str(s)], condor=cfg)
+                           for s in range(100)))
+
+    # A whole sweep as one condor cluster (one condor_submit call)
+    run_dirs = submit_many([["python", "train.py", "--lr", lr] for lr in ("1e-4", "3e-4")])
+
+    # Block until they finish (watches each run's condor.log, no condor_q polling)
+    states = wait(run_dirs, timeout=3600)
 """
 
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
 from types import SimpleNamespace
 
 from pydantic import BaseModel, ConfigDict
 
-from baircondor.submit import run_interactive, run_submit
+from baircondor.aio import arun_interactive, arun_submit, default_limit
+from baircondor.submit import run_interactive, run_submit, run_submit_many
+from baircondor.watch import wait_for_runs
 
 
 class CondorConfig(BaseModel):
@@ -38,6 +51,11 @@ class CondorConfig(BaseModel):
     tag: str | None = None
     conda_env: str | None = None
     conda_base: str | None = None
+    output_cap: str | int | None = None
+    compress_output: bool | None = None
+    snapshot: bool | None = None
+    cache_conda_activation: bool | None = None
+    pack_conda_env: bool | None = None
     config: str | None = None
     dry_run: bool = False
 
@@ -68,6 +86,32 @@ def submit(command: list[str], condor: CondorConfig | None = None, **kwargs) ->
     return run_submit(ns)
 
 
+def submit_many(
+    commands: list[list[str]],
+    condor: CondorConfig | None = None,
+    tags: list[str] | None = None,
+    **kwargs,
+) -> list[Path]:
+    """Submit a sweep of batch jobs as a single multi-proc condor cluster.
+
+    Every command gets its own run dir and history entry, but the whole sweep is
+    rendered into one submit file and handed to a single ``condor_submit`` call.
+
+    Args:
+        commands: One command per task (e.g. ``[["python", "train.py", "--lr", "1e-4"], ...]``).
+        condor: Optional :class:`CondorConfig` instance shared by every task.
+        tags: Optional per-task run dir tags (same length as ``commands``).
+        **kwargs: Individual overrides (same names as CondorConfig fields).
+
+    Returns:
+        Paths to the created run directories, in the same order as ``commands``.
+    """
+    ns = _build_namespace(condor, kwargs)
+    ns.commands = commands
+    ns.tags = tags
+    return run_submit_many(ns)
+
+
 def interactive(condor: CondorConfig | None = None, **kwargs) -> Path:
     """Start an interactive condor session.
 
@@ -80,3 +124,69 @@ def interactive(condor: CondorConfig | None = None, **kwargs) -> Path:
     """
     ns = _build_namespace(condor, kwargs)
     return run_interactive(ns)
+
+
+async def asubmit(
+    command: list[str],
+    condor: CondorConfig | None = None,
+    *,
+    limit: asyncio.Semaphore | None = None,
+    **kwargs,
+) -> Path:
+    """Async :func:`submit`: probes and ``condor_submit`` run without blocking the event loop.
+
+    Args:
+        command: The command to run (e.g. ``["python", "train.py"]``).
+        condor: Optional :class:`CondorConfig` instance.
+        limit: Semaphore bounding concurrent submissions. Defaults to a per-event-loop
+            semaphore with ``baircondor.aio.DEFAULT_CONCURRENCY`` slots.
+        **kwargs: Individual overrides (same names as CondorConfig fields).
+
+    Returns:
+        Path to the created run directory.
+
+    Raises:
+        subprocess.CalledProcessError: ``condor_submit`` failed (its output is in
+            ``stdout``/``stderr``). Unlike :func:`submit`, this does not exit, so
+            other submissions gathered alongside it are unaffected.
+    """
+    ns = _build_namespace(condor, kwargs)
+    ns.command = command
+    async with limit or default_limit():
+        return await arun_submit(ns)
+
+
+async def ainteractive(
+    condor: CondorConfig | None = None,
+    *,
+    limit: asyncio.Semaphore | None = None,
+    **kwargs,
+) -> Path:
+    """Async :func:`interactive`.
+
+    Args:
+        condor: Optional :class:`CondorConfig` instance.
+        limit: Semaphore bounding concurrent submissions (see :func:`asubmit`).
+        **kwargs: Individual overrides (same names as CondorConfig fields).
+
+    Returns:
+        Path to the created run directory.
+    """
+    ns = _build_namespace(condor, kwargs)
+    async with limit or default_limit():
+        return await arun_interactive(ns)
+
+
+def wait(run_dirs: list[str | Path], timeout: float | None = None) -> dict[Path, dict]:
+    """Block until every run finishes, or ``timeout`` seconds pass.
+
+    Args:
+        run_dirs: Run directories, e.g. as returned by :func:`submit` / :func:`submit_many`.
+        timeout: Seconds to wait at most; None waits indefinitely.
+
+    Returns:
+        Each run's state: ``{"status": ..., "exit_code": ..., ...}``. ``status`` is one of
+        ``done``/``failed``/``removed`` for finished runs; runs still going at the timeout
+        keep their current status (``idle``, ``running``, ``held``, or ``?``).
+    """
+    return wait_for_runs(run_dirs, timeout=timeout)
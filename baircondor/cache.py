@@ -0,0 +1,33 @@
+"""Small JSON caches under ~/.cache/baircondor (git info, conda base, ...).
+
+Caches are best-effort: a missing, corrupt or unwritable cache file behaves like a miss.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "baircondor"
+
+
+def load(name: str) -> dict | None:
+    try:
+        with open(CACHE_DIR / name) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def store(name: str, data: dict) -> None:
+    """Atomically replace the cache file ``name`` (a path relative to CACHE_DIR)."""
+    path = CACHE_DIR / name
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
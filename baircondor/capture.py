@@ -0,0 +1,192 @@
+"""Size-capped capture of a job's stdout/stderr (the opt-in ``output.cap`` mode).
+
+A copy of this file is staged into each run dir and run by run.sh with the execute
+node's ``python3``, so it must stay standalone: stdlib only, and nothing newer than
+Python 3.6 (no ``from __future__ import annotations``, no walrus).
+
+Each stream is written to ``<run_dir>/stdout.txt`` (``stderr.txt``) as usual until the
+file holds ``head`` bytes. That first part is then moved to ``stdout.head.txt`` and kept
+for good, and the live file is rotated every ``chunk`` bytes into ``stdout.txt.1``,
+``stdout.txt.2``, ... (gzipped with ``--compress``). The oldest rotated chunks are
+deleted so that head, rotated chunks and the live file together stay under ``cap``; a
+gap in the numbering shows where output was dropped. The live file keeps its usual name
+so ``baircondor tail`` and ``tail -f`` keep working.
+"""
+
+import argparse
+import gzip
+import os
+import selectors
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+READ_SIZE = 64 * 1024
+# after the command exits, stop waiting for background processes that kept its pipes
+DRAIN_GRACE = 5.0
+FORWARDED_SIGNALS = ("SIGTERM", "SIGINT", "SIGHUP", "SIGQUIT", "SIGUSR1", "SIGUSR2")
+
+
+class CappedWriter:
+    """Append-only writer for one stream that keeps the first and last bytes under a cap."""
+
+    def __init__(self, path, cap, head, compress=False):
+        self.path = path
+        self.cap = cap
+        self.head = min(head, cap // 2)
+        # the tail budget holds the live file plus about three rotated chunks
+        self.chunk = max((cap - self.head) // 4, 1)
+        self.compress = compress
+        self.in_head = self.head > 0
+        self.live = 0  # bytes in the live file
+        self.rotated = []  # (path, size) of kept chunks, oldest first
+        self.seq = 0
+        self.dropped = 0
+        self._compressors = {}  # rotated path -> thread gzipping it
+        self._clear_previous()
+        self._fd = self._open()
+
+    def write(self, data):
+        while data:
+            limit = self.head if self.in_head else self.chunk
+            room = limit - self.live
+            if len(data) <= room:
+                self._write(data)
+                return
+            # fill up to the limit, preferring to break after a newline
+            cut = data.rfind(b"\n", 0, room) + 1 or room
+            self._write(data[:cut])
+            data = data[cut:]
+            self._rotate()
+
+    def close(self):
+        os.close(self._fd)
+        for t in self._compressors.values():
+            t.join()
+
+    def _clear_previous(self):
+        """Remove the head and chunks of an earlier execution (e.g. before an eviction)."""
+        directory, name = os.path.split(self.path)
+        for entry in os.listdir(directory or "."):
+            rest = entry[len(name) + 1 :] if entry.startswith(name + ".") else ""
+            if entry == os.path.basename(_head_path(self.path)) or rest.split(".")[0].isdigit():
+                os.unlink(os.path.join(directory, entry))
+
+    def _open(self):
+        return os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND | os.O_TRUNC, 0o666)
+
+    def _write(self, data):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view) :]
+        self.live += len(data)
+
+    def _rotate(self):
+        os.close(self._fd)
+        if self.in_head:
+            os.rename(self.path, _head_path(self.path))
+            self.in_head = False
+        else:
+            self.seq += 1
+            rotated = "%s.%d" % (self.path, self.seq)
+            os.rename(self.path, rotated)
+            self.rotated.append((rotated, self.live))
+            if self.compress:
+                t = threading.Thread(target=_gzip, args=(rotated,))
+                t.start()
+                self._compressors[rotated] = t
+            self._prune()
+        self.live = 0
+        self._fd = self._open()
+
+    def _prune(self):
+        budget = self.cap - self.head - self.chunk  # leave room for a full live file
+        while self.rotated and sum(size for _, size in self.rotated) > budget:
+            path, size = self.rotated.pop(0)
+            t = self._compressors.pop(path, None)
+            if t is not None:
+                t.join()  # it may still be compressing
+            for candidate in (path, path + ".gz"):
+                try:
+                    os.unlink(candidate)
+                except FileNotFoundError:
+                    pass
+            self.dropped += size
+
+
+def _head_path(path):
+    base, ext = os.path.splitext(path)
+    return base + ".head" + ext
+
+
+def _gzip(path):
+    with open(path, "rb") as src, gzip.open(path + ".gz.tmp", "wb", compresslevel=1) as dst:
+        shutil.copyfileobj(src, dst, READ_SIZE)
+    os.rename(path + ".gz.tmp", path + ".gz")
+    os.unlink(path)
+
+
+def run(command, run_dir, cap, head, compress=False):
+    """Run ``command`` with its stdout/stderr captured into ``run_dir``; return its exit code."""
+    writers = {
+        name: CappedWriter(os.path.join(run_dir, name + ".txt"), cap, head, compress)
+        for name in ("stdout", "stderr")
+    }
+    child = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def forward(signum, frame):
+        try:
+            child.send_signal(signum)
+        except OSError:
+            pass
+
+    for name in FORWARDED_SIGNALS:
+        signal.signal(getattr(signal, name), forward)
+
+    sel = selectors.DefaultSelector()
+    sel.register(child.stdout, selectors.EVENT_READ, writers["stdout"])
+    sel.register(child.stderr, selectors.EVENT_READ, writers["stderr"])
+    deadline = None
+    while sel.get_map():
+        ready = sel.select(timeout=1.0)
+        for key, _ in ready:
+            data = os.read(key.fd, READ_SIZE)
+            if data:
+                key.data.write(data)
+            else:
+                sel.unregister(key.fileobj)
+        if deadline is None and child.poll() is not None:
+            deadline = time.monotonic() + DRAIN_GRACE
+        if deadline is not None and not ready and time.monotonic() > deadline:
+            break
+    returncode = child.wait()
+
+    for name, writer in writers.items():
+        writer.close()
+        if writer.dropped:
+            sys.stderr.write(
+                "baircondor capture: %s exceeded the %d-byte cap; dropped %d bytes after %s\n"
+                % (name, cap, writer.dropped, os.path.basename(_head_path(writer.path)))
+            )
+    return returncode if returncode >= 0 else 128 - returncode
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dir", required=True, help="Run dir to write stdout/stderr into.")
+    parser.add_argument("--cap", type=int, required=True, help="Max bytes kept per stream.")
+    parser.add_argument("--head", type=int, default=0, help="Leading bytes always kept.")
+    parser.add_argument("--compress", action="store_true", help="Gzip rotated chunks.")
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if not command:
+        parser.error("a command is required after --")
+    sys.exit(run(command, args.dir, args.cap, args.head, args.compress))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,24 @@
-"""baircondor CLI entrypoint."""
+"""baircondor CLI entrypoint.
+
+Subcommands import what they need inside their handlers: ``last`` and ``config`` run in
+shell loops, so they must not pay for rich, yaml or pydantic at startup.
+"""
 
 from __future__ import annotations
 
 import argparse
+import functools
 import sys
 from pathlib import Path
 
-from rich.console import Console
-
 from .config import CONFIG_PATH, get_user
-from .submit import run_interactive, run_submit
 
-_console = Console(stderr=True)
+
+@functools.cache
+def _console():
+    from rich.console import Console
+
+    return Console(stderr=True)
 
 
 def main() -> None:
@@ -26,21 +33,55 @@ def main() -> None:
     _add_interactive_parser(sub)
     _add_history_parser(sub)
     _add_last_parser(sub)
+    _add_runs_parser(sub)
+    _add_du_parser(sub)
+    _add_gc_parser(sub)
+    _add_top_parser(sub)
+    _add_wait_parser(sub)
+    _add_tail_parser(sub)
+    _add_daemon_parser(sub)
     sub.add_parser("config", help="Print the config file path.")
     sub.add_parser("setup", help="Re-run the setup wizard.")
 
     args = parser.parse_args()
 
     if args.subcommand == "submit":
+        if not args.no_daemon:
+            from .client import forward_submit
+
+            if forward_submit(args):
+                return
         _maybe_run_wizard(args)
+        from .submit import run_submit
+
         run_submit(args)
     elif args.subcommand == "interactive":
         _maybe_run_wizard(args)
+        from .submit import run_interactive
+
         run_interactive(args)
     elif args.subcommand == "history":
         _cmd_history(args)
     elif args.subcommand == "last":
         _cmd_last(args)
+    elif args.subcommand == "runs":
+        _cmd_runs(args)
+    elif args.subcommand == "du":
+        _cmd_du(args)
+    elif args.subcommand == "gc":
+        _cmd_gc(args)
+    elif args.subcommand == "tail":
+        _cmd_tail(args)
+    elif args.subcommand == "wait":
+        _cmd_wait(args)
+    elif args.subcommand == "top":
+        from .top import run_top
+
+        run_top(args)
+    elif args.subcommand == "daemon":
+        from .daemon import serve
+
+        serve(Path(args.socket) if args.socket else None, window=args.window / 1000)
     elif args.subcommand == "config":
         print(CONFIG_PATH)
     elif args.subcommand == "setup":
@@ -60,7 +101,7 @@ def _maybe_run_wizard(args) -> None:
         return
     from .setup import run_wizard
 
-    _console.print("[yellow]No config file found.[/yellow] Running first-time setup...\n")
+    _console().print("[yellow]No config file found.[/yellow] Running first-time setup...\n")
     proceed = run_wizard(config_path)
     if not proceed:
         sys.exit(0)
@@ -80,27 +121,48 @@ def _cmd_setup() -> None:
 
 
 def _cmd_history(args) -> None:
-    from concurrent.futures import ThreadPoolExecutor
-
     from rich.text import Text
 
-    from .history import HISTORY_FILE, get_entries, get_job_status
+    from .history import (
+        HISTORY_FILE,
+        _status_style,
+        get_entries,
+        job_states,
+        migrate_to_sqlite,
+    )
+
+    if args.migrate:
+        db, count = migrate_to_sqlite(HISTORY_FILE)
+        if count is None:
+            _console().print(f"[dim]History already uses {db}[/dim]")
+        else:
+            _console().print(f"Imported {count} entries into {db}")
+        return
 
     cap = 50
-    entries = get_entries(n=cap + 1, user=get_user(), history_file=HISTORY_FILE)
+    entries = get_entries(
+        n=cap + 1,
+        user=get_user(),
+        history_file=HISTORY_FILE,
+        jobname=args.job,
+        project=args.project,
+        cluster_id=args.cluster,
+        since=args.since,
+        until=args.until,
+    )
 
     if not entries:
-        _console.print("[dim]No submissions yet.[/dim]")
+        _console().print("[dim]No submissions yet.[/dim]")
         return
 
     has_more = len(entries) > cap
     entries = entries[:cap]
     display = entries[: args.n]
 
-    with ThreadPoolExecutor(max_workers=len(display)) as ex:
-        statuses = list(ex.map(lambda e: get_job_status(e.get("cluster_id")), display))
+    states = job_states(display, HISTORY_FILE)
 
-    for entry, status in zip(display, statuses):
+    for entry, state in zip(display, states):
+        status = state["status"]
         ts = entry.get("timestamp", "")[:16].replace("T", " ")
         jobname = entry.get("jobname", "?")
         run_dir = entry.get("run_dir", "")
@@ -112,20 +174,21 @@ def _cmd_history(args) -> None:
         summary.append(jobname, style="bold")
         summary.append("  ")
         summary.append(f"● {status}", style=_status_style(status))
-        _console.print(summary)
-        _console.print(f"  {run_dir}", style="dim cyan")
+        _console().print(summary)
+        _console().print(f"  {run_dir}", style="dim cyan")
 
         if args.verbose:
             cmd_str = " ".join(command)
             if len(cmd_str) > 60:
                 cmd_str = cmd_str[:57] + "..."
-            _console.print(f"  gpus={gpus}  cmd: {cmd_str}", style="dim")
+            extra = f"  exit={state['exit_code']}" if "exit_code" in state else ""
+            _console().print(f"  gpus={gpus}  cmd: {cmd_str}{extra}", style="dim")
 
-        _console.print()
+        _console().print()
 
     if has_more or len(display) < len(entries):
         total = f"{cap}+" if has_more else str(len(entries))
-        _console.print(f"[dim]Showing {len(display)} of {total}. Use -n N to see more.[/dim]")
+        _console().print(f"[dim]Showing {len(display)} of {total}. Use -n N to see more.[/dim]")
 
 
 def _cmd_last(args) -> None:
@@ -139,15 +202,174 @@ def _cmd_last(args) -> None:
         print(d)
 
 
-def _status_style(status: str) -> str:
-    return {
-        "idle": "yellow",
-        "running": "green",
-        "done": "dim green",
-        "failed": "red",
-        "held": "red",
-        "removed": "dim red",
-    }.get(status, "dim")
+def _scan_runs(args) -> tuple[Path, list[dict]]:
+    """Run records under scratch for runs/du/gc, filtered by --job/--project."""
+    from .config import load_config
+    from .runs import runs_root, scan
+
+    root = runs_root(load_config(args.config), args.scratch, args.runs_subdir)
+    records = [
+        r
+        for r in scan(root, user=None if getattr(args, "all_users", False) else get_user())
+        if (args.job is None or r["jobname"] == args.job)
+        and (args.project is None or r["project"] == args.project)
+    ]
+    return root, records
+
+
+def _cmd_runs(args) -> None:
+    root, records = _scan_runs(args)
+    display = records[: args.n]
+    if args.paths:
+        for r in display:
+            print(r["run_dir"])
+        return
+    if not records:
+        _console().print(f"[dim]No run dirs under {root}.[/dim]")
+        return
+
+    from rich.text import Text
+
+    from .eventlog import log_states
+    from .history import _status_style
+
+    states = log_states([r["run_dir"] for r in display])
+    for r in display:
+        status = states.get(r["run_dir"], {}).get("status", "?")
+        summary = Text()
+        summary.append(f"[{r['timestamp'][:16].replace('T', ' ')}]  ", style="dim")
+        if r["project"]:
+            summary.append(f"{r['project']}/", style="dim")
+        summary.append(r["jobname"] or "?", style="bold")
+        summary.append("  ")
+        summary.append(f"● {status}", style=_status_style(status))
+        if args.all_users:
+            summary.append(f"  {r['user']}", style="dim")
+        _console().print(summary)
+        _console().print(f"  {r['run_dir']}", style="dim cyan")
+        _console().print()
+    if len(display) < len(records):
+        _console().print(
+            f"[dim]Showing {len(display)} of {len(records)}. Use -n N to see more.[/dim]"
+        )
+
+
+def _cmd_du(args) -> None:
+    from rich.table import Table
+
+    from .disk import format_size, run_sizes
+
+    root, records = _scan_runs(args)
+    if not records:
+        _console().print(f"[dim]No run dirs under {root}.[/dim]")
+        return
+    sizes = run_sizes(records)
+    totals: dict[str, list[int]] = {}
+    for r in records:
+        if args.by == "user":
+            group = r["user"] or "?"
+        elif args.by == "project":
+            group = r["project"] or "-"
+        else:
+            group = f"{r['project']}/{r['jobname']}" if r["project"] else r["jobname"] or "?"
+        total = totals.setdefault(group, [0, 0])
+        total[0] += 1
+        total[1] += sizes[r["run_dir"]]
+
+    table = Table(box=None, header_style="bold")
+    table.add_column(args.by.capitalize())
+    table.add_column("Runs", justify="right")
+    table.add_column("Size", justify="right")
+    for group, (count, size) in sorted(totals.items(), key=lambda kv: -kv[1][1]):
+        table.add_row(group, str(count), format_size(size))
+    table.add_row(
+        "[bold]total[/]", str(len(records)), f"[bold]{format_size(sum(sizes.values()))}[/]"
+    )
+    _console().print(table)
+
+
+def _cmd_gc(args) -> None:
+    from .disk import delete_runs, format_size, gc_candidates, parse_age, run_sizes, run_states
+    from .history import HISTORY_FILE
+
+    if args.older_than is None and args.keep_last is None:
+        sys.exit("error: gc needs --older-than and/or --keep-last")
+    try:
+        older_than = parse_age(args.older_than) if args.older_than is not None else None
+    except ValueError as e:
+        sys.exit(f"error: --older-than: {e}")
+
+    root, records = _scan_runs(args)
+    candidates = gc_candidates(
+        records,
+        run_states(records, HISTORY_FILE),
+        older_than=older_than,
+        keep_last=args.keep_last or 0,
+        status=set(args.status) if args.status else None,
+    )
+    if not candidates:
+        _console().print("[dim]Nothing to delete.[/dim]")
+        return
+    sizes = run_sizes(candidates)
+    freed = format_size(sum(sizes.values()))
+    if args.dry_run or args.verbose:
+        for r in candidates:
+            print(f"{format_size(sizes[r['run_dir']]):>8}  {r['run_dir']}")
+    if args.dry_run:
+        _console().print(f"[dim]Would delete {len(candidates)} run(s), {freed}.[/dim]")
+        return
+    if not args.yes:
+        answer = input(f"Delete {len(candidates)} run(s), {freed}? [y/N] ").strip().lower()
+        if answer not in ("y", "yes"):
+            sys.exit(0)
+
+    failed = delete_runs([r["run_dir"] for r in candidates])
+    for run_dir, err in failed:
+        _console().print(f"[red]failed[/red] {run_dir}: {err}")
+    _console().print(f"Deleted {len(candidates) - len(failed)} run(s), {freed}.")
+    if failed:
+        sys.exit(1)
+
+
+def _cmd_wait(args) -> None:
+    from .history import HISTORY_FILE, TERMINAL_STATES, get_last_dirs
+    from .watch import wait_for_runs
+
+    run_dirs = [Path(d) for d in args.run_dirs] or get_last_dirs(
+        n=1, user=get_user(), history_file=HISTORY_FILE
+    )
+    if not run_dirs:
+        sys.exit("error: no run dirs given and no submissions in history")
+    states = wait_for_runs(run_dirs, timeout=args.timeout)
+
+    for run_dir, state in states.items():
+        exit_code = f"  exit={state['exit_code']}" if "exit_code" in state else ""
+        print(f"{run_dir}  {state['status']}{exit_code}")
+    statuses = [state["status"] for state in states.values()]
+    if any(s not in TERMINAL_STATES for s in statuses):
+        sys.exit(2)  # timed out
+    if any(s != "done" for s in statuses):
+        sys.exit(1)
+
+
+def _cmd_tail(args) -> None:
+    from .history import HISTORY_FILE, get_entries
+    from .tail import follow
+
+    run_dirs = [Path(d) for d in args.run_dirs]
+    if not run_dirs:
+        entries = get_entries(
+            n=args.last,
+            user=get_user(),
+            history_file=HISTORY_FILE,
+            jobname=args.job,
+            project=args.project,
+        )
+        run_dirs = [Path(e["run_dir"]) for e in reversed(entries)]
+    if not run_dirs:
+        sys.exit("error: no matching submissions in history")
+    print(f"Following {len(run_dirs)} run(s). Ctrl-C to stop.", file=sys.stderr)
+    follow(run_dirs, from_start=args.from_start)
 
 
 # ── subcommand parsers ────────────────────────────────────────────────────────
@@ -196,7 +418,7 @@ def _common_args(p: argparse.ArgumentParser) -> None:
         "--tag",
         metavar="TAG",
         help="String appended to the run dir name. "
-        "Example: --tag smoke-test creates .../20260219_161635_abc123_smoke-test/",
+        "Example: --tag smoke-test creates .../20260219_161635_048213_k3f90a_smoke-test/",
     )
     p.add_argument(
         "--project",
@@ -253,6 +475,76 @@ def _common_args(p: argparse.ArgumentParser) -> None:
 def _add_submit_parser(sub) -> None:
     p = sub.add_parser("submit", help="Submit a non-interactive batch job.")
     _common_args(p)
+    p.add_argument(
+        "--output-cap",
+        metavar="SIZE",
+        help="Cap stdout.txt and stderr.txt at SIZE each (e.g. 2G), keeping the start and "
+        "the latest output; 0 disables (default: output.cap in config, off).",
+    )
+    p.add_argument(
+        "--compress-output",
+        dest="compress_output",
+        action="store_true",
+        default=None,
+        help="Gzip output chunks rotated out under --output-cap.",
+    )
+    p.add_argument(
+        "--no-compress-output",
+        dest="compress_output",
+        action="store_false",
+        default=None,
+        help="Keep rotated output chunks uncompressed.",
+    )
+    p.add_argument(
+        "--snapshot",
+        dest="snapshot",
+        action="store_true",
+        default=None,
+        help="Run from a frozen copy of the repo's tracked files, so edits made while the "
+        "job is queued don't affect it (default: snapshot.enabled in config, off).",
+    )
+    p.add_argument(
+        "--no-snapshot",
+        dest="snapshot",
+        action="store_false",
+        default=None,
+        help="Run from the live checkout.",
+    )
+    p.add_argument(
+        "--cache-conda-activation",
+        dest="cache_conda_activation",
+        action="store_true",
+        default=None,
+        help="Activate --conda-env once at submission and have jobs replay the cached "
+        "environment (default: conda.cache_activation in config, off).",
+    )
+    p.add_argument(
+        "--no-cache-conda-activation",
+        dest="cache_conda_activation",
+        action="store_false",
+        default=None,
+        help="Run `conda activate` in every job.",
+    )
+    p.add_argument(
+        "--pack-conda-env",
+        dest="pack_conda_env",
+        action="store_true",
+        default=None,
+        help="Pack --conda-env once with conda-pack and unpack it onto node-local storage, "
+        "shared by your jobs on each node (default: conda.pack in config, off).",
+    )
+    p.add_argument(
+        "--no-pack-conda-env",
+        dest="pack_conda_env",
+        action="store_false",
+        default=None,
+        help="Use the conda env in place.",
+    )
+    p.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Submit in-process even if a baircondor daemon is running.",
+    )
     p.add_argument(
         "command",
         nargs=argparse.REMAINDER,
@@ -289,6 +581,16 @@ def _add_history_parser(sub) -> None:
         action="store_true",
         help="Show GPUs and command in addition to the default fields.",
     )
+    p.add_argument("--job", metavar="NAME", help="Only show runs with this jobname.")
+    p.add_argument("--project", metavar="NAME", help="Only show runs in this project.")
+    p.add_argument("--cluster", metavar="ID", help="Only show this cluster (and its sweep procs).")
+    p.add_argument("--since", metavar="DATE", help="Only show runs at or after this ISO date.")
+    p.add_argument("--until", metavar="DATE", help="Only show runs before this ISO date.")
+    p.add_argument(
+        "--migrate",
+        action="store_true",
+        help="Import history.jsonl into an indexed SQLite store and use it from now on.",
+    )
 
 
 def _add_last_parser(sub) -> None:
@@ -302,5 +604,151 @@ def _add_last_parser(sub) -> None:
     )
 
 
+def _add_runs_parser(sub) -> None:
+    p = sub.add_parser(
+        "runs", help="List run dirs found under scratch, including ones not in history."
+    )
+    p.add_argument(
+        "-n",
+        type=int,
+        default=10,
+        metavar="N",
+        help="Number of runs to show, newest first (default: 10).",
+    )
+    p.add_argument("--all-users", action="store_true", help="Include other users' runs.")
+    p.add_argument("--paths", action="store_true", help="Print only run dir paths.")
+    _scratch_args(p)
+
+
+def _scratch_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--job", metavar="NAME", help="Only runs with this jobname.")
+    p.add_argument("--project", metavar="NAME", help="Only runs in this project.")
+    p.add_argument("--scratch", metavar="PATH", help="Scratch root to scan (default: from config).")
+    p.add_argument(
+        "--runs-subdir", metavar="NAME", help="Runs subdirectory (default: from config)."
+    )
+
+
+def _add_du_parser(sub) -> None:
+    p = sub.add_parser("du", help="Disk usage of run dirs under scratch.")
+    p.add_argument(
+        "--by",
+        choices=["job", "project", "user"],
+        default="job",
+        help="Group totals by jobname (default), project or user.",
+    )
+    p.add_argument("--all-users", action="store_true", help="Include other users' runs.")
+    _scratch_args(p)
+
+
+def _add_gc_parser(sub) -> None:
+    p = sub.add_parser(
+        "gc", help="Delete finished run dirs under scratch (never queued or running ones)."
+    )
+    p.add_argument(
+        "--older-than",
+        metavar="AGE",
+        help="Only runs submitted longer ago than this (e.g. 30d, 12h, 2w).",
+    )
+    p.add_argument(
+        "--keep-last",
+        type=int,
+        metavar="N",
+        help="Always keep the N newest runs of each jobname.",
+    )
+    p.add_argument(
+        "--status",
+        action="append",
+        choices=["done", "failed", "removed"],
+        help="Only runs that ended this way (repeatable; default: any finished run).",
+    )
+    p.add_argument("--dry-run", action="store_true", help="List what would be deleted.")
+    p.add_argument("-y", "--yes", action="store_true", help="Don't ask for confirmation.")
+    p.add_argument("-v", "--verbose", action="store_true", help="List the runs being deleted.")
+    _scratch_args(p)
+
+
+def _add_wait_parser(sub) -> None:
+    p = sub.add_parser(
+        "wait",
+        help="Block until runs finish (exit 0: all succeeded, 1: some failed, 2: timeout).",
+    )
+    p.add_argument(
+        "run_dirs",
+        nargs="*",
+        metavar="RUN_DIR",
+        help="Run dirs to wait for (default: the most recent submission).",
+    )
+    p.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Give up after this many seconds (default: wait indefinitely).",
+    )
+
+
+def _add_tail_parser(sub) -> None:
+    p = sub.add_parser("tail", help="Follow stdout/stderr of one or many runs at once.")
+    p.add_argument(
+        "run_dirs",
+        nargs="*",
+        metavar="RUN_DIR",
+        help="Run dirs to follow (default: pick from history with --last/--job/--project).",
+    )
+    p.add_argument(
+        "--last",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Follow the N most recent submissions (default: 1).",
+    )
+    p.add_argument("--job", metavar="NAME", help="Only runs with this jobname.")
+    p.add_argument("--project", metavar="NAME", help="Only runs in this project.")
+    p.add_argument(
+        "--from-start",
+        action="store_true",
+        help="Print existing output too, not just new lines.",
+    )
+
+
+def _add_top_parser(sub) -> None:
+    p = sub.add_parser("top", help="Live view of your jobs' status and resource usage.")
+    p.add_argument(
+        "-n",
+        type=int,
+        default=50,
+        metavar="N",
+        help="Watch the N most recent submissions (default: 50).",
+    )
+    p.add_argument(
+        "--interval",
+        type=float,
+        default=2.0,
+        metavar="SECONDS",
+        help="Refresh interval; backs off while nothing changes (default: 2).",
+    )
+    p.add_argument("--once", action="store_true", help="Print one snapshot and exit.")
+
+
+def _add_daemon_parser(sub) -> None:
+    p = sub.add_parser(
+        "daemon",
+        help="Run a local submit daemon that keeps config warm and batches submissions.",
+    )
+    p.add_argument(
+        "--window",
+        type=float,
+        default=20.0,
+        metavar="MS",
+        help="How long to collect submissions before one condor_submit call (default: 20).",
+    )
+    p.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="Unix socket path (default: $XDG_RUNTIME_DIR/baircondor-$USER.sock).",
+    )
+
+
 if __name__ == "__main__":
     main()
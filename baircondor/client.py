@@ -0,0 +1,105 @@
+"""Thin client for the submit daemon (see daemon.py).
+
+Only stdlib modules are imported here so that forwarding a submission to a running
+daemon doesn't pay for rich, yaml or pydantic.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import struct
+import sys
+import tempfile
+from pathlib import Path
+
+# path options are relative to the client's cwd, not the daemon's
+_PATH_ARGS = ("config", "scratch", "conda_base")
+
+
+def socket_path(user: str | None = None) -> Path:
+    """Per-user socket path, under $XDG_RUNTIME_DIR when set, else a private temp dir."""
+    user = user or os.environ.get("USER") or os.environ.get("USERNAME") or "unknown"
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(
+        tempfile.gettempdir(), f"baircondor-{user}"
+    )
+    return Path(runtime_dir) / f"baircondor-{user}.sock"
+
+
+def private_dir(path: Path) -> None:
+    """Create ``path`` with mode 700, and make sure it is ours and private if it exists.
+
+    The socket lives in a shared temp dir when $XDG_RUNTIME_DIR is unset, where another
+    user could otherwise have created the directory first.
+    """
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = os.stat(path)
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        sys.exit(f"error: {path} must be a directory private to you (mode 700)")
+
+
+def request(payload: dict, path: Path | None = None, timeout: float = 300.0) -> dict | None:
+    """Send one request to the daemon and return its reply, or None if none is listening.
+
+    A socket that isn't ours, or whose listener runs as another user, is treated as no
+    daemon: requests carry the caller's environment.
+    """
+    path = path or socket_path()
+    try:
+        if os.stat(path).st_uid != os.getuid():
+            return None
+    except OSError:
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    with sock:
+        if _peer_uid(sock) not in (None, os.getuid()):
+            return None
+        sock.sendall(json.dumps(payload).encode() + b"\n")
+        line = sock.makefile("rb").readline()
+    if not line:
+        return {"ok": False, "error": "daemon closed the connection"}
+    return json.loads(line)
+
+
+def _peer_uid(sock: socket.socket) -> int | None:
+    """Uid of the process listening on ``sock``, or None where SO_PEERCRED is unsupported."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", creds)[1]
+
+
+def forward_submit(args, path: Path | None = None) -> bool:
+    """Forward a parsed ``submit`` invocation to the daemon.
+
+    Returns False (and does nothing) when no daemon is running, so the caller can fall
+    back to submitting in-process.
+    """
+    payload = {
+        "op": "submit",
+        "cwd": os.getcwd(),
+        # job.sub uses getenv = True, so the job must see the client's environment
+        "env": dict(os.environ),
+        "args": {k: v for k, v in vars(args).items() if not k.startswith("_")},
+    }
+    for key in _PATH_ARGS:
+        if payload["args"].get(key):
+            payload["args"][key] = os.path.abspath(os.path.expanduser(payload["args"][key]))
+    reply = request(payload, path)
+    if reply is None:
+        return False
+    if not reply.get("ok"):
+        print(f"error: {reply.get('error')}", file=sys.stderr)
+        sys.exit(reply.get("exit_code") or 1)
+    if not getattr(args, "quiet", False):
+        print(f"[baircondor] 📂 Run dir  : {reply['run_dir']}", file=sys.stderr)
+        if reply.get("cluster_id"):
+            print(f"[baircondor] 🚀 Submitted — job {reply['cluster_id']}", file=sys.stderr)
+    return True
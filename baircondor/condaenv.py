@@ -0,0 +1,213 @@
+"""Faster conda activation for batch jobs.
+
+``conda activate`` runs conda's Python and every activate.d script, which takes seconds
+on an NFS-hosted install and, repeated by every job of a sweep, loads its metadata
+server. With ``conda.cache_activation`` (or ``--cache-conda-activation``), baircondor
+activates the env once at submission, in a clean bash using the submitter's environment
+(which condor's ``getenv = True`` hands to the job), and records the variables it
+changed as a small shell script under ``<scratch>/<runs_subdir>/<user>/.conda/``.
+run.sh sources that script instead of activating.
+
+A cached script is keyed on the conda base, the env, the mtime of the env's
+``conda-meta/history`` (which conda rewrites on every install, update or removal) and
+the submitter's ``PATH`` and ``CONDA_*`` variables. Activating from inside another env
+first deactivates it, which rewrites PATH wholesale rather than prepending to it, so a
+script is only replayed for jobs submitted from the same starting point.
+run.sh checks that mtime again before sourcing, and falls back to a real activation if
+the env has changed since submission.
+
+With ``conda.pack`` (or ``--pack-conda-env``), the env is instead packed once with
+conda-pack into ``.conda/packs/<hash>.tar.gz``, keyed on its package set, and run.sh
+unpacks it into ``conda.local_dir`` on the execute node, where every job of the user on
+that node shares it (see templates._packed_env_lines). Jobs then import from local disk
+rather than NFS.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import re
+import shlex
+import shutil
+import subprocess
+from pathlib import Path
+
+CACHE_DIRNAME = ".conda"
+ACTIVATE_TIMEOUT = 300  # seconds; a slow NFS can take a while, but not forever
+PACK_DIRNAME = "packs"
+_MARK = "__baircondor_activated__"
+_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# set by bash itself, or by conda only for the interactive prompt
+_SKIP = {"_", "SHLVL", "PWD", "OLDPWD", "PS1", "CONDA_PROMPT_MODIFIER"}
+
+
+def cache_dir(scratch: str, runs_subdir: str, user: str) -> Path:
+    return Path(scratch) / runs_subdir / user / CACHE_DIRNAME
+
+
+def env_prefix(conda_base: str, env: str) -> Path | None:
+    """Locate ``env`` (a name or a path) the way ``conda activate`` would, or None."""
+    if "/" in env:
+        candidates = [Path(env).expanduser()]
+    elif env == "base":
+        candidates = [Path(conda_base)]
+    else:
+        candidates = [Path(conda_base) / "envs" / env, Path.home() / ".conda" / "envs" / env]
+    for prefix in candidates:
+        if (prefix / "conda-meta").is_dir():
+            return prefix
+    return None
+
+
+def cached_activation(conda: dict, directory: Path, environ: dict | None = None) -> dict | None:
+    """Return ``{"script", "stamp_path", "stamp"}`` for run.sh, capturing it if needed.
+
+    ``environ`` is the submitter's environment (default: ours), which the job will
+    inherit. None when the env can't be located or activating it fails; run.sh then
+    activates the usual way.
+    """
+    environ = os.environ if environ is None else environ
+    base, env = conda.get("conda_base"), conda.get("env")
+    prefix = env_prefix(base, env) if base and env else None
+    if prefix is None:
+        return None
+    stamp_path = prefix / "conda-meta" / "history"
+    try:
+        stamp = int(stamp_path.stat().st_mtime)
+    except OSError:
+        stamp_path = prefix / "conda-meta"  # an env without a history file yet
+        stamp = int(stamp_path.stat().st_mtime)
+
+    start = "\0".join(
+        f"{name}={value}"
+        for name, value in sorted(environ.items())
+        if name == "PATH" or name.startswith("CONDA_")
+    )
+    key = hashlib.sha1(f"{base}\0{env}\0{prefix}\0{stamp}\0{start}".encode()).hexdigest()[:16]
+    script = directory / f"{key}.sh"
+    if not script.exists():
+        lines = _capture(base, env, environ)
+        if lines is None:
+            return None
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / f".{key}.{os.getpid()}.tmp"
+        header = f"# conda activate {env} (base {base}), captured by baircondor\n"
+        tmp.write_text(header + "".join(line + "\n" for line in lines))
+        os.replace(tmp, script)
+    return {"script": str(script), "stamp_path": str(stamp_path), "stamp": stamp}
+
+
+def _capture(conda_base: str, env: str, environ: dict | None = None) -> list[str] | None:
+    """Activate ``env`` in a clean bash and return the exports/unsets that replay it."""
+    script = (
+        f"env -0; printf '{_MARK}\\0'; "
+        f"source {shlex.quote(conda_base + '/etc/profile.d/conda.sh')} && "
+        f"conda activate {shlex.quote(env)} && env -0"
+    )
+    try:
+        result = subprocess.run(
+            ["bash", "--noprofile", "--norc", "-c", script],
+            capture_output=True,
+            timeout=ACTIVATE_TIMEOUT,
+            env=environ,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    out = result.stdout.decode("utf-8", "surrogateescape")
+    if result.returncode != 0 or f"\0{_MARK}\0" not in out:
+        return None
+    before, after = out.split(f"{_MARK}\0", 1)
+    return _delta(_parse_env(before), _parse_env(after))
+
+
+def _parse_env(text: str) -> dict[str, str]:
+    env = {}
+    for item in text.split("\0"):
+        name, sep, value = item.partition("=")
+        if sep and _NAME.match(name) and name not in _SKIP:
+            env[name] = value
+    return env
+
+
+def _delta(before: dict[str, str], after: dict[str, str]) -> list[str]:
+    """Shell lines turning ``before`` into ``after``.
+
+    Values that only gained a prefix or suffix (``PATH=<env>/bin:$PATH``) are written
+    relative to the variable's value at run time rather than frozen.
+    """
+    lines = [f"unset {name}" for name in sorted(before.keys() - after.keys())]
+    for name, value in sorted(after.items()):
+        old = before.get(name)
+        if value == old:
+            continue
+        if old and value.endswith(old):
+            lines.append(f'export {name}={shlex.quote(value[: -len(old)])}"${{{name}:-}}"')
+        elif old and value.startswith(old):
+            lines.append(f'export {name}="${{{name}:-}}"{shlex.quote(value[len(old) :])}')
+        else:
+            lines.append(f"export {name}={shlex.quote(value)}")
+    return lines
+
+
+# ── packed envs ──────────────────────────────────────────────────────────────
+
+
+def env_hash(prefix: Path) -> str:
+    """Identify an env's contents without reading them.
+
+    Covers the installed conda packages (one ``conda-meta/*.json`` per package build),
+    the conda transaction history, and site-packages dirs, whose mtime changes when pip
+    adds or removes a package.
+    """
+    meta = prefix / "conda-meta"
+    parts = [str(prefix), *sorted(n for n in os.listdir(meta) if n.endswith(".json"))]
+    for path in [meta / "history", *sorted(prefix.glob("lib/python*/site-packages"))]:
+        with contextlib.suppress(OSError):
+            parts.append(f"{path.name}:{path.stat().st_mtime_ns}")
+    return hashlib.sha1("\0".join(parts).encode()).hexdigest()[:16]
+
+
+def packed_env(conda: dict, directory: Path, environ: dict | None = None) -> dict:
+    """Return ``{"tarball", "hash"}`` for ``conda``'s env, packing it first if needed.
+
+    conda-pack runs in ``environ`` (default: ours). Raises RuntimeError when the env
+    can't be located or conda-pack fails.
+    """
+    base, env = conda.get("conda_base"), conda.get("env")
+    prefix = env_prefix(base, env) if base and env else None
+    if prefix is None:
+        raise RuntimeError(f"cannot find conda env {env!r} under {base}")
+    key = env_hash(prefix)
+    tarball = directory / PACK_DIRNAME / f"{key}.tar.gz"
+    if not tarball.exists():
+        _pack(base, prefix, tarball, environ)
+    return {"tarball": str(tarball), "hash": key}
+
+
+def _pack(conda_base: str, prefix: Path, tarball: Path, environ: dict | None = None) -> None:
+    path = (os.environ if environ is None else environ).get("PATH")
+    conda_pack = shutil.which("conda-pack", path=path) or shutil.which(
+        "conda-pack", path=f"{conda_base}/bin"
+    )
+    if conda_pack is None:
+        raise RuntimeError("conda-pack is not installed (conda install -n base conda-pack)")
+    tarball.parent.mkdir(parents=True, exist_ok=True)
+    tmp = tarball.with_name(f".{tarball.name}.{os.getpid()}.tmp")
+    cmd = [
+        conda_pack,
+        "--prefix", str(prefix),
+        "--output", str(tmp),
+        "--format", "tar.gz",
+        "--compress-level", "1",  # decompression speed matters more than size
+        "--n-threads", "-1",
+        "--ignore-editable-packages",  # editable installs keep pointing at their source
+        "--force",
+        "--quiet",
+    ]  # fmt: skip
+    result = subprocess.run(cmd, capture_output=True, text=True, env=environ)
+    if result.returncode != 0:
+        tmp.unlink(missing_ok=True)
+        raise RuntimeError(f"conda-pack failed: {result.stderr.strip() or result.stdout.strip()}")
+    os.replace(tmp, tarball)
@@ -3,11 +3,14 @@
 from __future__ import annotations
 
 import os
+import re
+import shutil
 import subprocess
+import sys
 from pathlib import Path
 from typing import Any
 
-import yaml
+from . import cache
 
 DEFAULTS: dict[str, Any] = {
     "defaults": {
@@ -24,6 +27,23 @@ DEFAULTS: dict[str, Any] = {
     },
     "conda": {
         "conda_base": None,
+        "cache_activation": False,  # replay a cached `conda activate` in batch jobs
+        "pack": False,  # unpack a conda-pack copy of the env on each execute node
+        "local_dir": "/tmp/baircondor-$USER/envs",  # where, on the node (expanded there)
+        "local_keep": 3,  # unpacked envs kept per node; least recently used go first
+    },
+    "output": {
+        "cap": None,  # e.g. "2G": route stdout/stderr through a size-capped writer
+        "head": None,  # bytes from the start always kept (default: a quarter of cap)
+        "compress": False,  # gzip rotated chunks
+    },
+    "snapshot": {
+        "enabled": False,  # run batch jobs from a frozen copy of the repo's tracked files
+    },
+    "git": {
+        "untracked": True,  # count untracked files in meta.json's git.dirty
+        "status_timeout": None,  # seconds; past this, only tracked files are checked
+        "cache_ttl": 0,  # seconds to reuse git info (may miss edits to tracked files)
     },
 }
 
@@ -41,6 +61,8 @@ def load_config(config_path: str | None = None) -> dict[str, Any]:
 
     path = Path(config_path) if config_path else _CONFIG_PATH
     if path.exists():
+        import yaml  # only needed when a config file exists; keeps `baircondor last` light
+
         with open(path) as f:
             user_cfg = yaml.safe_load(f) or {}
         _deep_merge(cfg, user_cfg)
@@ -71,14 +93,65 @@ def resolve_resources(cfg: dict, args) -> dict[str, Any]:
     return {"gpus": gpus, "cpus": cpus, "mem": mem, "disk": disk}
 
 
-def resolve_conda(cfg: dict, args) -> dict[str, str | None]:
+def resolve_conda(cfg: dict, args, autodetect: bool = True) -> dict[str, str | None]:
     conda_env = getattr(args, "conda_env", None)
     conda_base = getattr(args, "conda_base", None) or cfg["conda"]["conda_base"]
-    if conda_env and not conda_base:
+    if conda_env and not conda_base and autodetect:
         conda_base = _autodetect_conda_base()
     return {"env": conda_env, "conda_base": conda_base}
 
 
+def resolve_conda_cache(cfg: dict, args) -> bool:
+    cache_activation = getattr(args, "cache_conda_activation", None)
+    if cache_activation is None:
+        return bool((cfg.get("conda") or {}).get("cache_activation"))
+    return cache_activation
+
+
+def resolve_conda_pack(cfg: dict, args) -> dict[str, Any] | None:
+    """Node-local staging settings for a packed conda env, or None when it's off."""
+    options = cfg.get("conda") or {}
+    pack = getattr(args, "pack_conda_env", None)
+    if pack is None:
+        pack = options.get("pack")
+    if not pack:
+        return None
+    return {
+        "local_dir": options.get("local_dir") or DEFAULTS["conda"]["local_dir"],
+        "keep": max(int(options.get("local_keep") or 1), 1),
+    }
+
+
+def resolve_output(cfg: dict, args) -> dict[str, Any] | None:
+    """Size-capped output settings for run.sh, or None to write stdout/stderr directly.
+
+    ``--output-cap`` overrides ``output.cap`` (``0`` turns capping off).
+    """
+    options = cfg.get("output") or {}
+    cap = getattr(args, "output_cap", None)
+    if cap is None:
+        cap = options.get("cap")
+    cap = _parse_size(cap, "output cap")
+    if not cap:
+        return None
+    head = _parse_size(options.get("head"), "output head")
+    compress = getattr(args, "compress_output", None)
+    if compress is None:
+        compress = bool(options.get("compress"))
+    return {
+        "cap": cap,
+        "head": cap // 4 if head is None else min(head, cap // 2),
+        "compress": compress,
+    }
+
+
+def resolve_snapshot(cfg: dict, args) -> bool:
+    snapshot = getattr(args, "snapshot", None)
+    if snapshot is None:
+        return bool((cfg.get("snapshot") or {}).get("enabled"))
+    return snapshot
+
+
 def resolve_pin_submit_host(cfg: dict, args) -> bool:
     pin_submit_host = getattr(args, "pin_submit_host", None)
     if pin_submit_host is None:
@@ -86,13 +159,60 @@ def resolve_pin_submit_host(cfg: dict, args) -> bool:
     return pin_submit_host
 
 
-def _autodetect_conda_base() -> str | None:
+def _autodetect_conda_base(environ: dict | None = None) -> str | None:
+    """Detect the conda base, reusing the result cached for this conda binary and PATH.
+
+    ``environ`` (default: ours) is the environment to detect it in; the daemon passes
+    each client's.
+
+    ``conda info --base`` can take seconds on shared filesystems, so a successful
+    detection is stored under ~/.cache/baircondor/conda_base.json. It is invalidated when
+    $CONDA_EXE, $PATH or the conda binary's mtime change, or the base dir disappears.
+    """
+    base, key = _conda_lookup(environ)
+    if base is None:
+        base = _detect_conda_base(environ)
+        _conda_store(key, base)
+    return base
+
+
+_CONDA_CACHE = "conda_base.json"
+
+
+def _conda_lookup(environ: dict | None = None) -> tuple[str | None, list]:
+    """Return ``(cached conda base or None, cache key)``; shared with aio.py's probe."""
+    key = _conda_cache_key(environ)
+    cached = cache.load(_CONDA_CACHE)
+    if cached is not None and cached.get("key") == key:
+        base = cached.get("conda_base")
+        if base and Path(base).is_dir():
+            return base, key
+    return None, key
+
+
+def _conda_store(key: list, base: str | None) -> None:
+    if base:
+        cache.store(_CONDA_CACHE, {"key": key, "conda_base": base})
+
+
+def _conda_cache_key(environ: dict | None = None) -> list:
+    environ = os.environ if environ is None else environ
+    conda_exe = environ.get("CONDA_EXE") or shutil.which("conda", path=environ.get("PATH"))
+    try:
+        mtime = os.stat(conda_exe).st_mtime_ns if conda_exe else None
+    except OSError:
+        mtime = None
+    return [environ.get("CONDA_EXE"), environ.get("PATH"), conda_exe, mtime]
+
+
+def _detect_conda_base(environ: dict | None = None) -> str | None:
     try:
         result = subprocess.run(
             ["conda", "info", "--base"],
             capture_output=True,
             text=True,
             check=False,
+            env=environ,
         )
     except OSError:
         result = None
@@ -102,7 +222,12 @@ def _autodetect_conda_base() -> str | None:
         if base:
             return str(Path(base).expanduser())
 
-    conda_exe = os.environ.get("CONDA_EXE")
+    return _conda_base_from_exe(environ)
+
+
+def _conda_base_from_exe(environ: dict | None = None) -> str | None:
+    """Fallback when ``conda info --base`` is unavailable: derive the base from $CONDA_EXE."""
+    conda_exe = (os.environ if environ is None else environ).get("CONDA_EXE")
     if conda_exe:
         conda_path = Path(conda_exe).expanduser()
         if conda_path.name == "conda":
@@ -113,6 +238,19 @@ def _autodetect_conda_base() -> str | None:
 
 # ── helpers ──────────────────────────────────────────────────────────────────
 
+_SIZE = re.compile(r"^(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def _parse_size(value: str | int | None, what: str) -> int | None:
+    """Bytes from ``2G``, ``500M``, ``4096`` (binary units); None passes through."""
+    if value is None or isinstance(value, int):
+        return value
+    m = _SIZE.match(str(value).strip())
+    if not m:
+        sys.exit(f"error: invalid {what} {value!r} (expected e.g. 2G, 500M)")
+    return int(float(m.group(1)) * _SIZE_UNITS[m.group(2).upper()])
+
 
 def _deep_copy(d: dict) -> dict:
     import copy
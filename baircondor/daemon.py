@@ -0,0 +1,240 @@
+"""Long-lived local submit daemon.
+
+Keeps the resolved config and host/conda probes warm, and coalesces submissions that
+arrive within a short window into one ``condor_submit`` per group of compatible
+requests (same repo dir, environment and resource flags), reusing the sweep path.
+
+Protocol: one JSON request line per connection on a per-user Unix socket, answered by
+one JSON reply line. ``{"op": "ping"}`` checks liveness; ``{"op": "submit", ...}`` is
+sent by :func:`baircondor.client.forward_submit`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from .client import private_dir, request, socket_path
+from .config import _CONFIG_PATH, _autodetect_conda_base, load_config, resolve_conda
+from .meta import _git_info
+from .probes import run_probes
+from .submit import (
+    _get_submit_host,
+    _new_run_dir,
+    _prepare_batch,
+    _resolve_job,
+    _submit,
+    _submit_tasks,
+    _sweepable,
+    _validate_conda,
+    _write_run_files,
+)
+
+DEFAULT_WINDOW = 0.02  # seconds to wait for more submissions before calling condor_submit
+
+# request args that may differ between tasks of one coalesced cluster
+_PER_TASK_ARGS = ("command", "tag", "quiet")
+
+
+def serve(path: Path | None = None, window: float = DEFAULT_WINDOW) -> None:
+    """Run the daemon in the foreground until interrupted."""
+    path = path or socket_path()
+    private_dir(path.parent)
+    if request({"op": "ping"}, path, timeout=1.0):
+        sys.exit(f"error: a baircondor daemon is already listening on {path}")
+    path.unlink(missing_ok=True)
+    try:
+        asyncio.run(SubmitDaemon(window).serve(path))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        path.unlink(missing_ok=True)
+
+
+class SubmitDaemon:
+    def __init__(self, window: float = DEFAULT_WINDOW) -> None:
+        self.window = window
+        self.submit_host = _get_submit_host()
+        self._configs: dict[str, tuple[int | None, dict]] = {}
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._flush_task: asyncio.Task | None = None
+
+    async def serve(self, path: Path) -> None:
+        old_umask = os.umask(0o077)  # socket is only usable by its owner
+        try:
+            server = await asyncio.start_unix_server(self._handle, path=str(path))
+        finally:
+            os.umask(old_umask)
+        print(f"[baircondor] daemon listening on {path}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    # ── connection handling ──────────────────────────────────────────────────
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            req = json.loads(await reader.readline())
+            reply = await self._dispatch(req)
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            reply = {"ok": False, "error": f"bad request: {e}"}
+        writer.write(json.dumps(reply).encode() + b"\n")
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, req: dict) -> dict:
+        op = req.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if op != "submit":
+            return {"ok": False, "error": f"unknown op: {op!r}"}
+
+        command = list(req["args"].get("command") or [])
+        if command and command[0] == "--":
+            command = command[1:]
+        if not command:
+            return {"ok": False, "error": "a command is required after --"}
+        req["args"]["command"] = command
+
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append((req, fut))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+        return await fut
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.window)
+        pending, self._pending, self._flush_task = self._pending, [], None
+
+        groups: dict[str, list[tuple[dict, asyncio.Future]]] = {}
+        for req, fut in pending:
+            groups.setdefault(_group_key(req), []).append((req, fut))
+        await asyncio.gather(*(self._run_group(items) for items in groups.values()))
+
+    async def _run_group(self, items: list[tuple[dict, asyncio.Future]]) -> None:
+        reqs = [req for req, _ in items]
+        try:
+            replies = await asyncio.to_thread(self._submit_group, reqs)
+        except (SystemExit, Exception) as e:
+            replies = [_error_reply(e)] * len(reqs)
+        for (_, fut), reply in zip(items, replies):
+            if not fut.done():
+                fut.set_result(reply)
+
+    # ── submission (runs in a worker thread) ─────────────────────────────────
+
+    def _submit_group(self, reqs: list[dict]) -> list[dict]:
+        first = reqs[0]
+        args = SimpleNamespace(**first["args"])
+        job = _resolve_job(
+            args, cfg=self._config(getattr(args, "config", None)), repo_dir=Path(first["cwd"])
+        )
+        job["quiet"] = True
+        probed = run_probes(
+            {
+                "conda": lambda: _conda(job["cfg"], args, first["env"]),
+                "git": lambda: _git_info(job["repo_dir"], job["git_options"]),
+            }
+        )
+        conda, git = probed["conda"], probed["git"]
+        _validate_conda(conda)
+        # conda detection and staging run in the client's environment, not ours
+        conda = _prepare_batch(job, conda, first["env"])
+        commands = [req["args"]["command"] for req in reqs]
+        tags = [req["args"].get("tag") for req in reqs]
+
+        if len(reqs) == 1 or not _sweepable(job, tags):
+            # alone, or with run dirs a sweep's queue list can't hold: one submit each
+            return [self._submit_one(job, conda, git, req) for req in reqs]
+
+        run_dirs, cluster_id = _submit_tasks(
+            job,
+            conda,
+            commands,
+            tags,
+            self.submit_host,
+            git,
+            args.dry_run,
+            env=first["env"],
+            exit_on_failure=False,
+        )
+        return [
+            {
+                "ok": True,
+                "run_dir": str(run_dir),
+                "cluster_id": f"{cluster_id}.{proc}" if cluster_id else None,
+            }
+            for proc, run_dir in enumerate(run_dirs)
+        ]
+
+    def _submit_one(self, job: dict, conda: dict, git: dict, req: dict) -> dict:
+        args = req["args"]
+        try:
+            run_dir = _new_run_dir(job, args.get("tag"))
+            job_sub = _write_run_files(
+                run_dir, job, conda, "batch", args["command"], self.submit_host, git=git
+            )
+            cluster_id = _submit(
+                job_sub,
+                args["dry_run"],
+                run_dir,
+                job["repo_dir"],
+                True,
+                jobname=job["jobname"],
+                gpus=job["resources"]["gpus"],
+                command=args["command"],
+                user=job["user"],
+                env=req["env"],
+                project=job["project"],
+                exit_on_failure=False,
+            )
+        except (SystemExit, Exception) as e:
+            return _error_reply(e)
+        return {"ok": True, "run_dir": str(run_dir), "cluster_id": cluster_id}
+
+    def _config(self, config_path: str | None) -> dict:
+        """load_config, re-read only when the config file's mtime changes."""
+        path = Path(config_path) if config_path else _CONFIG_PATH
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        key = str(path)
+        cached = self._configs.get(key)
+        if cached is None or cached[0] != mtime:
+            cached = self._configs[key] = (mtime, load_config(config_path))
+        return cached[1]
+
+
+def _conda(cfg: dict, args, environ: dict) -> dict:
+    conda = resolve_conda(cfg, args, autodetect=False)
+    if conda["env"] and not conda["conda_base"]:
+        # cached on disk per CONDA_EXE/PATH, so clients in different envs don't mix
+        conda["conda_base"] = _autodetect_conda_base(environ)
+    return conda
+
+
+def _error_reply(e: BaseException) -> dict:
+    if isinstance(e, subprocess.CalledProcessError):
+        error = (e.stderr or "").strip() or f"condor_submit failed (exit {e.returncode})"
+        return {"ok": False, "error": error, "exit_code": e.returncode}
+    if isinstance(e, SystemExit):
+        # submit.py reports user errors (bad flags, missing env, ...) via sys.exit
+        code = e.code if isinstance(e.code, int) else 1
+        error = e.code.removeprefix("error: ") if isinstance(e.code, str) else f"exit {code}"
+        return {"ok": False, "error": error, "exit_code": code}
+    return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+def _group_key(req: dict) -> str:
+    """Requests with equal keys can share one submit file (and so one condor_submit)."""
+    shared = {k: v for k, v in req["args"].items() if k not in _PER_TASK_ARGS}
+    env_hash = hashlib.sha256(json.dumps(req["env"], sort_keys=True).encode()).hexdigest()
+    return json.dumps([req["cwd"], env_hash, shared], sort_keys=True)
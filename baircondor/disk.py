@@ -0,0 +1,163 @@
+"""`baircondor du` and `baircondor gc`: disk usage of run dirs and their cleanup.
+
+Runs come from the scratch index (runs.py). Sizes are summed with ``os.scandir`` in a
+thread pool, one run dir per task. A finished run's total is cached in ``du.json``
+with its directory mtime and reused until that changes, so repeated ``du`` calls only
+walk runs that are still active. ``gc`` deletes in the same bounded pool. It only ever
+deletes runs in a terminal state (done/failed/removed), taken from history where the
+run is in it, otherwise from its condor.log; runs whose state is unknown are kept.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shutil
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from . import cache
+from .history import HISTORY_FILE, TERMINAL_STATES, iter_entries, job_states
+
+WORKERS = 16
+
+_CACHE = "du.json"
+_AGE = re.compile(r"^(\d+(?:\.\d+)?)([hdw]?)$")
+_AGE_UNITS = {"h": 3600, "d": 86400, "w": 7 * 86400, "": 86400}
+
+
+def parse_age(text: str) -> timedelta:
+    """``30d``, ``12h``, ``2w`` or a bare number of days."""
+    m = _AGE.match(text.strip())
+    if not m:
+        raise ValueError(f"invalid age {text!r} (expected e.g. 30d, 12h, 2w)")
+    return timedelta(seconds=float(m.group(1)) * _AGE_UNITS[m.group(2)])
+
+
+def run_sizes(records: list[dict], workers: int = WORKERS) -> dict[str, int]:
+    """Disk usage in bytes of each run dir (0 if it vanished)."""
+    from .eventlog import log_states
+
+    cached = (cache.load(_CACHE) or {}).get("runs", {})
+    run_dirs = [r["run_dir"] for r in records]
+
+    def cached_size(run_dir: str) -> tuple[int, int | None]:
+        try:
+            mtime = os.stat(run_dir).st_mtime_ns
+        except OSError:
+            return -1, 0
+        hit = cached.get(run_dir)
+        return mtime, hit["bytes"] if hit and hit["mtime"] == mtime else None
+
+    with ThreadPoolExecutor(workers) as pool:
+        checked = dict(zip(run_dirs, pool.map(cached_size, run_dirs)))
+        todo = [d for d, (_, size) in checked.items() if size is None]
+        walked = dict(zip(todo, pool.map(_tree_size, todo)))
+
+    sizes = {d: size if size is not None else walked[d] for d, (_, size) in checked.items()}
+    # only finished runs stop growing; the rest are walked every time
+    runs = {d: c for d, c in cached.items() if d in checked and checked[d][1] is not None}
+    states = log_states(todo) if todo else {}
+    for d in todo:
+        if states.get(d, {}).get("status") in TERMINAL_STATES and checked[d][0] >= 0:
+            runs[d] = {"mtime": checked[d][0], "bytes": walked[d]}
+    if runs != cached:
+        cache.store(_CACHE, {"runs": runs})
+    return sizes
+
+
+def run_states(records: list[dict], history_file: Path = HISTORY_FILE) -> dict[str, str]:
+    """Status of each run: from history if it was submitted from here, else its condor.log."""
+    from .eventlog import log_states
+
+    wanted = {r["run_dir"] for r in records}
+    entries = {}
+    for entry in iter_entries(history_file=history_file):
+        run_dir = entry.get("run_dir")
+        if run_dir in wanted and run_dir not in entries and entry.get("cluster_id"):
+            entries[run_dir] = entry
+            if len(entries) == len(wanted):
+                break
+    statuses = {d: "?" for d in wanted}
+    if entries:
+        states = job_states(list(entries.values()), history_file)
+        statuses.update((d, s["status"]) for d, s in zip(entries, states))
+    rest = [d for d in wanted if d not in entries]
+    statuses.update((d, s["status"]) for d, s in log_states(rest).items())
+    return statuses
+
+
+def gc_candidates(
+    records: list[dict],
+    statuses: dict[str, str],
+    older_than: timedelta | None = None,
+    keep_last: int = 0,
+    status: set[str] | None = None,
+) -> list[dict]:
+    """Runs that may be deleted: finished, old enough, and not among the newest kept.
+
+    ``records`` are newest first; ``keep_last`` counts per (user, project, jobname),
+    active runs included. ``status`` narrows which terminal states qualify.
+    """
+    allowed = set(TERMINAL_STATES) & status if status else set(TERMINAL_STATES)
+    cutoff = (datetime.now() - older_than).isoformat() if older_than is not None else None
+    seen: dict[tuple, int] = defaultdict(int)
+    out = []
+    for r in records:
+        group = (r["user"], r["project"], r["jobname"])
+        seen[group] += 1
+        if seen[group] <= keep_last:
+            continue
+        if cutoff is not None and r["timestamp"] >= cutoff:
+            continue
+        if statuses.get(r["run_dir"]) in allowed:
+            out.append(r)
+    return out
+
+
+def delete_runs(run_dirs: list[str], workers: int = WORKERS) -> list[tuple[str, str]]:
+    """Remove run dirs in parallel; returns ``(run_dir, error)`` for those that failed."""
+
+    def remove(run_dir: str) -> str | None:
+        try:
+            shutil.rmtree(run_dir)
+        except OSError as e:
+            return str(e)
+        return None
+
+    with ThreadPoolExecutor(workers) as pool:
+        results = list(pool.map(remove, run_dirs))
+    return [(d, err) for d, err in zip(run_dirs, results) if err]
+
+
+def format_size(n: float) -> str:
+    for unit in ("B", "K", "M", "G", "T"):
+        if n < 1024 or unit == "T":
+            return f"{n:.0f}{unit}" if unit == "B" else f"{n:.1f}{unit}"
+        n /= 1024
+
+
+def _tree_size(path: str) -> int:
+    """Disk usage of a directory tree, counting hardlinked files once."""
+    total, seen, stack = 0, set(), [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for e in it:
+                    try:
+                        if e.is_dir(follow_symlinks=False):
+                            stack.append(e.path)
+                            continue
+                        st = e.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if st.st_nlink > 1:
+                        if st.st_ino in seen:
+                            continue
+                        seen.add(st.st_ino)
+                    total += st.st_blocks * 512
+        except OSError:
+            continue
+    return total
@@ -0,0 +1,136 @@
+"""Job status from the per-run condor.log user event log.
+
+Every run dir's job.sub sets ``log = <run_dir>/condor.log``, where HTCondor appends one
+event per state change (submit, execute, evict, hold, terminate, ...). Reading that file
+is a local read instead of a schedd query. Parsing is incremental: the byte offset and
+the state reached so far are kept per log in the ``eventlog.json`` cache, so a refresh
+only decodes the events appended since the last one.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+from . import cache
+from .history import TERMINAL_STATES
+
+_CACHE = "eventlog.json"
+_SEPARATOR = b"...\n"
+
+# event code -> resulting status; 005 (terminated) is decided by its return value
+_EVENT_STATUS = {
+    "000": "idle",  # submitted
+    "001": "running",  # executing
+    "004": "idle",  # evicted, will be rescheduled
+    "007": "idle",  # shadow exception, will be rescheduled
+    "009": "removed",  # aborted
+    "010": "held",  # suspended
+    "011": "running",  # unsuspended
+    "012": "held",
+    "013": "idle",  # released
+}
+
+_HEADER = re.compile(rb"^(\d{3}) \((\d+)\.(\d+)\.\d+\) (\S+ \S+) ")
+_RETURN_VALUE = re.compile(rb"Normal termination \(return value (-?\d+)\)")
+_HOST_ALIAS = re.compile(rb"alias=([^&>]+)")
+
+
+def log_states(run_dirs: list[str]) -> dict[str, dict]:
+    """Return the event-log state of each run dir that has a condor.log with events.
+
+    States look like history states: ``status`` plus, where known, ``cluster_id``,
+    ``host``, ``exit_code`` and ``completed``.
+    """
+    cached = (cache.load(_CACHE) or {}).get("runs", {})
+    runs = dict(cached)
+    states = {}
+    for run_dir in dict.fromkeys(run_dirs):
+        entry = read_log(Path(run_dir) / "condor.log", cached.get(run_dir))
+        if entry is None:
+            runs.pop(run_dir, None)
+            continue
+        if entry["state"].get("status"):
+            states[run_dir] = entry["state"]
+        # finished runs are recorded in history, so their offsets needn't be kept
+        if entry["state"].get("status") in TERMINAL_STATES:
+            runs.pop(run_dir, None)
+        else:
+            runs[run_dir] = entry
+    if runs != cached:
+        cache.store(_CACHE, {"runs": runs})
+    return states
+
+
+def read_log(path: Path, entry: dict | None = None) -> dict | None:
+    """Advance a cached ``{"ino", "offset", "state"}`` entry to the end of ``path``.
+
+    Only complete events are consumed, so a half-written trailing event is picked up on
+    the next call. Returns None if the log doesn't exist.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if entry is None or entry.get("ino") != st.st_ino or st.st_size < entry.get("offset", 0):
+        entry = {"ino": st.st_ino, "offset": 0, "state": {}}
+    if st.st_size == entry["offset"]:
+        return entry
+
+    try:
+        with open(path, "rb") as f:
+            f.seek(entry["offset"])
+            data = f.read()
+    except OSError:
+        return entry
+    end = data.rfind(_SEPARATOR)
+    if end < 0:
+        return entry
+    state = dict(entry["state"])
+    for event in data[:end].split(_SEPARATOR):
+        _apply(state, event.strip(b"\n"))
+    return {"ino": st.st_ino, "offset": entry["offset"] + end + len(_SEPARATOR), "state": state}
+
+
+def _apply(state: dict, event: bytes) -> None:
+    m = _HEADER.match(event)
+    if not m:
+        return
+    code, cluster, proc, when = m.groups()
+    code = code.decode()
+    state["cluster_id"] = f"{int(cluster)}.{int(proc)}"
+    if code == "005":
+        rv = _RETURN_VALUE.search(event)
+        if rv:
+            state["exit_code"] = int(rv.group(1))
+        else:  # abnormal termination (killed by a signal)
+            state.pop("exit_code", None)
+        state["status"] = "done" if state.get("exit_code") == 0 else "failed"
+        completed = _timestamp(when.decode())
+        if completed:
+            state["completed"] = completed
+    elif code in _EVENT_STATUS:
+        state["status"] = _EVENT_STATUS[code]
+        if code == "001":
+            alias = _HOST_ALIAS.search(event)
+            if alias:
+                state["host"] = alias.group(1).decode(errors="replace")
+        elif code == "000":
+            # a resubmission into the same log starts over
+            for key in ("exit_code", "completed", "host"):
+                state.pop(key, None)
+
+
+def _timestamp(text: str) -> str | None:
+    """Event times are ``YYYY-MM-DD HH:MM:SS`` (ISO logs) or ``MM/DD HH:MM:SS`` (legacy)."""
+    try:
+        return datetime.fromisoformat(text).isoformat(timespec="seconds")
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.strptime(f"{datetime.now().year}/{text}", "%Y/%m/%d %H:%M:%S")
+    except ValueError:
+        return None
+    return parsed.isoformat(timespec="seconds")
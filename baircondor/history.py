@@ -3,12 +3,22 @@
 from __future__ import annotations
 
 import json
+import os
 import subprocess
-from collections import deque
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager, suppress
 from datetime import datetime
+from itertools import count, islice
 from pathlib import Path
+from typing import BinaryIO
 
 HISTORY_FILE = Path.home() / ".local" / "share" / "baircondor" / "history.jsonl"
+_CHUNK_SIZE = 64 * 1024
+
+# the live JSONL file is rotated into a gzip segment once it passes either limit
+ROTATE_BYTES = 8 * 1024 * 1024
+ROTATE_AGE_DAYS = 90
 
 _STATUS_MAP = {
     "1": "idle",
@@ -21,6 +31,17 @@ _STATUS_MAP = {
 }
 
 
+def _status_style(status: str) -> str:
+    return {
+        "idle": "yellow",
+        "running": "green",
+        "done": "dim green",
+        "failed": "red",
+        "held": "red",
+        "removed": "dim red",
+    }.get(status, "dim")
+
+
 def append_entry(
     run_dir: Path,
     jobname: str,
@@ -29,42 +50,421 @@ def append_entry(
     command: list[str],
     user: str,
     history_file: Path = HISTORY_FILE,
+    project: str | None = None,
 ) -> None:
+    append_entries(
+        [make_entry(run_dir, jobname, cluster_id, gpus, command, user, project)], history_file
+    )
+
+
+def append_entries(entries: list[dict], history_file: Path = HISTORY_FILE) -> None:
+    """Append several entries (e.g. one per sweep task) as one locked write."""
+    if not entries:
+        return
+    db = _sqlite_path(history_file)
+    if db is not None:
+        _sqlite_append(db, entries)
+        return
     history_file.parent.mkdir(parents=True, exist_ok=True)
-    entry = {
+    rotate(history_file)
+    _locked_append(history_file, "".join(json.dumps(entry) + "\n" for entry in entries))
+
+
+def make_entry(
+    run_dir: Path,
+    jobname: str,
+    cluster_id: str | None,
+    gpus: int,
+    command: list[str],
+    user: str,
+    project: str | None = None,
+) -> dict:
+    return {
         "timestamp": datetime.now().isoformat(timespec="seconds"),
         "user": user,
         "jobname": jobname,
+        "project": project,
         "run_dir": str(run_dir),
         "cluster_id": cluster_id,
         "gpus": gpus,
         "command": command,
     }
-    with open(history_file, "a") as f:
-        f.write(json.dumps(entry) + "\n")
 
 
 def get_entries(
     n: int = 3,
     user: str | None = None,
     history_file: Path = HISTORY_FILE,
+    **filters,
 ) -> list[dict]:
+    """Return up to ``n`` entries, newest first; ``filters`` are passed to iter_entries."""
+    return list(islice(iter_entries(user=user, history_file=history_file, **filters), n))
+
+
+def iter_entries(
+    user: str | None = None,
+    history_file: Path = HISTORY_FILE,
+    chunk_size: int = _CHUNK_SIZE,
+    *,
+    jobname: str | None = None,
+    project: str | None = None,
+    cluster_id: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+) -> Iterator[dict]:
+    """Yield entries newest-first, optionally filtered.
+
+    ``cluster_id`` also matches the procs of a sweep (``C`` matches ``C.0``, ``C.1``...);
+    ``since``/``until`` are ISO timestamps or dates, ``until`` being exclusive. With the
+    SQLite backend the filters run against indexes. With JSONL the live file is read
+    backwards from EOF in chunks, then rotated segments newest-first; only as much as the
+    caller consumes is parsed, and segments whose timestamp range can't match are never
+    opened. Blank and unparseable lines (e.g. a torn trailing write) are skipped.
+    """
+    filters = {
+        "user": user,
+        "jobname": jobname,
+        "project": project,
+        "cluster_id": cluster_id,
+        "since": since,
+        "until": until,
+    }
+    db = _sqlite_path(history_file)
+    if db is not None:
+        yield from _sqlite_iter(db, filters)
+        return
     try:
-        lines = history_file.read_text().splitlines()
+        live = open(history_file, "rb")
     except FileNotFoundError:
-        return []
-    entries: deque[dict] = deque(maxlen=n)
+        live = None
+    source = None
+    if live is not None:
+        with live:
+            source = _file_id(os.fstat(live.fileno()))
+            yield from _parse_lines(_reverse_lines(live, chunk_size), filters)
+    for segment in reversed(_segments(history_file)):
+        # a segment made from the live file we just read (see rotate) holds nothing new
+        if source is not None and segment.get("source") == source:
+            continue
+        if _segment_may_match(segment, filters):
+            lines = _segment_lines(history_file.parent / segment["file"])
+            yield from _parse_lines(lines, filters)
+
+
+def _parse_lines(lines: Iterator[bytes], filters: dict) -> Iterator[dict]:
     for line in lines:
         line = line.strip()
         if not line:
             continue
         try:
             entry = json.loads(line)
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        if isinstance(entry, dict) and _matches(entry, filters):
+            yield entry
+
+
+def _live_lines(history_file: Path, chunk_size: int) -> Iterator[bytes]:
+    try:
+        f = open(history_file, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        yield from _reverse_lines(f, chunk_size)
+
+
+def _matches(entry: dict, filters: dict) -> bool:
+    for key in ("user", "jobname", "project"):
+        if filters[key] is not None and entry.get(key) != filters[key]:
+            return False
+    if filters["cluster_id"] is not None:
+        cid = str(entry.get("cluster_id"))
+        if cid != filters["cluster_id"] and not cid.startswith(filters["cluster_id"] + "."):
+            return False
+    ts = entry.get("timestamp", "")
+    if filters["since"] is not None and ts < filters["since"]:
+        return False
+    if filters["until"] is not None and ts >= filters["until"]:
+        return False
+    return True
+
+
+def _reverse_lines(f: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    """Yield the raw lines of a binary file last-to-first."""
+    pos = f.seek(0, os.SEEK_END)
+    head = b""  # partial line carried over from the chunk after this one
+    while pos > 0:
+        step = min(chunk_size, pos)
+        pos -= step
+        f.seek(pos)
+        lines = (f.read(step) + head).split(b"\n")
+        head = lines.pop(0)
+        yield from reversed(lines)
+    yield head
+
+
+# ── rotation ──────────────────────────────────────────────────────────────────
+#
+# Rotated segments live next to the live file as history.<rotated-at>.jsonl.gz. The
+# manifest (history.segments.json) lists them oldest-first with their min/max entry
+# timestamps so readers can skip segments outside a --since/--until window.
+
+
+def rotate(
+    history_file: Path = HISTORY_FILE,
+    max_bytes: int | None = None,
+    max_age_days: float | None = None,
+    force: bool = False,
+) -> Path | None:
+    """Compress the live JSONL file into a new segment if it is too big or too old.
+
+    The thresholds default to ROTATE_BYTES and ROTATE_AGE_DAYS. Returns the new segment's
+    path, or None if nothing was rotated.
+    """
+    max_bytes = ROTATE_BYTES if max_bytes is None else max_bytes
+    max_age_days = ROTATE_AGE_DAYS if max_age_days is None else max_age_days
+    if not force and not _needs_rotation(history_file, max_bytes, max_age_days):
+        return None
+    try:
+        fd = os.open(history_file, os.O_RDWR | os.O_APPEND)
+    except FileNotFoundError:
+        return None
+    # the whole rotation holds the append lock: appenders waiting on it notice the live
+    # file is gone and start a fresh one, and a concurrent rotation finds nothing to do
+    try:
+        with _locked(fd, history_file):
+            if not _is_current(fd, history_file):
+                return None
+            return _rotate_locked(history_file, fd)
+    finally:
+        os.close(fd)
+
+
+def _rotate_locked(history_file: Path, fd: int) -> Path | None:
+    """Turn the live file into a segment; the live file is removed only once it is listed.
+
+    Until then readers see its entries in the live file, and skip the new segment, which
+    records the live file's identity as ``source``, if that is the file they just read.
+    A rotation interrupted before the removal is finished by the next one. The file is
+    read through the locked ``fd``: closing any other descriptor for it would drop the
+    lockf() lock.
+    """
+    import gzip
+
+    source = _file_id(os.fstat(fd))
+    manifest = _segments(history_file)
+    if manifest and manifest[-1].get("source") == source:
+        history_file.unlink()
+        return None
+
+    buf = bytearray()
+    while chunk := os.pread(fd, _CHUNK_SIZE, len(buf)):
+        buf += chunk
+    data = bytes(buf)
+    timestamps = [
+        e.get("timestamp", "") for e in _parse_lines(iter(data.splitlines()), _NO_FILTERS)
+    ]
+    if not timestamps:
+        history_file.unlink()
+        return None
+
+    tmp = history_file.with_name(f".{history_file.name}.{os.getpid()}.rotating.gz")
+    with gzip.open(tmp, "wb") as f:
+        f.write(data)
+    segment = _link_segment(tmp, history_file)
+
+    # the manifest is replaced rather than rewritten in place, so concurrent rotations
+    # serialize on a lock file that stays put
+    lock = history_file.with_name(f".{history_file.stem}.segments.lock")
+    fd = os.open(lock, os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        with _locked(fd, lock):
+            manifest = _segments(history_file)
+            manifest.append(
+                {
+                    "file": segment.name,
+                    "min_ts": min(timestamps),
+                    "max_ts": max(timestamps),
+                    "entries": len(timestamps),
+                    "source": source,
+                }
+            )
+            _write_manifest(history_file, manifest)
+    finally:
+        os.close(fd)
+    history_file.unlink()
+    return segment
+
+
+def _file_id(st: os.stat_result) -> list:
+    # no appends happen while a rotation holds the lock, so size and mtime are stable
+    return [st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns]
+
+
+# ── locked appends ────────────────────────────────────────────────────────────
+#
+# O_APPEND alone isn't enough on NFS (each client computes the offset itself), so every
+# append takes an exclusive lockf() lock, which NFS forwards to the server, and writes
+# its lines with one os.write. Where the filesystem refuses POSIX locks, a lock file
+# created with link(2) (atomic on NFS) stands in.
+
+_LOCK_TIMEOUT = 10.0
+_LOCK_STALE = 30.0
+
+
+def _locked_append(path: Path, text: str) -> None:
+    data = text.encode()
+    while True:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            with _locked(fd, path):
+                # the file may have been rotated away while we waited for the lock
+                if _is_current(fd, path):
+                    view = memoryview(data)
+                    while view:
+                        view = view[os.write(fd, view) :]
+                    return
+        finally:
+            os.close(fd)
+
+
+def _is_current(fd: int, path: Path) -> bool:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    fst = os.fstat(fd)
+    return (st.st_dev, st.st_ino) == (fst.st_dev, fst.st_ino)
+
+
+@contextmanager
+def _locked(fd: int, path: Path) -> Iterator[None]:
+    try:
+        import fcntl
+
+        fcntl.lockf(fd, fcntl.LOCK_EX)
+    except (ImportError, OSError):  # e.g. ENOLCK: no lock daemon on this NFS mount
+        with _link_lock(path.with_name(f"{path.name}.lock")):
+            yield
+        return
+    try:
+        yield
+    finally:
+        fcntl.lockf(fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def _link_lock(lock: Path) -> Iterator[None]:
+    """Hold ``lock`` via the NFS-safe link(2) idiom, breaking it if it goes stale."""
+    import socket
+    import threading
+
+    mine = lock.with_name(
+        f"{lock.name}.{socket.gethostname()}.{os.getpid()}.{threading.get_ident()}"
+    )
+    mine.touch()
+    deadline = time.monotonic() + _LOCK_TIMEOUT
+    try:
+        while True:
+            with suppress(OSError):
+                os.link(mine, lock)
+            # link() over NFS can report failure after succeeding; the link count is truth
+            if os.stat(mine).st_nlink == 2:
+                break
+            try:
+                if time.time() - os.stat(lock).st_mtime > _LOCK_STALE:
+                    lock.unlink()
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"timed out waiting for history lock {lock}")
+            time.sleep(0.01)
+        try:
+            yield
+        finally:
+            lock.unlink(missing_ok=True)
+    finally:
+        mine.unlink(missing_ok=True)
+
+
+def _link_segment(tmp: Path, history_file: Path) -> Path:
+    """Give a finished segment its final name without ever replacing an existing one."""
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    for i in count():
+        suffix = f"-{i}" if i else ""
+        segment = history_file.with_name(f"{history_file.stem}.{stamp}{suffix}.jsonl.gz")
+        try:
+            os.link(tmp, segment)
+        except FileExistsError:
             continue
-        if user is None or entry.get("user") == user:
-            entries.append(entry)
-    return list(reversed(entries))
+        tmp.unlink()
+        return segment
+
+
+_NO_FILTERS = dict.fromkeys(("user", "jobname", "project", "cluster_id", "since", "until"))
+
+
+def _needs_rotation(history_file: Path, max_bytes: int, max_age_days: float) -> bool:
+    try:
+        with open(history_file, "rb") as f:
+            if os.fstat(f.fileno()).st_size >= max_bytes:
+                return True
+            first = f.readline()
+    except FileNotFoundError:
+        return False
+    try:
+        oldest = datetime.fromisoformat(json.loads(first)["timestamp"])
+    except (ValueError, KeyError, TypeError):
+        return False
+    return (datetime.now() - oldest).total_seconds() > max_age_days * 86400
+
+
+def _manifest_path(history_file: Path) -> Path:
+    return history_file.with_name(f"{history_file.stem}.segments.json")
+
+
+def _segments(history_file: Path) -> list[dict]:
+    """Segment records, oldest first."""
+    try:
+        manifest = json.loads(_manifest_path(history_file).read_text())
+        if isinstance(manifest, list):
+            return manifest
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError):
+        pass
+    # unreadable manifest: fall back to the segment files themselves, without time ranges
+    return [
+        {"file": p.name}
+        for p in sorted(history_file.parent.glob(f"{history_file.stem}.*.jsonl.gz"))
+    ]
+
+
+def _write_manifest(history_file: Path, manifest: list[dict]) -> None:
+    path = _manifest_path(history_file)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=1))
+    os.replace(tmp, path)
+
+
+def _segment_may_match(segment: dict, filters: dict) -> bool:
+    if filters["since"] is not None and segment.get("max_ts", "\uffff") < filters["since"]:
+        return False
+    if filters["until"] is not None and segment.get("min_ts", "") >= filters["until"]:
+        return False
+    return True
+
+
+def _segment_lines(path: Path) -> Iterator[bytes]:
+    import gzip
+
+    try:
+        with gzip.open(path, "rb") as f:
+            data = f.read()
+    except (OSError, EOFError):  # missing or truncated segment
+        return
+    yield from reversed(data.split(b"\n"))
 
 
 def get_last_dirs(
@@ -75,9 +475,312 @@ def get_last_dirs(
     return [Path(e["run_dir"]) for e in get_entries(n=n, user=user, history_file=history_file)]
 
 
+# ── SQLite backend ────────────────────────────────────────────────────────────
+#
+# Opt-in: used when history_file itself has a SQLite suffix, or when a history.sqlite
+# sits next to history.jsonl (created by migrate_to_sqlite / `baircondor history
+# --migrate`). Each row keeps the full entry as JSON plus indexed copies of the fields
+# the CLI filters on.
+
+_SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT,
+    user TEXT,
+    jobname TEXT,
+    project TEXT,
+    cluster_id TEXT,
+    run_dir TEXT,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_user ON entries (user, id);
+CREATE INDEX IF NOT EXISTS entries_jobname ON entries (jobname, id);
+CREATE INDEX IF NOT EXISTS entries_project ON entries (project, id);
+CREATE INDEX IF NOT EXISTS entries_cluster_id ON entries (cluster_id);
+CREATE INDEX IF NOT EXISTS entries_timestamp ON entries (timestamp);
+CREATE TABLE IF NOT EXISTS run_states (
+    run_dir TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    exit_code INTEGER,
+    completed TEXT,
+    log_size INTEGER
+);
+"""
+
+_INSERT = (
+    "INSERT INTO entries (timestamp, user, jobname, project, cluster_id, run_dir, entry)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _sqlite_path(history_file: Path) -> Path | None:
+    if history_file.suffix in _SQLITE_SUFFIXES:
+        return history_file
+    db = history_file.with_suffix(".sqlite")
+    return db if db.exists() else None
+
+
+def _connect(db: Path):
+    import sqlite3
+
+    db.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db, timeout=10)
+    # WAL lets `history` read while a submit (or the daemon) is writing
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _row(entry: dict) -> tuple:
+    cid = entry.get("cluster_id")
+    return (
+        entry.get("timestamp"),
+        entry.get("user"),
+        entry.get("jobname"),
+        entry.get("project"),
+        None if cid is None else str(cid),
+        entry.get("run_dir"),
+        json.dumps(entry),
+    )
+
+
+def _sqlite_append(db: Path, entries: list[dict]) -> None:
+    conn = _connect(db)
+    try:
+        with conn:
+            conn.executemany(_INSERT, [_row(e) for e in entries])
+    finally:
+        conn.close()
+
+
+def _sqlite_iter(db: Path, filters: dict) -> Iterator[dict]:
+    where, params = [], []
+    for key in ("user", "jobname", "project"):
+        if filters[key] is not None:
+            where.append(f"{key} = ?")
+            params.append(filters[key])
+    if filters["cluster_id"] is not None:
+        # a range instead of LIKE so the index is used: "C." <= id < "C/" covers "C.<proc>"
+        where.append("(cluster_id = ? OR (cluster_id >= ? AND cluster_id < ?))")
+        params += [filters["cluster_id"], filters["cluster_id"] + ".", filters["cluster_id"] + "/"]
+    if filters["since"] is not None:
+        where.append("timestamp >= ?")
+        params.append(filters["since"])
+    if filters["until"] is not None:
+        where.append("timestamp < ?")
+        params.append(filters["until"])
+    sql = "SELECT entry FROM entries"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY id DESC"
+
+    conn = _connect(db)
+    try:
+        for (text,) in conn.execute(sql, params):
+            yield json.loads(text)
+    finally:
+        conn.close()
+
+
+def migrate_to_sqlite(history_file: Path = HISTORY_FILE) -> tuple[Path, int | None]:
+    """Import history.jsonl into a sibling history.sqlite, which then becomes the store.
+
+    Returns the database path and the number of imported entries, or None if the
+    database already existed. The JSONL file is left untouched.
+    """
+    db = history_file.with_suffix(".sqlite")
+    if db.exists():
+        return db, None
+    # oldest-first so row ids preserve submission order
+    entries = list(iter_entries(history_file=history_file))[::-1]
+    tmp = db.with_name(f".{db.name}.{os.getpid()}.tmp")
+    conn = _connect(tmp)
+    try:
+        with conn:
+            conn.executemany(_INSERT, [_row(e) for e in entries])
+            conn.executemany(
+                _INSERT_STATE, [_state_row(d, st) for d, st in _jsonl_states(history_file)]
+            )
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    os.rename(tmp, db)
+    return db, len(entries)
+
+
+# ── job states ────────────────────────────────────────────────────────────────
+#
+# Terminal states are written back the first time they are observed, so finished jobs
+# never cost another condor_q/condor_history round trip. JSONL histories keep them in
+# an append-only history.states.jsonl sidecar; SQLite ones in the run_states table.
+#
+# They are keyed by run dir: cluster ids are per-schedd, and one history may be shared
+# by several submit hosts. Each record also keeps the size of the run's condor.log when
+# it was written, and is only trusted while the log still has that size, so the run's
+# own event log always wins over a recorded state.
+
+TERMINAL_STATES = ("done", "failed", "removed")
+
+_HISTORY_ATTRS = ["JobStatus", "ExitCode", "CompletionDate"]
+
+_INSERT_STATE = (
+    "INSERT OR REPLACE INTO run_states (run_dir, status, exit_code, completed, log_size)"
+    " VALUES (?, ?, ?, ?, ?)"
+)
+
+
+def job_states(
+    entries: list[dict], history_file: Path = HISTORY_FILE, timeout: float = 3.0
+) -> list[dict]:
+    """Return a state dict (``status``, maybe ``exit_code``/``completed``) per entry.
+
+    A terminal state recorded for the run is used while its condor.log is unchanged.
+    Otherwise the run's condor.log event log is the source (a local read, see
+    eventlog.py); only runs without usable log events fall back to query_job_states.
+    Terminal states are recorded for next time.
+    """
+    from .eventlog import log_states
+
+    ids = [None if e.get("cluster_id") is None else str(e["cluster_id"]) for e in entries]
+    dirs = [e.get("run_dir") for e in entries]
+    known = load_states([d for d, cid in zip(dirs, ids) if d and cid], history_file)
+    logged = log_states([d for d, cid in zip(dirs, ids) if d and cid and d not in known])
+    missing = list(
+        dict.fromkeys(
+            cid for d, cid in zip(dirs, ids) if cid and d not in known and d not in logged
+        )
+    )
+    fetched = query_job_states(missing, timeout) if missing else {}
+
+    states = []
+    terminal = {}
+    for d, cid in zip(dirs, ids):
+        if not cid:
+            state = _state("?")
+        elif d in known:
+            state = known[d]
+        elif d in logged:
+            state = {k: v for k, v in logged[d].items() if k != "cluster_id"}
+        else:
+            state = fetched.get(cid, _state("?"))
+        if d and cid and d not in known and state["status"] in TERMINAL_STATES:
+            terminal[d] = state
+        states.append(state)
+    record_states(terminal, history_file)
+    return states
+
+
+def load_states(run_dirs: list[str], history_file: Path = HISTORY_FILE) -> dict[str, dict]:
+    """Return the recorded terminal states of whichever ``run_dirs`` have a current one."""
+    wanted = set(run_dirs)
+    if not wanted:
+        return {}
+    found: dict[str, dict] = {}
+    db = _sqlite_path(history_file)
+    if db is not None:
+        conn = _connect(db)
+        try:
+            marks = ",".join("?" * len(wanted))
+            rows = conn.execute(
+                f"SELECT run_dir, status, exit_code, completed, log_size FROM run_states"
+                f" WHERE run_dir IN ({marks})",
+                list(wanted),
+            ).fetchall()
+        finally:
+            conn.close()
+        for run_dir, status, exit_code, completed, log_size in rows:
+            found[run_dir] = {**_state(status, exit_code, completed), "log_size": log_size}
+    else:
+        # newest-first, so we can stop once every requested run has turned up
+        for run_dir, state in _jsonl_states(history_file, newest_first=True):
+            if run_dir in wanted and run_dir not in found:
+                found[run_dir] = state
+                if len(found) == len(wanted):
+                    break
+    return {
+        run_dir: {k: v for k, v in state.items() if k != "log_size"}
+        for run_dir, state in found.items()
+        if state.get("log_size") == _log_size(run_dir)
+    }
+
+
+def record_states(states: dict[str, dict], history_file: Path = HISTORY_FILE) -> None:
+    """Record terminal ``{run_dir: state}``, stamped with each run's current log size."""
+    if not states:
+        return
+    stamped = {run_dir: {**st, "log_size": _log_size(run_dir)} for run_dir, st in states.items()}
+    db = _sqlite_path(history_file)
+    if db is not None:
+        conn = _connect(db)
+        try:
+            with conn:
+                conn.executemany(_INSERT_STATE, [_state_row(d, s) for d, s in stamped.items()])
+        finally:
+            conn.close()
+        return
+    path = _states_path(history_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _locked_append(
+        path, "".join(json.dumps({"run_dir": d, **s}) + "\n" for d, s in stamped.items())
+    )
+
+
+def _log_size(run_dir: str) -> int | None:
+    try:
+        return os.stat(Path(run_dir) / "condor.log").st_size
+    except OSError:
+        return None
+
+
+def _states_path(history_file: Path) -> Path:
+    return history_file.with_name(f"{history_file.stem}.states.jsonl")
+
+
+def _jsonl_states(history_file: Path, newest_first: bool = False) -> Iterator[tuple[str, dict]]:
+    path = _states_path(history_file)
+    if newest_first:
+        lines = _live_lines(path, _CHUNK_SIZE)
+    else:
+        try:
+            lines = iter(path.read_bytes().splitlines())
+        except FileNotFoundError:
+            return
+    for record in _parse_lines(lines, _NO_FILTERS):
+        # records from before states were keyed by run dir have no run_dir; skip them
+        run_dir = record.pop("run_dir", None)
+        if run_dir is not None and "status" in record:
+            yield run_dir, record
+
+
+def _state(status: str, exit_code: int | None = None, completed: str | None = None) -> dict:
+    state: dict = {"status": status}
+    if exit_code is not None:
+        state["exit_code"] = exit_code
+    if completed is not None:
+        state["completed"] = completed
+    return state
+
+
+def _state_row(run_dir: str, state: dict) -> tuple:
+    return (
+        run_dir,
+        state["status"],
+        state.get("exit_code"),
+        state.get("completed"),
+        state.get("log_size"),
+    )
+
+
 def get_job_status(cluster_id: str | None, timeout: float = 3.0) -> str:
     if cluster_id is None:
         return "?"
+    return query_job_state(cluster_id, timeout)["status"]
+
+
+def query_job_state(cluster_id: str, timeout: float = 3.0) -> dict:
+    """Ask HTCondor for a job's state: condor_q first, then condor_history."""
     try:
         result = subprocess.run(
             ["condor_q", str(cluster_id), "-format", "%d\n", "JobStatus"],
@@ -87,15 +790,132 @@ def get_job_status(cluster_id: str | None, timeout: float = 3.0) -> str:
         )
         code = result.stdout.strip()
         if code:
-            return _STATUS_MAP.get(code, "?")
+            return _state(_STATUS_MAP.get(code, "?"))
 
         result = subprocess.run(
-            ["condor_history", str(cluster_id), "-format", "%d\n", "JobStatus", "-match", "1"],
+            ["condor_history", str(cluster_id), "-af", *_HISTORY_ATTRS, "-match", "1"],
             capture_output=True,
             text=True,
             timeout=timeout,
         )
-        code = result.stdout.strip()
-        return _STATUS_MAP.get(code, "?")
-    except subprocess.TimeoutExpired:
-        return "?"
+        return _parse_history_state(result.stdout)
+    except (subprocess.TimeoutExpired, OSError):
+        return _state("?")
+
+
+def query_job_states(
+    cluster_ids: list[str], timeout: float = 3.0, check_queue: bool = True
+) -> dict[str, dict]:
+    """Resolve many jobs with one condor_q and one condor_history call.
+
+    ``cluster_ids`` are ``C`` or ``C.P`` strings. Jobs still in the queue come from
+    condor_q; only the remainder are looked up in condor_history. Both calls share
+    ``timeout``, and anything unresolved when it runs out is reported as ``?``. Pass
+    ``check_queue=False`` for jobs already known to have left the queue.
+    """
+    wanted = _wanted_ids(cluster_ids)
+    states = {str(cid): _state("?") for cid in cluster_ids}
+    deadline = time.monotonic() + timeout
+
+    def lookup(tool: list[str], attrs: list[str], procs: bool) -> None:
+        # a bare cluster id means a single-proc cluster, i.e. proc 0
+        jobs = {
+            (c, (p or "0") if procs else None)
+            for (c, p), cid in wanted.items()
+            if states[cid]["status"] == "?"
+        }
+        rows = _condor_af(tool, jobs, attrs, deadline - time.monotonic())
+        for cluster, proc, fields in rows or []:
+            cid = _match_id(wanted, cluster, proc)
+            if cid and states[cid]["status"] == "?":
+                states[cid] = _parse_history_state(" ".join(fields))
+
+    if check_queue:
+        lookup(["condor_q", "-allusers"], ["JobStatus"], procs=False)
+    unresolved = sum(states[cid]["status"] == "?" for cid in wanted.values())
+    # -match lets condor_history stop scanning once it has seen every job we need, so
+    # the constraint names exactly those procs rather than their whole clusters
+    lookup(["condor_history", "-match", str(unresolved)], _HISTORY_ATTRS, procs=True)
+    return states
+
+
+def _wanted_ids(cluster_ids: list[str]) -> dict[tuple[str, str | None], str]:
+    """Map ``(cluster, proc or None)`` to each well-formed ``C`` / ``C.P`` id."""
+    wanted: dict[tuple[str, str | None], str] = {}
+    for cid in cluster_ids:
+        cluster, _, proc = str(cid).partition(".")
+        if cluster.isdigit() and (not proc or proc.isdigit()):
+            wanted[(cluster, proc or None)] = str(cid)
+    return wanted
+
+
+def _match_id(wanted: dict, cluster: str, proc: str) -> str | None:
+    # a bare cluster id means a single-proc cluster, i.e. proc 0
+    return wanted.get((cluster, proc)) or (wanted.get((cluster, None)) if proc == "0" else None)
+
+
+def _condor_af(
+    tool: list[str], jobs: set[tuple[str, str | None]], attrs: list[str], timeout: float
+) -> list[tuple[str, str, list[str]]] | None:
+    """Run ``tool`` once for all ``jobs`` and return ``(cluster, proc, attr values)``.
+
+    ``jobs`` are ``(cluster, proc)`` pairs; a proc of None selects the whole cluster.
+    Returns None if there was nothing to ask or the query failed or timed out.
+    """
+    if not jobs or timeout <= 0:
+        return None
+    try:
+        result = subprocess.run(
+            [
+                *tool,
+                "-constraint",
+                _job_constraint(jobs),
+                "-af",
+                "ClusterId",
+                "ProcId",
+                *attrs,
+            ],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    if result.returncode != 0:  # e.g. schedd unreachable: no rows doesn't mean no jobs
+        return None
+    rows = []
+    for line in result.stdout.splitlines():
+        fields = line.split()
+        if len(fields) >= 2:
+            rows.append((fields[0], fields[1], fields[2:]))
+    return rows
+
+
+def _job_constraint(jobs: set[tuple[str, str | None]]) -> str:
+    """ClassAd constraint matching ``jobs`` (see _condor_af)."""
+    whole = {int(c) for c, p in jobs if p is None}
+    procs: dict[int, set[int]] = {}
+    for c, p in jobs:
+        if p is not None and int(c) not in whole:
+            procs.setdefault(int(c), set()).add(int(p))
+    terms = [f"member(ClusterId, {{{', '.join(map(str, sorted(whole)))}}})"] if whole else []
+    terms += [
+        f"(ClusterId == {c} && member(ProcId, {{{', '.join(map(str, sorted(ps)))}}}))"
+        for c, ps in sorted(procs.items())
+    ]
+    return " || ".join(terms)
+
+
+def _parse_history_state(stdout: str) -> dict:
+    """Parse ``JobStatus ExitCode CompletionDate`` (missing attributes print "undefined")."""
+    fields = stdout.split()
+    if not fields:
+        return _state("?")
+    status = _STATUS_MAP.get(fields[0], "?")
+    exit_code = int(fields[1]) if len(fields) > 1 and fields[1].lstrip("-").isdigit() else None
+    completed = None
+    if len(fields) > 2 and fields[2].isdigit() and int(fields[2]) > 0:
+        completed = datetime.fromtimestamp(int(fields[2])).isoformat(timespec="seconds")
+    if status == "done" and exit_code:
+        status = "failed"
+    return _state(status, exit_code, completed)
@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import socket
 import subprocess
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
+from . import cache
+
 
 def write_meta(
     run_dir: Path,
@@ -17,7 +22,25 @@ def write_meta(
     command: list[str],
     resources: dict,
     conda: dict,
+    git: dict | None = None,
 ) -> Path:
+    """Write meta.json; pass ``git`` to reuse repo info already collected for a sweep."""
+    path = run_dir / "meta.json"
+    path.write_text(render_meta(run_dir, repo_dir, jobname, mode, command, resources, conda, git))
+    return path
+
+
+def render_meta(
+    run_dir: Path,
+    repo_dir: Path,
+    jobname: str,
+    mode: str,
+    command: list[str],
+    resources: dict,
+    conda: dict,
+    git: dict | None = None,
+    snapshot: dict | None = None,
+) -> str:
     data = {
         "user": _get_user(),
         "hostname": socket.gethostname(),
@@ -29,47 +52,193 @@ def write_meta(
         "command": command,
         "resources": {k: v for k, v in resources.items() if v is not None},
         "conda": {k: v for k, v in conda.items() if v is not None},
-        "git": _git_info(repo_dir),
+        "git": git if git is not None else _git_info(repo_dir),
     }
-    path = run_dir / "meta.json"
-    path.write_text(json.dumps(data, indent=2) + "\n")
-    return path
+    if snapshot is not None:
+        data["snapshot"] = {k: snapshot[k] for k in ("id", "tree", "initialdir")}
+    return json.dumps(data, indent=2) + "\n"
 
 
 # ── helpers ──────────────────────────────────────────────────────────────────
 
 
 def _get_user() -> str:
-    import os
-
     return os.environ.get("USER") or os.environ.get("USERNAME") or "unknown"
 
 
-def _git_info(repo_dir: Path) -> dict:
+GIT_DEFAULTS: dict = {
+    "untracked": True,  # count untracked files when deciding whether the tree is dirty
+    "status_timeout": None,  # seconds; past this, fall back to tracked files only
+    "cache_ttl": 0,  # seconds to reuse git info for an unchanged tree; 0 disables
+}
+
+
+def _git_commands(options: dict) -> dict[str, list[str]]:
+    """name -> git argv; shared with the async probes in aio.py."""
+    status = ["git", "status", "--porcelain"]
+    if not options["untracked"]:
+        status.append("--untracked-files=no")
+    return {
+        "commit": ["git", "rev-parse", "HEAD"],
+        "branch": ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+        "status": status,
+    }
+
+
+_TRACKED_ONLY_STATUS = ["git", "status", "--porcelain", "--untracked-files=no"]
+
+
+def _git_info(repo_dir: Path, options: dict | None = None) -> dict:
+    options = {**GIT_DEFAULTS, **(options or {})}
+    info, located = _git_lookup(repo_dir, options)
+    if info is not None:
+        return info
+
+    commands = _git_commands(options)
     try:
-        commit = (
-            subprocess.check_output(
-                ["git", "rev-parse", "HEAD"], cwd=repo_dir, stderr=subprocess.DEVNULL
-            )
+        out = {
+            name: subprocess.check_output(cmd, cwd=repo_dir, stderr=subprocess.DEVNULL)
             .decode()
             .strip()
-        )
-        branch = (
-            subprocess.check_output(
-                ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-                cwd=repo_dir,
-                stderr=subprocess.DEVNULL,
+            for name, cmd in commands.items()
+            if name != "status"
+        }
+        untracked_checked = options["untracked"]
+        try:
+            out["status"] = _check_output_timeout(
+                commands["status"], repo_dir, options["status_timeout"]
             )
-            .decode()
-            .strip()
-        )
-        dirty = bool(
-            subprocess.check_output(
-                ["git", "status", "--porcelain"], cwd=repo_dir, stderr=subprocess.DEVNULL
-            )
-            .decode()
-            .strip()
-        )
-        return {"is_repo": True, "commit": commit, "branch": branch, "dirty": dirty}
+        except subprocess.TimeoutExpired:
+            out["status"] = _check_output_timeout(_TRACKED_ONLY_STATUS, repo_dir, None)
+            untracked_checked = False
+        info = _git_result(out, untracked_checked)
     except Exception:
         return {"is_repo": False}
+
+    _git_store(located, options, info)
+    return info
+
+
+def _check_output_timeout(cmd: list[str], cwd: Path, timeout: float | None) -> str:
+    result = subprocess.run(
+        cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=timeout
+    )
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, cmd)
+    return result.stdout.decode().strip()
+
+
+def _git_result(out: dict[str, str], untracked_checked: bool = True) -> dict:
+    """Build the meta.json ``git`` block from the stripped output of each git command."""
+    info = {
+        "is_repo": True,
+        "commit": out["commit"],
+        "branch": out["branch"],
+        "dirty": bool(out["status"]),
+    }
+    if not untracked_checked:
+        # "dirty" only reflects tracked files
+        info["untracked_checked"] = False
+    return info
+
+
+# ── git info cache ───────────────────────────────────────────────────────────
+
+
+def _git_lookup(repo_dir: Path, options: dict) -> tuple[dict | None, tuple | None]:
+    """Answer from the cache or the filesystem when possible, without forking git.
+
+    Returns ``(info, located)``: ``info`` when it is known already, and otherwise the
+    ``(worktree top, git dir)`` a freshly computed result should be cached for (None
+    when it can't be cached).
+    """
+    if "GIT_DIR" in os.environ or "GIT_WORK_TREE" in os.environ:
+        return None, None
+    located = _find_git_dir(repo_dir)
+    if located is None:
+        return {"is_repo": False}, None
+    if not options["cache_ttl"]:
+        return None, None
+
+    key = _git_cache_key(*located, options)
+    cached = cache.load(_git_cache_name(key))
+    if (
+        cached is not None
+        and cached.get("key") == key
+        and time.time() - cached.get("time", 0) < options["cache_ttl"]
+    ):
+        return cached["info"], None
+    return None, located
+
+
+def _git_store(located: tuple | None, options: dict, info: dict) -> None:
+    if located is None or not info.get("is_repo"):
+        return
+    # fingerprint after running git: ``git status`` may have refreshed the index
+    key = _git_cache_key(*located, options)
+    cache.store(_git_cache_name(key), {"key": key, "time": time.time(), "info": info})
+
+
+def _git_cache_name(key: list) -> str:
+    return f"git/{hashlib.sha1(key[0].encode()).hexdigest()}.json"
+
+
+def _find_git_dir(repo_dir: Path) -> tuple[Path, Path] | None:
+    """Return ``(worktree top, git dir)`` for ``repo_dir``, following ``.git`` files."""
+    repo_dir = repo_dir.absolute()
+    for top in (repo_dir, *repo_dir.parents):
+        dotgit = top / ".git"
+        if dotgit.is_dir():
+            return top, dotgit
+        if dotgit.is_file():
+            try:
+                text = dotgit.read_text().strip()
+            except OSError:
+                return None
+            if text.startswith("gitdir:"):
+                return top, (top / text[len("gitdir:") :].strip()).resolve()
+            return None
+    return None
+
+
+def _git_cache_key(top: Path, git_dir: Path, options: dict) -> list:
+    """Fingerprint of the repo state that determines commit, branch and dirty.
+
+    HEAD (and the ref it points at) pins commit and branch; the index stat changes on
+    add/commit/checkout; the worktree root's mtime changes when top-level entries are
+    created or removed. Edits to tracked files that touch none of these are picked up
+    once the entry is older than ``cache_ttl``.
+    """
+    common_dir = git_dir
+    commondir_file = git_dir / "commondir"
+    if commondir_file.is_file():
+        common_dir = (git_dir / commondir_file.read_text().strip()).resolve()
+
+    head = _read_text(git_dir / "HEAD")
+    ref = None
+    if head and head.startswith("ref:"):
+        ref_name = head[len("ref:") :].strip()
+        ref = _read_text(common_dir / ref_name) or _stat_sig(common_dir / "packed-refs")
+    return [
+        str(top),
+        head,
+        ref,
+        _stat_sig(git_dir / "index"),
+        _stat_sig(top),
+        options["untracked"],
+    ]
+
+
+def _read_text(path: Path) -> str | None:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def _stat_sig(path: Path) -> list[int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
@@ -0,0 +1,24 @@
+"""Run independent environment probes concurrently.
+
+Submission needs the submit host (``hostname -f``), the conda base (possibly
+``conda info --base``) and git info; none depends on another, so running them side by
+side bounds the wait by the slowest probe instead of their sum.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+
+def run_probes(probes: dict[str, Callable[[], Any]]) -> dict[str, Any]:
+    """Call each zero-argument probe in its own thread and return ``{name: result}``.
+
+    Exceptions propagate from the first failed probe (in dict order), after all finish.
+    """
+    if len(probes) <= 1:
+        return {name: probe() for name, probe in probes.items()}
+    with ThreadPoolExecutor(max_workers=len(probes), thread_name_prefix="probe") as ex:
+        futures = {name: ex.submit(probe) for name, probe in probes.items()}
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,139 @@
+"""`baircondor runs`: every run dir under scratch, whether or not it is in history.
+
+Run dirs live at ``<scratch>/<runs_subdir>/<user>/[<project>/]<jobname>/<run id>``; a
+directory holding a meta.json is a run. The tree is walked level by level with
+``os.scandir`` in a thread pool (both calls release the GIL, and on NFS each one is a
+round trip worth overlapping). What the walk finds is kept in an index in the cache,
+keyed by each directory's mtime: a directory whose mtime hasn't changed still has the
+same entries, so its runs are reused without reading their meta.json and only its other
+subdirectories are stat'ed again. Re-scanning an unchanged tree therefore costs one
+stat per jobname/project directory, not one per run.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from . import cache
+
+WORKERS = 16
+
+_VERSION = 1
+# a directory modified this recently may change again within the same mtime tick
+# (coarse on some NFS servers), so it isn't trusted on the next scan
+_RACY_NS = 2_000_000_000
+
+
+def runs_root(cfg: dict, scratch: str | None = None, runs_subdir: str | None = None) -> Path:
+    """``<scratch>/<runs_subdir>``, from the arguments or the config defaults."""
+    scratch = scratch or cfg["defaults"]["scratch"]
+    return Path(scratch).expanduser() / (runs_subdir or cfg["defaults"]["runs_subdir"])
+
+
+def scan(root: Path, user: str | None = None, workers: int = WORKERS) -> list[dict]:
+    """Return a record for every run under ``root`` (one user's runs if ``user``), newest first.
+
+    Records have ``run_dir``, ``user``, ``project``, ``jobname``, ``timestamp`` (local,
+    like history entries) and, from meta.json, ``mode``, ``command``, ``hostname`` and
+    ``commit``.
+    """
+    top = root / user if user else root
+    name = f"runs/{hashlib.sha1(str(top).encode()).hexdigest()[:16]}.json"
+    index = cache.load(name) or {}
+    if index.get("version") != _VERSION:
+        index = {}
+    old_dirs, old_runs = index.get("dirs", {}), index.get("runs", {})
+
+    dirs: dict[str, dict] = {}
+    runs: dict[str, dict] = {}
+    now = time.time_ns()
+
+    def visit(path: str) -> tuple[str, dict] | None:
+        return _visit(path, root, old_dirs.get(path), old_runs.get(path), now)
+
+    frontier = [str(top)]
+    with ThreadPoolExecutor(workers) as pool:
+        while frontier:
+            children = []
+            for path, found in zip(frontier, pool.map(visit, frontier)):
+                if found is None:
+                    continue
+                kind, entry = found
+                if kind == "run":
+                    runs[path] = entry
+                    continue
+                dirs[path] = entry
+                unchanged = entry is old_dirs.get(path)
+                for sub in entry["subdirs"]:
+                    child = os.path.join(path, sub)
+                    if unchanged and old_runs.get(child, {}).get("mtime", -1) != -1:
+                        runs[child] = old_runs[child]
+                    else:
+                        children.append(child)
+            frontier = children
+
+    if dirs != old_dirs or runs != old_runs:
+        cache.store(name, {"version": _VERSION, "dirs": dirs, "runs": runs})
+    return sorted(runs.values(), key=lambda r: r["timestamp"], reverse=True)
+
+
+def _visit(
+    path: str, root: Path, old_dir: dict | None, old_run: dict | None, now: int
+) -> tuple[str, dict] | None:
+    """Classify ``path`` as ("dir", entry) or ("run", record); None if it's gone."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    if old_dir is not None and old_dir["mtime"] == mtime:
+        return "dir", old_dir
+    if old_run is not None and old_run["mtime"] == mtime:
+        return "run", old_run
+
+    subdirs, is_run = [], False
+    try:
+        with os.scandir(path) as it:
+            for e in it:
+                if e.name == "meta.json":
+                    is_run = True
+                elif not e.name.startswith(".") and e.is_dir(follow_symlinks=False):
+                    subdirs.append(e.name)
+    except OSError:
+        return None
+    trusted = mtime if now - mtime >= _RACY_NS else -1  # -1: look again next time
+    if is_run:
+        return "run", {**_record(Path(path), root, mtime), "mtime": trusted}
+    return "dir", {"mtime": trusted, "subdirs": sorted(subdirs)}
+
+
+def _record(run_dir: Path, root: Path, mtime: int) -> dict:
+    try:
+        meta = json.loads((run_dir / "meta.json").read_text())
+        if not isinstance(meta, dict):
+            meta = {}
+    except (OSError, ValueError):  # unreadable or half-written: still a run
+        meta = {}
+    parts = run_dir.relative_to(root).parts  # user, [project], jobname, run id
+    try:
+        # meta.json times are UTC; history (and sorting) uses naive local time
+        when = datetime.fromisoformat(meta["timestamp"]).astimezone().replace(tzinfo=None)
+    except (KeyError, TypeError, ValueError):
+        when = datetime.fromtimestamp(mtime / 1e9)
+    git = meta.get("git") if isinstance(meta.get("git"), dict) else {}
+    return {
+        "run_dir": str(run_dir),
+        "user": meta.get("user") or (parts[0] if len(parts) >= 3 else None),
+        "project": parts[1] if len(parts) == 4 else None,
+        "jobname": meta.get("jobname") or (parts[-2] if len(parts) >= 2 else None),
+        "timestamp": when.isoformat(timespec="seconds"),
+        "mode": meta.get("mode"),
+        "command": meta.get("command", []),
+        "hostname": meta.get("hostname"),
+        "commit": git.get("commit"),
+    }
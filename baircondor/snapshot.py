@@ -0,0 +1,244 @@
+"""Content-addressed snapshots of a git checkout, so queued jobs don't run edited code.
+
+With ``snapshot.enabled`` (or ``--snapshot``), a batch job's initialdir is a frozen copy
+of the submitting checkout's tracked files instead of the live checkout. The copies
+live in a per-user store next to the run dirs::
+
+    <scratch>/<runs_subdir>/<user>/.snapshots/
+        objects/ab/cdef0123...      one read-only file per distinct blob (``...x``:
+                                    executable)
+        trees/<id>/                 a materialized worktree, every file hardlinked (or
+                                    reflinked) from objects/
+        trees/<id>.json             its manifest: path -> [git mode, blob id]
+
+Blob ids are git's own, read from the index for files that match it and hashed here
+only for files with unstaged changes. The tree id hashes the manifest, so a sweep
+submitted from one checkout materializes a single tree, and a later submission after
+a small edit costs one link per file plus copies of the changed blobs. Untracked and
+ignored files are not part of a snapshot, and submodules are skipped.
+
+Store objects are read-only because trees hardlink them: a job that tries to rewrite a
+tracked file gets a permission error instead of corrupting every other snapshot. On
+filesystems with reflinks (btrfs, XFS) trees get independent copy-on-write files instead.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import errno
+import hashlib
+import json
+import os
+import shutil
+import socket
+import stat
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+WORKERS = 16
+STORE_DIRNAME = ".snapshots"
+_READ_SIZE = 1 << 20
+_FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+_SYMLINK, _GITLINK, _EXECUTABLE = "120000", "160000", "100755"
+
+
+def store_dir(scratch: str, runs_subdir: str, user: str) -> Path:
+    return Path(scratch) / runs_subdir / user / STORE_DIRNAME
+
+
+def snapshot(repo_dir: Path, store: Path, workers: int = WORKERS) -> dict:
+    """Snapshot the tracked files of the checkout containing ``repo_dir`` into ``store``.
+
+    Returns ``{"id", "tree", "initialdir", "files"}``: ``tree`` is the
+    materialized worktree and ``initialdir`` the counterpart of ``repo_dir`` inside it.
+    Raises ``ValueError`` when ``repo_dir`` is not in a git checkout.
+    """
+    top = _toplevel(repo_dir)
+    objects, trees = store / "objects", store / "trees"
+    with ThreadPoolExecutor(workers) as pool:
+        manifest = _manifest(top, pool)
+        tree = trees / _tree_id(manifest)
+        if not tree.is_dir():
+            # storing can change an id: a file edited since it was hashed is stored as read
+            ids = pool.map(lambda item: _store_blob(top, objects, *item), manifest.items())
+            manifest = {path: (mode, b) for (path, (mode, _)), b in zip(manifest.items(), ids)}
+            tree = trees / _tree_id(manifest)
+            if not tree.is_dir():
+                _materialize(tree, objects, manifest, pool)
+
+    rel = Path(repo_dir).resolve().relative_to(top)
+    return {
+        "id": tree.name,
+        "tree": str(tree),
+        "initialdir": str(tree / rel) if rel.parts else str(tree),
+        "files": len(manifest),
+    }
+
+
+def _tree_id(manifest: dict) -> str:
+    return hashlib.sha1(json.dumps(manifest, sort_keys=True).encode()).hexdigest()[:20]
+
+
+# ── manifest ─────────────────────────────────────────────────────────────────
+
+
+def _toplevel(repo_dir: Path) -> Path:
+    try:
+        out = subprocess.check_output(
+            ["git", "rev-parse", "--show-toplevel"], cwd=repo_dir, stderr=subprocess.DEVNULL
+        )
+    except (OSError, subprocess.CalledProcessError):
+        raise ValueError(f"{repo_dir} is not inside a git checkout") from None
+    return Path(out.decode().strip()).resolve()
+
+
+def _git_z(top: Path, *args: str) -> list[str]:
+    out = subprocess.check_output(["git", *args, "-z"], cwd=top)
+    return [item for item in out.decode("utf-8", "surrogateescape").split("\0") if item]
+
+
+def _manifest(top: Path, pool: ThreadPoolExecutor) -> dict[str, tuple[str, str]]:
+    """``{path: (git mode, blob id)}`` for the worktree's tracked files.
+
+    Ids come from the index except for files that differ from it (or are unmerged),
+    which are hashed here. A symlink's "id" is its target.
+    """
+    manifest: dict[str, tuple[str, str | None]] = {}
+    for line in _git_z(top, "ls-files", "--stage"):
+        info, path = line.split("\t", 1)
+        mode, blob, stage = info.split()
+        if mode == _GITLINK:
+            continue
+        manifest[path] = (mode, blob if stage == "0" and mode != _SYMLINK else None)
+    for path in _git_z(top, "diff-files", "--name-only"):
+        if path in manifest:
+            manifest[path] = (manifest[path][0], None)
+
+    unknown = [path for path, (_, blob) in manifest.items() if blob is None]
+    for path, entry in zip(unknown, pool.map(lambda p: _worktree_entry(top / p), unknown)):
+        if entry is None:
+            del manifest[path]  # deleted in the worktree
+        else:
+            manifest[path] = entry
+    return manifest
+
+
+def _worktree_entry(path: Path) -> tuple[str, str] | None:
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return None
+    if stat.S_ISLNK(st.st_mode):
+        return _SYMLINK, os.readlink(path)
+    return _hash_file(path)
+
+
+def _hash_file(path: Path) -> tuple[str, str]:
+    """``(git mode, blob id)`` of a regular file, computed the way ``git hash-object`` does."""
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        digest = hashlib.sha1(b"blob %d\0" % st.st_size)
+        while chunk := f.read(_READ_SIZE):
+            digest.update(chunk)
+    return _EXECUTABLE if st.st_mode & 0o111 else "100644", digest.hexdigest()
+
+
+# ── object store ─────────────────────────────────────────────────────────────
+
+
+def _object_path(objects: Path, mode: str, blob: str) -> Path:
+    return objects / blob[:2] / (blob[2:] + ("x" if mode == _EXECUTABLE else ""))
+
+
+def _store_blob(top: Path, objects: Path, path: str, entry: tuple[str, str]) -> str:
+    """Copy ``path`` into the store unless its blob is there already; return the blob id.
+
+    The copy is hashed as it is written, so a file that changed since its id was taken
+    is stored (and returned) under the id of what was actually copied.
+    """
+    mode, blob = entry
+    if mode == _SYMLINK or _object_path(objects, mode, blob).exists():
+        return blob
+
+    objects.mkdir(parents=True, exist_ok=True)
+    # the store lives on shared scratch, so pids alone can collide across nodes
+    tmp = objects / f".{socket.gethostname()}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(top / path, "rb") as f, open(tmp, "wb") as out:
+        size = os.fstat(f.fileno()).st_size
+        digest = hashlib.sha1(b"blob %d\0" % size)
+        while chunk := f.read(_READ_SIZE):
+            digest.update(chunk)
+            out.write(chunk)
+        copied = out.tell()
+    # a blob's hash starts with its size; if the file grew or shrank mid-copy, redo it
+    actual = digest.hexdigest() if copied == size else _hash_file(tmp)[1]
+    tmp.chmod(0o555 if mode == _EXECUTABLE else 0o444)
+    dest = _object_path(objects, mode, actual)
+    dest.parent.mkdir(exist_ok=True)
+    os.replace(tmp, dest)  # same content either way, so racing another writer is harmless
+    return actual
+
+
+# ── trees ────────────────────────────────────────────────────────────────────
+
+
+def _materialize(tree: Path, objects: Path, manifest: dict, pool: ThreadPoolExecutor) -> None:
+    """Build ``tree`` in a temporary sibling and rename it into place.
+
+    Concurrent submissions of the same checkout may race to build one tree; the loser
+    discards its copy.
+    """
+    tmp = tree.parent / f".{tree.name}.{socket.gethostname()}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    try:
+        for d in sorted({os.path.dirname(p) for p in manifest}):
+            (tmp / d).mkdir(parents=True, exist_ok=True)
+        link = _Linker()
+        list(pool.map(lambda item: link(objects, tmp / item[0], *item[1]), manifest.items()))
+        (tmp.parent / f"{tmp.name}.json").write_text(json.dumps(manifest, sort_keys=True))
+        os.replace(tmp.parent / f"{tmp.name}.json", tree.parent / f"{tree.name}.json")
+        try:
+            os.rename(tmp, tree)
+        except OSError as e:
+            if e.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+                raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+class _Linker:
+    """Place one store object at a tree path: reflink where supported, else hardlink."""
+
+    def __init__(self):
+        self.reflink = sys.platform == "linux"  # dropped after the first failure
+
+    def __call__(self, objects: Path, dest: Path, mode: str, blob: str) -> None:
+        if mode == _SYMLINK:
+            os.symlink(blob, dest)
+            return
+        src = _object_path(objects, mode, blob)
+        if self.reflink and self._reflink(src, dest, mode):
+            return
+        try:
+            os.link(src, dest)
+        except OSError:  # e.g. the filesystem has no hardlinks
+            shutil.copy2(src, dest)
+
+    def _reflink(self, src: Path, dest: Path, mode: str) -> bool:
+        import fcntl
+
+        with open(src, "rb") as s, open(dest, "wb") as d:
+            try:
+                fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+            except OSError:
+                self.reflink = False
+            else:
+                # a reflink is a private copy, so the job may write to it
+                os.chmod(dest, 0o755 if mode == _EXECUTABLE else 0o644)
+                return True
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(dest)
+        return False
@@ -2,26 +2,55 @@
 
 from __future__ import annotations
 
+import contextlib
 import os
-import random
 import re
-import string
+import shutil
+import socket
 import subprocess
 import sys
+import threading
+import time
+import zlib
 from datetime import datetime
+from itertools import count
 from pathlib import Path
 
 from rich.console import Console
 from rich.markup import escape
 
-from .config import get_user, load_config, resolve_conda, resolve_pin_submit_host, resolve_resources
-from .history import append_entry
-from .meta import write_meta
-from .templates import write_job_sub, write_run_sh
+from .condaenv import cache_dir, cached_activation, packed_env
+from .config import (
+    get_user,
+    load_config,
+    resolve_conda,
+    resolve_conda_cache,
+    resolve_conda_pack,
+    resolve_output,
+    resolve_pin_submit_host,
+    resolve_resources,
+    resolve_snapshot,
+)
+from .history import append_entries, append_entry, make_entry
+from .meta import _git_info, render_meta
+from .probes import run_probes
+from .snapshot import snapshot, store_dir
+from .templates import _render_job_sub, _render_run_sh, _render_sweep_sub, capture_script
 
 _console = Console(stderr=True)
 _PREFIX = f"[dim]{escape('[baircondor]')}[/dim]"
 
+INTERACTIVE_COMMAND = ["/bin/bash", "-i"]
+
+# run-dir ids: per-process monotonic microsecond clock + sequence number
+_RUN_ID_LOCK = threading.Lock()
+_RUN_ID_SEQ = count()
+_last_run_us = 0
+_CLAIM_ATTEMPTS = 16
+# condor splits a queue item list on whitespace and commas, so a sweep's run dirs can't
+# contain either
+_QUEUE_UNSAFE = re.compile(r"[\s,]")
+
 
 def _log(msg: str, quiet: bool) -> None:
     if not quiet:
@@ -29,135 +58,328 @@ def _log(msg: str, quiet: bool) -> None:
 
 
 def _get_submit_host() -> str:
-    """Return the submit host exactly as reported by the local host configuration."""
-    return subprocess.check_output(["hostname", "-f"], text=True).strip().lower()
+    """Return the submit host exactly as reported by the local host configuration.
+
+    Falls back to the resolver's view (``socket.getfqdn``) if ``hostname`` is unusable.
+    """
+    try:
+        return subprocess.check_output(["hostname", "-f"], text=True).strip().lower()
+    except (OSError, subprocess.CalledProcessError):
+        return socket.getfqdn().lower()
 
 
 def run_submit(args) -> Path:
-    cfg = load_config(getattr(args, "config", None))
-    resources = resolve_resources(cfg, args)
-    conda = resolve_conda(cfg, args)
-    pin_submit_host = resolve_pin_submit_host(cfg, args)
+    job = _resolve_job(args)
+    command = _strip_command(args.command)
 
-    # strip leading "--" separator that argparse REMAINDER captures
-    command = args.command
-    if command and command[0] == "--":
-        command = command[1:]
-    if not command:
-        sys.exit("error: a command is required after --")
+    submit_host, conda, git = _probe(job, args)
+    _validate_conda(conda)
+    conda = _prepare_batch(job, conda)
+    run_dir = _new_run_dir(job, getattr(args, "tag", None))
 
-    repo_dir = Path.cwd()
-    submit_host = _get_submit_host()
-    user = get_user()
-    jobname = args.jobname or repo_dir.name
-    scratch = args.scratch or cfg["defaults"]["scratch"]
-    scratch = str(Path(scratch).expanduser())
-    runs_subdir = getattr(args, "runs_subdir", None) or cfg["defaults"]["runs_subdir"]
-    run_dir = _make_run_dir(
-        scratch,
-        runs_subdir,
-        jobname,
-        getattr(args, "project", None),
-        getattr(args, "tag", None),
+    job_sub = _write_run_files(run_dir, job, conda, "batch", command, submit_host, git=git)
+
+    _submit(
+        job_sub,
+        args.dry_run,
+        run_dir,
+        job["repo_dir"],
+        job["quiet"],
+        jobname=job["jobname"],
+        gpus=job["resources"]["gpus"],
+        command=command,
+        user=job["user"],
+        project=job["project"],
     )
 
+    return run_dir
+
+
+def run_submit_many(args) -> list[Path]:
+    """Submit every command in ``args.commands`` as one proc of a single condor cluster.
+
+    Host, conda and git detection run once for the whole sweep; each task still gets its
+    own run dir (run.sh, a standalone job.sub, meta.json) and its own history entry.
+    """
+    job = _resolve_job(args)
+
+    commands = [c[1:] if c and c[0] == "--" else list(c) for c in args.commands]
+    if not commands:
+        sys.exit("error: at least one command is required")
+    if not all(commands):
+        sys.exit("error: every sweep task needs a non-empty command")
+    tags = getattr(args, "tags", None) or [getattr(args, "tag", None)] * len(commands)
+    if len(tags) != len(commands):
+        sys.exit(f"error: got {len(tags)} tags for {len(commands)} commands")
+
+    submit_host, conda, git = _probe(job, args)
     _validate_conda(conda)
+    conda = _prepare_batch(job, conda)
+
+    try:
+        run_dirs, _ = _submit_tasks(
+            job,
+            conda,
+            commands,
+            tags,
+            submit_host,
+            git,
+            args.dry_run,
+        )
+    except ValueError as e:
+        sys.exit(f"error: {e}")
+    return run_dirs
 
-    quiet = getattr(args, "quiet", False)
-    run_dir.mkdir(parents=True, exist_ok=False)
-    _log(f"📁 Created run dir: {run_dir}", quiet)
 
-    run_sh = write_run_sh(run_dir, repo_dir, jobname, resources, conda)
-    _log("📝 Generated run.sh", quiet)
-    write_job_sub(
-        run_dir,
-        repo_dir,
-        resources,
-        jobname,
-        submit_host,
-        pin_submit_host,
-        cfg["condor"]["omit_request_gpus_when_zero"],
-    )
-    _log("📝 Generated job.sub", quiet)
-    write_meta(run_dir, repo_dir, jobname, "batch", command, resources, conda)
-    _log("📝 Generated meta.json", quiet)
+def run_interactive(args) -> Path:
+    job = _resolve_job(args, default_jobname="interactive")
 
-    job_sub = run_dir / "job.sub"
-    # patch job.sub: replace $(args) placeholder with actual arguments
-    _patch_args(job_sub, run_sh, command)
+    submit_host, conda, git = _probe(job, args)
+    _validate_conda(conda)
+    run_dir = _new_run_dir(job, getattr(args, "tag", None))
 
-    _submit(
+    job_sub = _write_run_files(
+        run_dir, job, conda, "interactive", INTERACTIVE_COMMAND, submit_host, git=git
+    )
+
+    _submit_interactive(
         job_sub,
         args.dry_run,
         run_dir,
-        repo_dir,
-        quiet,
-        jobname=jobname,
-        gpus=resources["gpus"],
-        command=command,
-        user=user,
+        job["quiet"],
+        jobname=job["jobname"],
+        gpus=job["resources"]["gpus"],
+        user=job["user"],
+        project=job["project"],
     )
 
     return run_dir
 
 
-def run_interactive(args) -> Path:
-    cfg = load_config(getattr(args, "config", None))
-    resources = resolve_resources(cfg, args)
-    conda = resolve_conda(cfg, args)
-    pin_submit_host = resolve_pin_submit_host(cfg, args)
-
-    repo_dir = Path.cwd()
-    submit_host = _get_submit_host()
-    user = get_user()
-    jobname = args.jobname or "interactive"
+# ── shared steps (also used by the async path in aio.py) ────────────────────
+
+
+def _resolve_job(
+    args,
+    default_jobname: str | None = None,
+    cfg: dict | None = None,
+    repo_dir: Path | None = None,
+) -> dict:
+    """Resolve everything about a submission that needs no subprocess (conda is separate).
+
+    ``cfg`` and ``repo_dir`` default to the config file and the current directory; the
+    daemon passes its cached config and the client's working directory instead.
+    """
+    if cfg is None:
+        cfg = load_config(getattr(args, "config", None))
+    repo_dir = repo_dir or Path.cwd()
     scratch = args.scratch or cfg["defaults"]["scratch"]
-    scratch = str(Path(scratch).expanduser())
-    runs_subdir = getattr(args, "runs_subdir", None) or cfg["defaults"]["runs_subdir"]
-    run_dir = _make_run_dir(
-        scratch,
-        runs_subdir,
-        jobname,
-        getattr(args, "project", None),
-        getattr(args, "tag", None),
+    return {
+        "cfg": cfg,
+        "resources": resolve_resources(cfg, args),
+        "pin_submit_host": resolve_pin_submit_host(cfg, args),
+        "omit_gpus_when_zero": cfg["condor"]["omit_request_gpus_when_zero"],
+        "repo_dir": repo_dir,
+        "user": get_user(),
+        "jobname": args.jobname or default_jobname or repo_dir.name,
+        "scratch": str(Path(scratch).expanduser()),
+        "runs_subdir": getattr(args, "runs_subdir", None) or cfg["defaults"]["runs_subdir"],
+        "project": getattr(args, "project", None),
+        "output": resolve_output(cfg, args),
+        "snapshot": resolve_snapshot(cfg, args),
+        "conda_cache": resolve_conda_cache(cfg, args),
+        "conda_pack": resolve_conda_pack(cfg, args),
+        "quiet": getattr(args, "quiet", False),
+        "git_options": cfg.get("git"),
+    }
+
+
+def _probe(job: dict, args) -> tuple[str, dict, dict]:
+    """Detect submit host, conda base and git info concurrently."""
+    probed = run_probes(
+        {
+            "submit_host": _get_submit_host,
+            "conda": lambda: resolve_conda(job["cfg"], args),
+            "git": lambda: _git_info(job["repo_dir"], job["git_options"]),
+        }
     )
+    return probed["submit_host"], probed["conda"], probed["git"]
 
-    _validate_conda(conda)
 
-    quiet = getattr(args, "quiet", False)
-    run_dir.mkdir(parents=True, exist_ok=False)
-    _log(f"📁 Created run dir: {run_dir}", quiet)
+def _prepare_batch(job: dict, conda: dict, environ: dict | None = None) -> dict:
+    """Run the once-per-submission steps batch jobs may need, concurrently.
+
+    Takes the repo snapshot (see _take_snapshot) and returns ``conda``, extended with
+    what run.sh needs for a packed env (``packed``) or a cached activation
+    (``activation``) when either mode is on. ``environ`` is the submitter's
+    environment when it isn't ours (the daemon's clients).
+    """
+    probed = run_probes(
+        {
+            "snapshot": lambda: _take_snapshot(job),
+            "conda": lambda: _stage_conda(job, conda, environ),
+        }
+    )
+    return probed["conda"]
+
+
+def _stage_conda(job: dict, conda: dict, environ: dict | None = None) -> dict:
+    if not conda.get("env") or not (job["conda_pack"] or job["conda_cache"]):
+        return conda
+    directory = cache_dir(job["scratch"], job["runs_subdir"], job["user"])
+    if job["conda_pack"]:
+        try:
+            packed = packed_env(conda, directory, environ)
+        except RuntimeError as e:
+            sys.exit(f"error: --pack-conda-env: {e}")
+        _log(f"📦 Packed env : {packed['tarball']}", job["quiet"])
+        return {**conda, "packed": {**packed, **job["conda_pack"]}}
+
+    activation = cached_activation(conda, directory, environ)
+    if activation is None:
+        _log("⚠️  Could not cache conda activation; jobs will activate normally", job["quiet"])
+        return conda
+    return {**conda, "activation": activation}
+
 
-    command = ["/bin/bash", "-i"]
-    run_sh = write_run_sh(run_dir, repo_dir, jobname, resources, conda)
-    _log("📝 Generated run.sh", quiet)
-    write_job_sub(
+def _take_snapshot(job: dict) -> None:
+    """With ``snapshot`` on, freeze the checkout's tracked files for batch runs.
+
+    Stores the result (see snapshot.snapshot) as ``job["snapshot_tree"]``; taken once
+    per submission, so every task of a sweep shares one tree.
+    """
+    if not job["snapshot"]:
+        return
+    store = store_dir(job["scratch"], job["runs_subdir"], job["user"])
+    try:
+        tree = snapshot(job["repo_dir"], store)
+    except ValueError as e:
+        sys.exit(f"error: --snapshot needs a git checkout: {e}")
+    job["snapshot_tree"] = tree
+    _log(f"🧊 Snapshot : {tree['tree']} ({tree['files']} files)", job["quiet"])
+
+
+def _strip_command(command: list[str]) -> list[str]:
+    # strip leading "--" separator that argparse REMAINDER captures
+    if command and command[0] == "--":
+        command = command[1:]
+    if not command:
+        sys.exit("error: a command is required after --")
+    return command
+
+
+def _new_run_dir(job: dict, tag: str | None) -> Path:
+    """Claim a fresh run dir by creating it empty; its contents are staged in later.
+
+    ``mkdir`` is atomic even across hosts sharing the filesystem, so a name clash (in
+    practice impossible given _run_id) just means picking another name.
+    """
+    for _ in range(_CLAIM_ATTEMPTS):
+        run_dir = _make_run_dir(
+            job["scratch"], job["runs_subdir"], job["jobname"], job["project"], tag
+        )
+        run_dir.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.mkdir(run_dir)
+        except FileExistsError:
+            continue
+        return run_dir
+    sys.exit(f"error: could not allocate a unique run dir under {run_dir.parent}")
+
+
+def _render_run_files(
+    run_dir: Path,
+    job: dict,
+    conda: dict,
+    mode: str,
+    command: list[str],
+    submit_host: str,
+    git: dict | None = None,
+) -> dict[str, tuple[str, int]]:
+    """Render run.sh, job.sub and meta.json in memory as ``{name: (content, mode)}``.
+
+    Batch runs with size-capped output also get capture.py.
+    """
+    repo_dir, jobname, resources = job["repo_dir"], job["jobname"], job["resources"]
+    output = _capture_output(job, mode)
+    tree = _snapshot_tree(job, mode)
+    if git is None:
+        git = _git_info(repo_dir, job["git_options"])
+    job_sub = _render_job_sub(
         run_dir,
-        repo_dir,
+        Path(tree["initialdir"]) if tree else repo_dir,
         resources,
         jobname,
         submit_host,
-        pin_submit_host,
-        cfg["condor"]["omit_request_gpus_when_zero"],
+        job["pin_submit_host"],
+        job["omit_gpus_when_zero"],
+        _format_args(run_dir / "run.sh", command),
+        capture=output is not None,
+    )
+    meta = render_meta(
+        run_dir, repo_dir, jobname, mode, command, resources, conda, git, snapshot=tree
     )
-    _log("📝 Generated job.sub", quiet)
-    write_meta(run_dir, repo_dir, jobname, "interactive", command, resources, conda)
-    _log("📝 Generated meta.json", quiet)
+    run_sh = _render_run_sh(
+        run_dir, repo_dir, jobname, resources, conda, output, tree and tree["initialdir"]
+    )
+    files = {
+        "run.sh": (run_sh, 0o777),
+        "job.sub": (job_sub, 0o666),
+        "meta.json": (meta, 0o666),
+    }
+    if output is not None:
+        files["capture.py"] = (capture_script(), 0o666)
+    return files
 
-    job_sub = run_dir / "job.sub"
-    _patch_args(job_sub, run_sh, command)
 
-    _submit_interactive(
-        job_sub,
-        args.dry_run,
-        run_dir,
-        quiet,
-        jobname=jobname,
-        gpus=resources["gpus"],
-        user=user,
-    )
+def _capture_output(job: dict, mode: str) -> dict | None:
+    # an interactive shell needs its terminal, not a pipe
+    return job.get("output") if mode == "batch" else None
 
-    return run_dir
+
+def _snapshot_tree(job: dict, mode: str) -> dict | None:
+    # interactive sessions stay in the live checkout, where edits are the point
+    return job.get("snapshot_tree") if mode == "batch" else None
+
+
+def _stage_run_dir(run_dir: Path, files: dict[str, tuple[str, int]]) -> None:
+    """Write ``files`` into a temporary sibling dir and rename it to ``run_dir``.
+
+    ``run_dir`` may already exist as the empty dir claimed by _new_run_dir; the rename
+    replaces it atomically. Readers never see a half-written run dir, and a crash leaves
+    at most a hidden ``.<name>.<pid>.tmp`` sibling behind. File modes are passed to
+    ``os.open`` (and so filtered by the umask) rather than fixed up afterwards with chmod.
+    """
+    tmp = run_dir.parent / f".{run_dir.name}.{os.getpid()}.tmp"
+    os.mkdir(tmp)
+    try:
+        for name, (content, mode) in files.items():
+            fd = os.open(tmp / name, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+            with open(fd, "w") as f:
+                f.write(content)
+        os.rename(tmp, run_dir)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        with contextlib.suppress(OSError):
+            os.rmdir(run_dir)  # release the claim; fails harmlessly if it isn't ours/empty
+        raise
+
+
+def _write_run_files(
+    run_dir: Path,
+    job: dict,
+    conda: dict,
+    mode: str,
+    command: list[str],
+    submit_host: str,
+    git: dict | None = None,
+) -> Path:
+    """Render and atomically stage ``run_dir`` with run.sh, job.sub, meta.json; return job.sub."""
+    quiet = job["quiet"]
+    _stage_run_dir(run_dir, _render_run_files(run_dir, job, conda, mode, command, submit_host, git))
+    _log(f"📁 Created run dir: {run_dir}", quiet)
+    _log("📝 Generated run.sh, job.sub, meta.json", quiet)
+    return run_dir / "job.sub"
 
 
 # ── helpers ──────────────────────────────────────────────────────────────────
@@ -171,18 +393,50 @@ def _make_run_dir(
     if not os.access(scratch_path, os.W_OK):
         sys.exit(f"error: --scratch path is not writable: {scratch}")
 
-    user = get_user()
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    shortid = "".join(random.choices(string.ascii_lowercase + string.digits, k=6))
-    dirname = f"{timestamp}_{shortid}"
+    dirname = _run_id()
     if tag:
         dirname = f"{dirname}_{tag}"
+    return _run_dir_parent(scratch, runs_subdir, jobname, project) / dirname
 
-    parts = [scratch_path, runs_subdir, user]
+
+def _run_dir_parent(scratch: str, runs_subdir: str, jobname: str, project: str | None) -> Path:
+    parts = [Path(scratch), runs_subdir, get_user()]
     if project:
         parts.append(project)
-    parts += [jobname, dirname]
-    return Path(*parts)
+    return Path(*parts, jobname)
+
+
+def _sweepable(job: dict, tags: list[str | None]) -> bool:
+    """Whether run dirs for ``tags`` can be listed in a sweep's queue (see _QUEUE_UNSAFE)."""
+    parent = _run_dir_parent(job["scratch"], job["runs_subdir"], job["jobname"], job["project"])
+    return not any(_QUEUE_UNSAFE.search(p) for p in (str(parent), *(t for t in tags if t)))
+
+
+def _run_id() -> str:
+    """Return a sortable, collision-free id: ``YYYYMMDD_HHMMSS_<usec>_<node><seq>``.
+
+    The timestamp has microsecond resolution and never repeats or goes backwards within
+    a process. ``node`` (4 base-36 chars) hashes host and pid, so concurrent submitters
+    on any host differ, and ``seq`` (2 chars) counts ids within the process.
+    """
+    global _last_run_us
+    with _RUN_ID_LOCK:
+        _last_run_us = max(time.time_ns() // 1000, _last_run_us + 1)
+        us = _last_run_us
+    seconds, micros = divmod(us, 1_000_000)
+    node = zlib.crc32(f"{socket.gethostname()}:{os.getpid()}".encode()) % 36**4
+    seq = next(_RUN_ID_SEQ) % 36**2
+    stamp = datetime.fromtimestamp(seconds).strftime("%Y%m%d_%H%M%S")
+    return f"{stamp}_{micros:06d}_{_base36(node, 4)}{_base36(seq, 2)}"
+
+
+def _base36(n: int, width: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    out = ""
+    for _ in range(width):
+        n, d = divmod(n, 36)
+        out = digits[d] + out
+    return out
 
 
 def _validate_conda(conda: dict) -> None:
@@ -193,6 +447,75 @@ def _validate_conda(conda: dict) -> None:
         )
 
 
+def _submit_tasks(
+    job: dict,
+    conda: dict,
+    commands: list[list[str]],
+    tags: list[str | None],
+    submit_host: str,
+    git: dict,
+    dry_run: bool,
+    env: dict | None = None,
+    exit_on_failure: bool = True,
+) -> tuple[list[Path], str | None]:
+    """Create one run dir per command and submit them all as a single cluster.
+
+    Returns the run dirs (in proc order) and the cluster id, if one was submitted.
+    Raises ValueError, before creating anything, when the run dirs can't be queued
+    (see _sweepable); ``exit_on_failure`` is as for _check_submit_result.
+    """
+    quiet = job["quiet"]
+    repo_dir = job["repo_dir"]
+
+    if not _sweepable(job, tags):
+        raise ValueError(
+            "sweep run dirs can't contain whitespace or a comma (condor splits its queue"
+            " list on them); choose a --scratch, --jobname, --project and --tag without them"
+        )
+    # pick every path first so each run dir can be staged in one go, including the
+    # cluster-wide sweep.sub that lives next to the first task's job.sub
+    run_dirs = [_new_run_dir(job, tag) for tag in tags]
+    tasks = [
+        (run_dir, _format_args(run_dir / "run.sh", command))
+        for run_dir, command in zip(run_dirs, commands)
+    ]
+    tree = _snapshot_tree(job, "batch")
+    sweep_text = _render_sweep_sub(
+        Path(tree["initialdir"]) if tree else repo_dir,
+        job["resources"],
+        job["jobname"],
+        submit_host,
+        job["pin_submit_host"],
+        job["omit_gpus_when_zero"],
+        tasks,
+        capture=_capture_output(job, "batch") is not None,
+    )
+    for i, (run_dir, command) in enumerate(zip(run_dirs, commands)):
+        files = _render_run_files(run_dir, job, conda, "batch", command, submit_host, git)
+        if i == 0:
+            files["sweep.sub"] = (sweep_text, 0o666)
+        _stage_run_dir(run_dir, files)
+    sweep_sub = run_dirs[0] / "sweep.sub"
+    _log(f"📁 Created {len(run_dirs)} run dirs under {run_dirs[0].parent}", quiet)
+    _log(f"📝 Generated sweep.sub ({len(tasks)} procs)", quiet)
+
+    cluster_id = _submit_many(
+        sweep_sub,
+        dry_run,
+        run_dirs,
+        repo_dir,
+        quiet,
+        jobname=job["jobname"],
+        gpus=job["resources"]["gpus"],
+        commands=commands,
+        user=job["user"],
+        project=job["project"],
+        env=env,
+        exit_on_failure=exit_on_failure,
+    )
+    return run_dirs, cluster_id
+
+
 def _condor_escape_arg(arg: str) -> str:
     """Escape one argument for HTCondor new-syntax arguments line.
 
@@ -205,14 +528,10 @@ def _condor_escape_arg(arg: str) -> str:
     return result
 
 
-def _patch_args(job_sub: Path, run_sh: Path, command: list[str]) -> None:
-    """Replace the __ARGS_PLACEHOLDER__ in job.sub with a properly quoted argument string."""
+def _format_args(run_sh: Path, command: list[str]) -> str:
+    """Return the escaped contents of the arguments line (without the outer double quotes)."""
     parts = [str(run_sh), "--"] + command
-    inner = " ".join(_condor_escape_arg(p) for p in parts)
-    arg_line = f'arguments = "{inner}"'
-    text = job_sub.read_text()
-    text = text.replace("arguments = __ARGS_PLACEHOLDER__", arg_line)
-    job_sub.write_text(text)
+    return " ".join(_condor_escape_arg(p) for p in parts)
 
 
 def _submit(
@@ -225,8 +544,25 @@ def _submit(
     gpus: int = 0,
     command: list[str] | None = None,
     user: str = "",
-) -> None:
+    env: dict | None = None,
+    project: str | None = None,
+    exit_on_failure: bool = True,
+) -> str | None:
     cmd = ["condor_submit", str(job_sub)]
+    _log_submit_paths(job_sub, run_dir, repo_dir, quiet)
+
+    if dry_run:
+        _log(f"🧪 [dry-run] would run: {' '.join(cmd)}", quiet)
+        return None
+
+    # job.sub uses getenv = True, so condor_submit's environment is the job's environment
+    result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    return _record_submit(
+        result, run_dir, quiet, jobname, gpus, command or [], user, project, exit_on_failure
+    )
+
+
+def _log_submit_paths(job_sub: Path, run_dir: Path, repo_dir: Path, quiet: bool) -> None:
     _log(f"🗂️  Repo dir : {repo_dir}", quiet)
     _log(f"📂 Run dir  : {run_dir}", quiet)
     _log(f"📄 Stdout   : {run_dir}/stdout.txt", quiet)
@@ -234,26 +570,106 @@ def _submit(
     _log(f"📋 Log      : {run_dir}/condor.log", quiet)
     _log(f"🔁 Reproduce: condor_submit {job_sub}", quiet)
 
-    if dry_run:
-        _log(f"🧪 [dry-run] would run: {' '.join(cmd)}", quiet)
-        return
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+def _check_submit_result(result: subprocess.CompletedProcess, exit_on_failure: bool = True) -> None:
+    """Echo condor_submit's output and exit with its status if it failed.
+
+    With ``exit_on_failure=False`` a failure raises CalledProcessError instead, for
+    callers (asyncio tasks, the daemon) where one failed submission must not exit.
+    """
     if result.stdout:
         print(result.stdout, end="")
     if result.stderr:
         print(result.stderr, end="", file=sys.stderr)
     if result.returncode != 0:
         _log(f"❌ condor_submit failed (exit {result.returncode})", quiet=False)
+        if not exit_on_failure:
+            result.check_returncode()
         sys.exit(result.returncode)
 
+
+def _record_submit(
+    result: subprocess.CompletedProcess,
+    run_dir: Path,
+    quiet: bool,
+    jobname: str,
+    gpus: int,
+    command: list[str],
+    user: str,
+    project: str | None = None,
+    exit_on_failure: bool = True,
+) -> str | None:
+    _check_submit_result(result, exit_on_failure)
+
     m = re.search(r"submitted to cluster (\d+)", result.stdout)
     cluster_id = m.group(1) if m else None
     if cluster_id:
         _log(f"🚀 Submitted — cluster {cluster_id}", quiet)
     _log("✅ Done.", quiet)
 
-    append_entry(run_dir, jobname, cluster_id, gpus, command or [], user)
+    append_entry(run_dir, jobname, cluster_id, gpus, command, user, project=project)
+    return cluster_id
+
+
+def _submit_many(
+    sweep_sub: Path,
+    dry_run: bool,
+    run_dirs: list[Path],
+    repo_dir: Path,
+    quiet: bool = False,
+    jobname: str = "",
+    gpus: int = 0,
+    commands: list[list[str]] | None = None,
+    user: str = "",
+    env: dict | None = None,
+    project: str | None = None,
+    exit_on_failure: bool = True,
+) -> str | None:
+    cmd = ["condor_submit", str(sweep_sub)]
+    _log(f"🗂️  Repo dir : {repo_dir}", quiet)
+    _log(f"📂 Run dirs : {run_dirs[0]} ... ({len(run_dirs)} total)", quiet)
+    _log(f"🔁 Reproduce: condor_submit {sweep_sub}", quiet)
+
+    if dry_run:
+        _log(f"🧪 [dry-run] would run: {' '.join(cmd)}", quiet)
+        return None
+
+    result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    _check_submit_result(result, exit_on_failure)
+
+    cluster_id, count = _parse_cluster(result.stdout)
+    if cluster_id and count != len(run_dirs):
+        _log(f"⚠️  condor reported {count} procs for {len(run_dirs)} tasks", quiet=False)
+    if cluster_id:
+        _log(f"🚀 Submitted — cluster {cluster_id}, procs 0-{len(run_dirs) - 1}", quiet)
+    _log("✅ Done.", quiet)
+
+    commands = commands or [[] for _ in run_dirs]
+    append_entries(
+        [
+            # procs are numbered in queue order, so task i is <cluster>.<i>
+            make_entry(
+                run_dir,
+                jobname,
+                f"{cluster_id}.{proc}" if cluster_id else None,
+                gpus,
+                command,
+                user,
+                project,
+            )
+            for proc, (run_dir, command) in enumerate(zip(run_dirs, commands))
+        ]
+    )
+    return cluster_id
+
+
+def _parse_cluster(stdout: str) -> tuple[str | None, int]:
+    """Parse ``N job(s) submitted to cluster C.`` into ``(C, N)``."""
+    m = re.search(r"(\d+) job\(s\) submitted to cluster (\d+)", stdout)
+    if m:
+        return m.group(2), int(m.group(1))
+    m = re.search(r"submitted to cluster (\d+)", stdout)
+    return (m.group(1), 1) if m else (None, 0)
 
 
 def _submit_interactive(
@@ -264,6 +680,7 @@ def _submit_interactive(
     jobname: str = "",
     gpus: int = 0,
     user: str = "",
+    project: str | None = None,
 ) -> None:
     cmd = ["condor_submit", "-interactive", str(job_sub)]
     _log(f"📂 Run dir  : {run_dir}", quiet)
@@ -272,7 +689,7 @@ def _submit_interactive(
         _log(f"🧪 [dry-run] would run: {' '.join(cmd)}", quiet)
         return
 
-    append_entry(run_dir, jobname, None, gpus, ["/bin/bash", "-i"], user)
+    append_entry(run_dir, jobname, None, gpus, INTERACTIVE_COMMAND, user, project=project)
 
     result = subprocess.run(cmd)
     if result.returncode != 0:
@@ -0,0 +1,103 @@
+"""`baircondor tail`: follow stdout/stderr of many run dirs in one process.
+
+One loop serves every file: it sleeps on inotify (where available) and re-stats every
+file each POLL seconds anyway, because jobs on execute nodes write to the shared
+filesystem where the local kernel sees no events. Files that don't exist yet are picked
+up when the job starts writing them. Lines are printed with a ``<run> out|err`` prefix.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import TextIO
+
+from .watch import _Inotify
+
+POLL = 1.0
+STREAMS = {"stdout.txt": "out", "stderr.txt": "err"}
+
+
+def follow(
+    run_dirs: list[Path],
+    out: TextIO | None = None,
+    from_start: bool = False,
+    stop: Callable[[], bool] | None = None,
+    use_inotify: bool = True,
+) -> None:
+    """Print new lines from every run's stdout/stderr until ``stop()`` is true (or ^C).
+
+    Existing files are followed from their current end unless ``from_start``; files
+    created later are always read from the beginning.
+    """
+    out = out or sys.stdout
+    width = max(len(d.name) for d in run_dirs)
+    files: dict[tuple[Path, str], dict] = {}
+    for run_dir in run_dirs:
+        for name, stream in STREAMS.items():
+            path = run_dir / name
+            try:
+                offset = 0 if from_start else path.stat().st_size
+            except OSError:
+                offset = 0
+            files[(run_dir, name)] = {
+                "path": path,
+                "prefix": f"{run_dir.name:<{width}} {stream} | ",
+                "offset": offset,
+                "partial": b"",
+            }
+
+    watcher = _Inotify.create() if use_inotify else None
+    try:
+        if watcher is not None:
+            for run_dir in run_dirs:
+                watcher.watch(run_dir)
+        last_poll = 0.0
+        while not (stop and stop()):
+            if time.monotonic() - last_poll >= POLL:
+                for f in files.values():
+                    _drain(f, out)
+                last_poll = time.monotonic()
+            # wake early on local writes; never sleep past the next poll
+            timeout = max(0.0, last_poll + POLL - time.monotonic())
+            if watcher is None:
+                time.sleep(min(timeout, 0.2) if stop else timeout)
+                continue
+            for key in watcher.read(min(timeout, 0.2) if stop else timeout):
+                if key in files:
+                    _drain(files[key], out)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if watcher is not None:
+            watcher.close()
+        for f in files.values():
+            if f["partial"]:
+                out.write(f["prefix"] + f["partial"].decode(errors="replace") + "\n")
+        out.flush()
+
+
+def _drain(f: dict, out: TextIO) -> None:
+    """Print whatever complete lines were appended to ``f["path"]`` since last time."""
+    try:
+        size = os.stat(f["path"]).st_size
+    except OSError:
+        return
+    if size < f["offset"]:  # truncated or replaced: start over
+        f["offset"], f["partial"] = 0, b""
+    if size == f["offset"]:
+        return
+    try:
+        with open(f["path"], "rb") as fh:
+            fh.seek(f["offset"])
+            data = fh.read(size - f["offset"])
+    except OSError:
+        return
+    f["offset"] += len(data)
+    *lines, f["partial"] = (f["partial"] + data).split(b"\n")
+    if lines:
+        out.write("".join(f["prefix"] + line.decode(errors="replace") + "\n" for line in lines))
+        out.flush()
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import functools
 import stat
 from pathlib import Path
 
@@ -14,6 +15,8 @@ def write_job_sub(
     submit_host: str,
     pin_submit_host: bool,
     omit_gpus_when_zero: bool = True,
+    arguments: str | None = None,
+    capture: bool = False,
 ) -> Path:
     path = run_dir / "job.sub"
     path.write_text(
@@ -25,18 +28,63 @@ def write_job_sub(
             submit_host,
             pin_submit_host,
             omit_gpus_when_zero,
+            arguments,
+            capture,
         )
     )
     return path
 
 
-def write_run_sh(run_dir: Path, repo_dir: Path, jobname: str, resources: dict, conda: dict) -> Path:
+def write_sweep_sub(
+    path: Path,
+    repo_dir: Path,
+    resources: dict,
+    jobname: str,
+    submit_host: str,
+    pin_submit_host: bool,
+    omit_gpus_when_zero: bool,
+    tasks: list[tuple[Path, str]],
+    capture: bool = False,
+) -> Path:
+    """Write a multi-proc submit file that queues one proc per ``(run_dir, arguments)`` task."""
+    path.write_text(
+        _render_sweep_sub(
+            repo_dir,
+            resources,
+            jobname,
+            submit_host,
+            pin_submit_host,
+            omit_gpus_when_zero,
+            tasks,
+            capture,
+        )
+    )
+    return path
+
+
+def write_run_sh(
+    run_dir: Path,
+    repo_dir: Path,
+    jobname: str,
+    resources: dict,
+    conda: dict,
+    output: dict | None = None,
+    snapshot_dir: str | None = None,
+) -> Path:
     path = run_dir / "run.sh"
-    path.write_text(_render_run_sh(run_dir, repo_dir, jobname, resources, conda))
+    path.write_text(
+        _render_run_sh(run_dir, repo_dir, jobname, resources, conda, output, snapshot_dir)
+    )
     path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
     return path
 
 
+@functools.cache
+def capture_script() -> str:
+    """Source of capture.py, staged into run dirs that use size-capped output."""
+    return Path(__file__).with_name("capture.py").read_text()
+
+
 # ── renderers ────────────────────────────────────────────────────────────────
 
 
@@ -48,16 +96,80 @@ def _render_job_sub(
     submit_host: str,
     pin_submit_host: bool,
     omit_gpus_when_zero: bool,
+    arguments: str | None = None,
+    capture: bool = False,
+) -> str:
+    """Render job.sub; ``arguments`` is the escaped argument string, or None for a placeholder."""
+    lines = _job_sub_lines(
+        str(run_dir),
+        "arguments = __ARGS_PLACEHOLDER__" if arguments is None else f'arguments = "{arguments}"',
+        repo_dir,
+        resources,
+        jobname,
+        submit_host,
+        pin_submit_host,
+        omit_gpus_when_zero,
+        capture,
+    )
+    lines.append("")  # trailing newline
+    return "\n".join(lines)
+
+
+def _render_sweep_sub(
+    repo_dir: Path,
+    resources: dict,
+    jobname: str,
+    submit_host: str,
+    pin_submit_host: bool,
+    omit_gpus_when_zero: bool,
+    tasks: list[tuple[Path, str]],
+    capture: bool = False,
 ) -> str:
-    run_dir / "run.sh"
+    # each queue line is "<run_dir>, <arguments>"; condor assigns the remainder of the
+    # line to the last variable, so the arguments may themselves contain commas
+    lines = _job_sub_lines(
+        "$(run_dir)",
+        'arguments = "$(task_args)"',
+        repo_dir,
+        resources,
+        jobname,
+        submit_host,
+        pin_submit_host,
+        omit_gpus_when_zero,
+        capture,
+    )
+    lines.append("queue run_dir, task_args from (")
+    lines += [f"  {run_dir}, {task_args}" for run_dir, task_args in tasks]
+    lines.append(")")
+    lines.append("")  # trailing newline
+    return "\n".join(lines)
+
+
+def _job_sub_lines(
+    run_dir: str,
+    arguments_line: str,
+    repo_dir: Path,
+    resources: dict,
+    jobname: str,
+    submit_host: str,
+    pin_submit_host: bool,
+    omit_gpus_when_zero: bool,
+    capture: bool = False,
+) -> list[str]:
+    if capture:
+        # run.sh writes stdout.txt/stderr.txt itself; condor's streams only carry the
+        # capture wrapper's own diagnostics
+        output, error = "/dev/null", f"{run_dir}/capture.err"
+    else:
+        output, error = f"{run_dir}/stdout.txt", f"{run_dir}/stderr.txt"
     lines = [
         "universe = vanilla",
         f"initialdir = {repo_dir}",
         "executable = /bin/bash",
-        "arguments = __ARGS_PLACEHOLDER__",
+        arguments_line,
         "getenv = True",
-        f"output = {run_dir}/stdout.txt",
-        f"error  = {run_dir}/stderr.txt",
+        f"output = {output}",
+        f"error  = {error}",
         f"log    = {run_dir}/condor.log",
         f"request_cpus = {resources['cpus']}",
         f"request_memory = {resources['mem']}",
@@ -76,13 +188,22 @@ def _render_job_sub(
         lines.append(f"request_disk = {resources['disk']}")
 
     lines.append(f'+JobBatchName = "{jobname}"')
-    lines.append("")  # trailing newline
-    return "\n".join(lines)
+    return lines
 
 
 def _render_run_sh(
-    run_dir: Path, repo_dir: Path, jobname: str, resources: dict, conda: dict
+    run_dir: Path,
+    repo_dir: Path,
+    jobname: str,
+    resources: dict,
+    conda: dict,
+    output: dict | None = None,
+    snapshot_dir: str | None = None,
 ) -> str:
+    """Render run.sh; ``output`` (from config.resolve_output) turns on size-capped capture.
+
+    ``snapshot_dir`` is the job's initialdir inside a repo snapshot, if it runs from one.
+    """
     parts = [
         "#!/usr/bin/env bash",
         "set -euo pipefail",
@@ -91,16 +212,51 @@ def _render_run_sh(
         f"export BAIRCONDOR_REPO_DIR={repo_dir}",
         f"export BAIRCONDOR_JOBNAME={jobname}",
         f"export BAIRCONDOR_NUM_GPUS={resources['gpus']}",
-        "",
     ]
+    if snapshot_dir:
+        parts.append(f"export BAIRCONDOR_SNAPSHOT_DIR={snapshot_dir}")
+    parts.append("")
+
+    if output:
+        flags = f"--cap {output['cap']} --head {output['head']}"
+        if output.get("compress"):
+            flags += " --compress"
+        parts += [
+            "# re-run this script under capture.py, which caps stdout.txt/stderr.txt",
+            'if [[ -z "${BAIRCONDOR_CAPTURED:-}" ]]; then',
+            "    export BAIRCONDOR_CAPTURED=1",
+            "    if command -v python3 >/dev/null 2>&1; then",
+            f'        exec python3 "$BAIRCONDOR_RUN_DIR/capture.py" --dir "$BAIRCONDOR_RUN_DIR" '
+            f'{flags} -- "$BASH" "$0" "$@"',
+            "    fi",
+            '    exec >>"$BAIRCONDOR_RUN_DIR/stdout.txt" 2>>"$BAIRCONDOR_RUN_DIR/stderr.txt"',
+            '    echo "baircondor: no python3 on $(hostname); output is not size-capped" >&2',
+            "fi",
+            "",
+        ]
 
     if conda.get("env"):
         conda_base = conda.get("conda_base") or ""
-        parts += [
+        activate = [
             f'source "{conda_base}/etc/profile.d/conda.sh"',
             f'conda activate "{conda["env"]}"',
-            "",
         ]
+        cached = conda.get("activation")
+        if conda.get("packed"):
+            parts += _packed_env_lines(conda["packed"], activate)
+        elif cached:
+            # replay the activation captured at submission unless the env changed since
+            stamp = f'"$(stat -c %Y "{cached["stamp_path"]}" 2>/dev/null)"'
+            parts += [
+                f'if [[ -r "{cached["script"]}" && {stamp} == "{cached["stamp"]}" ]]; then',
+                f'    source "{cached["script"]}"',
+                "else",
+                *(f"    {line}" for line in activate),
+                "fi",
+            ]
+        else:
+            parts += activate
+        parts.append("")
 
     # skip the literal "--" separator that precedes the user command
     parts += [
@@ -110,3 +266,55 @@ def _render_run_sh(
         'exec "$@"',
     ]
     return "\n".join(parts) + "\n"
+
+
+def _packed_env_lines(packed: dict, activate: list[str]) -> list[str]:
+    """Unpack a conda-pack tarball into node-local storage once per node, and activate it.
+
+    Jobs on a node share ``<local_dir>/<hash>``. Each holds a shared flock on
+    ``<hash>.lock`` from before it looks at the env until it exits (fd 9 stays open
+    through the final exec), and eviction only removes envs whose lock it can take
+    exclusively. Unpacking is serialized by a separate ``<hash>.unpack`` lock, so
+    concurrent jobs wait for the first one instead of unpacking again. Beyond the
+    ``keep`` most recently used envs, older ones are deleted. Lock files are never
+    removed, so a waiter can't end up locking an orphaned file.
+
+    ``local_dir`` usually sits in a shared /tmp, so it is created with mode 700 and only
+    used if it is ours, private, and in a directory owned by us or root; otherwise the
+    job falls back to ``activate``, the env in place.
+    """
+    return [
+        "# conda env packed at submission, unpacked once per node and shared by its jobs",
+        f'export BAIRCONDOR_CONDA_LOCAL="{packed["local_dir"]}"',
+        f'_bc_env="$BAIRCONDOR_CONDA_LOCAL/{packed["hash"]}"',
+        '(umask 077 && mkdir -p "$BAIRCONDOR_CONDA_LOCAL") 2>/dev/null || true',
+        '_bc_owner="$(stat -c %u "$(dirname "$BAIRCONDOR_CONDA_LOCAL")" 2>/dev/null || true)"',
+        'if [[ -d "$BAIRCONDOR_CONDA_LOCAL" && -O "$BAIRCONDOR_CONDA_LOCAL" '
+        '&& ( "$_bc_owner" == 0 || "$_bc_owner" == "$UID" ) ]] '
+        '&& (( (8#$(stat -c %a "$BAIRCONDOR_CONDA_LOCAL") & 8#77) == 0 )); then',
+        '    exec 9>>"$_bc_env.lock"',
+        "    flock -s 9  # held until the job exits, so eviction leaves this env alone",
+        '    if [[ ! -f "$_bc_env/.baircondor-ready" ]]; then',
+        "        (",
+        "            flock -x 8",
+        '            if [[ ! -f "$_bc_env/.baircondor-ready" ]]; then',
+        '                rm -rf "$_bc_env" && mkdir -p "$_bc_env"',
+        f'                tar -xzf "{packed["tarball"]}" -C "$_bc_env"',
+        '                "$_bc_env/bin/python" "$_bc_env/bin/conda-unpack"',
+        '                touch "$_bc_env/.baircondor-ready"',
+        "            fi",
+        '        ) 8>>"$_bc_env.unpack"',
+        "    fi",
+        '    touch "$_bc_env/.baircondor-ready"  # last use, for LRU eviction',
+        '    ls -1t "$BAIRCONDOR_CONDA_LOCAL"/*/.baircondor-ready 2>/dev/null '
+        f"| tail -n +{packed['keep'] + 1} | while read -r ready; do",
+        '        old="${ready%/.baircondor-ready}"',
+        '        ( flock -n -x 8 && rm -f "$ready" && rm -rf "$old" ) 8>>"$old.lock" || true',
+        "    done || true",
+        '    set +u; source "$_bc_env/bin/activate"; set -u',
+        "else",
+        '    echo "baircondor: $BAIRCONDOR_CONDA_LOCAL is not private to $(id -un);'
+        ' using the shared conda env" >&2',
+        *(f"    {line}" for line in activate),
+        "fi",
+    ]
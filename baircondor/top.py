@@ -0,0 +1,179 @@
+"""`baircondor top`: a live view of your baircondor jobs.
+
+The job list is seeded from history, so only baircondor-submitted runs are shown. Each
+refresh issues a single ``condor_q -af`` for the jobs that are still active; jobs that
+leave the queue are resolved through condor_history and stop being polled once that
+reports a terminal state (a ``?`` from a failed or timed-out lookup is retried).
+When a refresh changes nothing the interval backs off, up to MAX_INTERVAL.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime
+
+from .config import get_user
+from .history import (
+    _STATUS_MAP,
+    HISTORY_FILE,
+    TERMINAL_STATES,
+    _condor_af,
+    _match_id,
+    _status_style,
+    _wanted_ids,
+    get_entries,
+    job_states,
+    query_job_states,
+    record_states,
+)
+
+MAX_INTERVAL = 30.0
+BACKOFF = 1.5
+
+_TOP_ATTRS = [
+    "JobStatus",
+    "RemoteHost",
+    "JobCurrentStartDate",
+    "ResidentSetSize",
+    "RemoteUserCpu",
+    "RequestGpus",
+]
+
+
+def run_top(args) -> None:
+    from rich.console import Console
+    from rich.live import Live
+
+    rows = seed(args.n, history_file=HISTORY_FILE)
+    console = Console()
+    if args.once or not rows:
+        console.print(render(rows))
+        return
+
+    interval = args.interval
+    try:
+        with Live(render(rows, interval), console=console, auto_refresh=False) as live:
+            while _active(rows):
+                time.sleep(interval)
+                changed = refresh(rows, timeout=max(interval, 3.0))
+                interval = args.interval if changed else min(interval * BACKOFF, MAX_INTERVAL)
+                live.update(render(rows, interval), refresh=True)
+    except KeyboardInterrupt:
+        pass
+
+
+def seed(n: int, history_file=HISTORY_FILE) -> dict[str, dict]:
+    """Build the row table from the last ``n`` history entries that have a cluster id."""
+    entries = get_entries(n=n, user=get_user(), history_file=history_file)
+    entries = [e for e in entries if e.get("cluster_id")]
+    states = job_states(entries, history_file)
+    return {str(e["cluster_id"]): {"entry": e, **state} for e, state in zip(entries, states)}
+
+
+def refresh(rows: dict[str, dict], timeout: float = 3.0, history_file=HISTORY_FILE) -> bool:
+    """Re-poll the active rows in place; returns whether anything changed."""
+    active = _active(rows)
+    wanted = _wanted_ids(active)
+    jobs = {(c, None) for c, _ in wanted}
+    polled = _condor_af(["condor_q", "-allusers"], jobs, _TOP_ATTRS, timeout)
+    if polled is None:
+        return False
+
+    before = {cid: dict(rows[cid]) for cid in active}
+    seen = set()
+    for cluster, proc, fields in polled:
+        cid = _match_id(wanted, cluster, proc)
+        if cid:
+            seen.add(cid)
+            rows[cid].update(_job_info(fields))
+
+    gone = [cid for cid in active if cid not in seen]
+    if gone:
+        finished = query_job_states(gone, timeout, check_queue=False)
+        record_states(
+            {
+                rows[cid]["entry"]["run_dir"]: st
+                for cid, st in finished.items()
+                if st["status"] in TERMINAL_STATES and rows[cid]["entry"].get("run_dir")
+            },
+            history_file,
+        )
+        for cid in gone:
+            # a terminal state drops the row from _active; "?" is looked up again next time
+            rows[cid].update(finished[cid])
+    return any(rows[cid] != before[cid] for cid in active)
+
+
+def _active(rows: dict[str, dict]) -> list[str]:
+    return [cid for cid, row in rows.items() if row["status"] not in TERMINAL_STATES]
+
+
+def _job_info(fields: list[str]) -> dict:
+    fields = fields + ["undefined"] * (len(_TOP_ATTRS) - len(fields))
+    status, host, start, rss, cpu, gpus = fields[: len(_TOP_ATTRS)]
+    info: dict = {"status": _STATUS_MAP.get(status, "?")}
+    if host != "undefined":
+        info["host"] = host.split("@")[-1].split(".")[0]
+    if start.isdigit():
+        info["start"] = int(start)
+    if rss.isdigit():
+        info["rss_kb"] = int(rss)
+    try:
+        info["cpu_s"] = float(cpu)
+    except ValueError:
+        pass
+    if gpus.isdigit():
+        info["gpus"] = int(gpus)
+    return info
+
+
+def render(rows: dict[str, dict], interval: float | None = None):
+    from rich.table import Table
+
+    title = f"baircondor top — {len(_active(rows))} active of {len(rows)}"
+    if interval is not None:
+        title += f"  (every {interval:.0f}s)"
+    table = Table(title=title, title_justify="left", box=None, header_style="bold")
+    for col in ("Job", "Name", "Status", "Host", "Runtime", "Mem", "CPU", "GPUs"):
+        table.add_column(col, justify="right" if col in ("Mem", "CPU", "GPUs") else "left")
+
+    now = time.time()
+    for cid, row in rows.items():
+        status = row["status"]
+        runtime = now - row["start"] if status == "running" and "start" in row else None
+        cpu = (
+            f"{100 * row['cpu_s'] / runtime:.0f}%"
+            if runtime and row.get("cpu_s") is not None
+            else ""
+        )
+        table.add_row(
+            cid,
+            row["entry"].get("jobname", "?"),
+            f"[{_status_style(status)}]● {status}[/]",
+            row.get("host", ""),
+            _duration(runtime) if runtime is not None else _finished(row),
+            _memory(row["rss_kb"]) if "rss_kb" in row else "",
+            cpu,
+            str(row.get("gpus", row["entry"].get("gpus", ""))),
+        )
+    return table
+
+
+def _duration(seconds: float) -> str:
+    minutes, _ = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    return f"{days}d{hours:02d}h" if days else f"{hours}:{minutes:02d}"
+
+
+def _finished(row: dict) -> str:
+    completed = row.get("completed")
+    return f"ended {datetime.fromisoformat(completed):%m-%d %H:%M}" if completed else ""
+
+
+def _memory(kb: int) -> str:
+    for unit in ("K", "M", "G"):
+        if kb < 1024:
+            return f"{kb:.0f}{unit}"
+        kb /= 1024
+    return f"{kb:.1f}T"
@@ -0,0 +1,152 @@
+"""Block until runs finish by watching their condor.log event logs.
+
+On Linux the run dirs are watched with inotify, so a wait over thousands of runs sleeps
+until HTCondor actually appends an event. Everything is still re-read every RECHECK
+seconds, which covers logs on network filesystems (where inotify sees no remote writes)
+and runs that couldn't get a watch. Without inotify, logs are polled every POLL seconds.
+Either way it is one thread and no subprocesses: state comes from eventlog.read_log.
+"""
+
+from __future__ import annotations
+
+import os
+import select
+import struct
+import time
+from pathlib import Path
+
+from .eventlog import read_log
+from .history import TERMINAL_STATES
+
+POLL = 1.0
+RECHECK = 10.0
+
+# inotify(7) constants
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def wait_for_runs(
+    run_dirs: list[str | Path],
+    timeout: float | None = None,
+    use_inotify: bool = True,
+) -> dict[Path, dict]:
+    """Wait until every run reaches a terminal state, or ``timeout`` seconds pass.
+
+    Returns each run's last known state (``status`` plus, when finished, ``exit_code``
+    and ``completed``); runs still going when the timeout hits keep a non-terminal
+    status, and runs with no event log yet report ``?``.
+    """
+    run_dirs = [Path(d) for d in dict.fromkeys(str(d) for d in run_dirs)]
+    entries: dict[Path, dict | None] = dict.fromkeys(run_dirs)
+    pending = set(run_dirs)
+
+    def check(run_dir: Path) -> None:
+        entry = read_log(run_dir / "condor.log", entries[run_dir])
+        entries[run_dir] = entry
+        if entry is not None and entry["state"].get("status") in TERMINAL_STATES:
+            pending.discard(run_dir)
+            if watcher is not None:
+                watcher.unwatch(run_dir)
+
+    watcher = _Inotify.create() if use_inotify else None
+    try:
+        if watcher is not None:
+            for run_dir in run_dirs:
+                watcher.watch(run_dir)
+        for run_dir in run_dirs:
+            check(run_dir)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        last_full = time.monotonic()
+        while pending:
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                break
+            period = RECHECK if watcher is not None else POLL
+            wait_for = max(0.0, last_full + period - now)
+            if deadline is not None:
+                wait_for = min(wait_for, deadline - now)
+
+            changed = watcher.read(wait_for) if watcher is not None else None
+            if changed is None:
+                time.sleep(wait_for)
+            for run_dir, name in changed or ():
+                if name == "condor.log" and run_dir in pending:
+                    check(run_dir)
+            if time.monotonic() - last_full >= period:
+                for run_dir in list(pending):
+                    check(run_dir)
+                last_full = time.monotonic()
+    finally:
+        if watcher is not None:
+            watcher.close()
+
+    states = {}
+    for run_dir in run_dirs:
+        state = dict(entries[run_dir]["state"]) if entries[run_dir] else {}
+        state.pop("cluster_id", None)
+        states[run_dir] = state if state.get("status") else {"status": "?"}
+    return states
+
+
+class _Inotify:
+    """Minimal ctypes binding: one IN_NONBLOCK inotify fd watching run dirs.
+
+    Also used by tail.py to follow stdout/stderr.
+    """
+
+    def __init__(self, libc, fd: int):
+        self._libc = libc
+        self._fd = fd
+        self._dirs: dict[int, Path] = {}
+        self._wds: dict[Path, int] = {}
+
+    @classmethod
+    def create(cls) -> _Inotify | None:
+        import ctypes
+        import ctypes.util
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):  # not Linux, or no inotify in this libc
+            return None
+        return cls(libc, fd) if fd >= 0 else None
+
+    def watch(self, run_dir: Path) -> None:
+        mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(run_dir), mask)
+        if wd >= 0:  # e.g. ENOSPC past max_user_watches: covered by the periodic recheck
+            self._dirs[wd] = run_dir
+            self._wds[run_dir] = wd
+
+    def unwatch(self, run_dir: Path) -> None:
+        wd = self._wds.pop(run_dir, None)
+        if wd is not None:
+            self._libc.inotify_rm_watch(self._fd, wd)
+            self._dirs.pop(wd, None)
+
+    def read(self, timeout: float) -> set[tuple[Path, str]]:
+        """Wait up to ``timeout`` for events; return ``(dir, file name)`` of changed files."""
+        changed: set[tuple[Path, str]] = set()
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return changed
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset + _EVENT.size <= len(data):
+                wd, _, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size : offset + _EVENT.size + length].rstrip(b"\0")
+                offset += _EVENT.size + length
+                if name and wd in self._dirs:
+                    changed.add((self._dirs[wd], os.fsdecode(name)))
+
+    def close(self) -> None:
+        os.close(self._fd)
@@ -11,7 +11,7 @@ from pathlib import Path
 
 from pydantic import BaseModel, ConfigDict
 
-from baircondor import CondorConfig, submit
+from baircondor import CondorConfig, submit, submit_many
 
 
 class DataConfig(BaseModel):
@@ -80,6 +80,25 @@ def queue_sweep(base_config: ExperimentConfig) -> list[Path]:
     return run_dirs
 
 
+def queue_sweep_as_cluster(base_config: ExperimentConfig) -> list[Path]:
+    """Pattern: same sweep as above, but submitted as one multi-proc condor cluster."""
+    commands: list[list[str]] = []
+    tags: list[str] = []
+
+    for lr, batch_size in product([1e-4, 3e-4], [128, 256]):
+        suffix = f"lr{lr:g}-bs{batch_size}"
+        generated_config_path = Path(f"generated/{suffix}.py")
+        commands.append(
+            ["python", "run_pretraining_from_config.py", "--config", str(generated_config_path)]
+        )
+        tags.append(suffix)
+
+    condor = base_config.condor.model_copy(
+        update={"jobname": "lejepa-pretrain", "project": "eegfm", "dry_run": True}
+    )
+    return submit_many(commands, condor=condor, tags=tags)
+
+
 if __name__ == "__main__":
     base_config = ExperimentConfig(
         data=DataConfig(batch_size=256, num_workers=4),
@@ -100,3 +119,6 @@ if __name__ == "__main__":
 
     sweep_run_dirs = queue_sweep(base_config)
     print(f"Queued {len(sweep_run_dirs)} sweep jobs")
+
+    cluster_run_dirs = queue_sweep_as_cluster(base_config)
+    print(f"Queued {len(cluster_run_dirs)} sweep jobs as one cluster")
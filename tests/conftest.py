@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep tests from reading or writing the real ~/.cache/baircondor."""
+    monkeypatch.setattr("baircondor.cache.CACHE_DIR", tmp_path / "cache")
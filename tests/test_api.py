@@ -1,12 +1,13 @@
-"""Tests for the Python API (CondorConfig, submit, interactive)."""
+"""Tests for the Python API (CondorConfig, submit, interactive and async variants)."""
 
+import asyncio
 import json
 from pathlib import Path
 
 import pytest
 from pydantic import ValidationError
 
-from baircondor.api import CondorConfig, interactive, submit
+from baircondor.api import CondorConfig, ainteractive, asubmit, interactive, submit, submit_many
 
 
 @pytest.fixture
@@ -107,3 +108,166 @@ class TestCondorConfigDefaults:
     def test_unknown_fields_are_rejected(self):
         with pytest.raises(ValidationError):
             CondorConfig(gps=2)
+
+
+class TestSubmitMany:
+    def test_creates_one_run_dir_per_command(self, scratch):
+        commands = [["python", "train.py", "--lr", lr] for lr in ("1e-4", "3e-4", "1e-3")]
+        run_dirs = submit_many(commands, gpus=0, scratch=scratch, dry_run=True)
+        assert len(run_dirs) == 3
+        assert len(set(run_dirs)) == 3
+        for run_dir, command in zip(run_dirs, commands):
+            assert (run_dir / "run.sh").exists()
+            assert (run_dir / "job.sub").exists()
+            meta = json.loads((run_dir / "meta.json").read_text())
+            assert meta["command"] == command
+
+    def test_single_sweep_sub_queues_every_task(self, scratch):
+        run_dirs = submit_many(
+            [["echo", "a"], ["echo", "b"]], gpus=0, scratch=scratch, dry_run=True
+        )
+        text = (run_dirs[0] / "sweep.sub").read_text()
+        assert "queue run_dir, task_args from (" in text
+        assert f"  {run_dirs[0]}, {run_dirs[0]}/run.sh -- echo a" in text
+        assert f"  {run_dirs[1]}, {run_dirs[1]}/run.sh -- echo b" in text
+        assert not (run_dirs[1] / "sweep.sub").exists()
+
+    def test_rejects_run_dirs_condor_would_split(self, tmp_path):
+        scratch = tmp_path / "my scratch"
+        with pytest.raises(SystemExit, match="can't contain whitespace or a comma"):
+            submit_many([["echo", "a"], ["echo", "b"]], gpus=0, scratch=str(scratch), dry_run=True)
+        assert not [p for p in scratch.rglob("*") if p.name.startswith("20")]
+
+        with pytest.raises(SystemExit, match="can't contain whitespace or a comma"):
+            submit_many(
+                [["echo", "a"], ["echo", "b"]],
+                gpus=0,
+                scratch=str(tmp_path / "s"),
+                tags=["lr1", "lr=1,bs=2"],
+                dry_run=True,
+            )
+
+    def test_per_task_tags(self, scratch):
+        run_dirs = submit_many(
+            [["echo", "a"], ["echo", "b"]],
+            gpus=0,
+            scratch=scratch,
+            tags=["lr1", "lr2"],
+            dry_run=True,
+        )
+        assert run_dirs[0].name.endswith("_lr1")
+        assert run_dirs[1].name.endswith("_lr2")
+
+    def test_one_condor_submit_and_history_entry_per_task(self, scratch, monkeypatch):
+        import importlib
+        import subprocess
+
+        submit_mod = importlib.import_module("baircondor.submit")
+
+        calls = []
+        recorded = []
+
+        def fake_run(cmd, **kwargs):
+            if cmd[0] != "condor_submit":
+                return subprocess.CompletedProcess(cmd, 0, stdout="host\n", stderr="")
+            calls.append(cmd)
+            return subprocess.CompletedProcess(
+                cmd, 0, stdout="3 job(s) submitted to cluster 77.\n", stderr=""
+            )
+
+        monkeypatch.setattr(submit_mod.subprocess, "run", fake_run)
+        monkeypatch.setattr(submit_mod, "append_entries", lambda entries: recorded.extend(entries))
+        run_dirs = submit_many(
+            [["echo", "a"], ["echo", "b"], ["echo", "c"]], gpus=0, scratch=scratch, quiet=True
+        )
+        assert calls == [["condor_submit", str(run_dirs[0] / "sweep.sub")]]
+        assert [e["cluster_id"] for e in recorded] == ["77.0", "77.1", "77.2"]
+        assert [e["run_dir"] for e in recorded] == [str(d) for d in run_dirs]
+
+
+class TestAsyncSubmit:
+    def test_asubmit_creates_same_artifacts(self, scratch):
+        run_dir = asyncio.run(asubmit(["echo", "hello"], gpus=0, scratch=scratch, dry_run=True))
+        assert isinstance(run_dir, Path)
+        assert run_dir == _find_run_dir(scratch)
+        for name in ("job.sub", "run.sh", "meta.json"):
+            assert (run_dir / name).exists()
+        assert 'arguments = "' in (run_dir / "job.sub").read_text()
+        meta = json.loads((run_dir / "meta.json").read_text())
+        assert meta["command"] == ["echo", "hello"]
+        assert "is_repo" in meta["git"]
+
+    def test_gather_many_with_bound(self, scratch):
+        async def main():
+            limit = asyncio.Semaphore(2)
+            return await asyncio.gather(
+                *(
+                    asubmit(["echo", str(i)], gpus=0, scratch=scratch, dry_run=True, limit=limit)
+                    for i in range(10)
+                )
+            )
+
+        run_dirs = asyncio.run(main())
+        assert len(set(run_dirs)) == 10
+
+    def test_asubmit_runs_condor_submit_and_records_history(self, scratch, monkeypatch):
+        import importlib
+        import subprocess
+
+        aio = importlib.import_module("baircondor.aio")
+        submit_mod = importlib.import_module("baircondor.submit")
+        calls = []
+        recorded = []
+
+        async def fake_run(cmd, cwd=None, timeout=None):
+            calls.append(cmd[0])
+            stdout = {
+                "hostname": "Host.Example.com\n",
+                "condor_submit": "submitted to cluster 9.\n",
+            }
+            return subprocess.CompletedProcess(cmd, 0, stdout.get(cmd[0], "x\n"), "")
+
+        monkeypatch.setattr(aio, "_run", fake_run)
+        monkeypatch.setattr(submit_mod, "append_entry", lambda *a, **kw: recorded.append(a))
+        run_dir = asyncio.run(asubmit(["echo", "hi"], gpus=0, scratch=scratch, quiet=True))
+        assert calls.count("git") == 3
+        assert calls[-1] == "condor_submit"
+        assert recorded[0][0] == run_dir
+        assert recorded[0][2] == "9"
+        assert 'toLower(Machine) == "host.example.com"' in (run_dir / "job.sub").read_text()
+
+    def test_failed_asubmit_fails_only_its_task(self, scratch, monkeypatch):
+        import importlib
+        import subprocess
+
+        aio = importlib.import_module("baircondor.aio")
+        submit_mod = importlib.import_module("baircondor.submit")
+        recorded = []
+
+        async def fake_run(cmd, cwd=None, timeout=None):
+            if cmd[0] != "condor_submit":
+                return subprocess.CompletedProcess(cmd, 0, "x\n", "")
+            if "fail" in Path(cmd[1]).parent.name:
+                return subprocess.CompletedProcess(cmd, 1, "", "ERROR: quota exceeded\n")
+            return subprocess.CompletedProcess(cmd, 0, "submitted to cluster 9.\n", "")
+
+        monkeypatch.setattr(aio, "_run", fake_run)
+        monkeypatch.setattr(submit_mod, "append_entry", lambda *a, **kw: recorded.append(a))
+
+        async def main():
+            tags = ["ok0", "fail", "ok1"]
+            return await asyncio.gather(
+                *(asubmit(["echo"], gpus=0, scratch=scratch, quiet=True, tag=t) for t in tags),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(main())
+        assert isinstance(results[1], subprocess.CalledProcessError)
+        assert results[1].stderr == "ERROR: quota exceeded\n"
+        assert isinstance(results[0], Path) and isinstance(results[2], Path)
+        assert [r[0] for r in recorded] == [results[0], results[2]]
+
+    def test_ainteractive_dry_run(self, scratch):
+        run_dir = asyncio.run(ainteractive(gpus=0, scratch=scratch, dry_run=True))
+        meta = json.loads((run_dir / "meta.json").read_text())
+        assert meta["mode"] == "interactive"
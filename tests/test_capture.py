@@ -0,0 +1,163 @@
+"""Tests for size-capped stdout/stderr capture (capture.py and the run.sh wrapper)."""
+
+import gzip
+import os
+import signal
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from baircondor.capture import CappedWriter, run
+from baircondor.config import resolve_output
+from baircondor.templates import _render_run_sh, capture_script
+
+
+def _lines(n, width=9):
+    return b"".join(b"%0*d\n" % (width, i) for i in range(n))  # 10 bytes per line
+
+
+def _tail_bytes(run_dir, name="stdout"):
+    """Everything kept after the head, oldest first."""
+    chunks = sorted(
+        (p for p in run_dir.iterdir() if p.name.startswith(f"{name}.txt.")),
+        key=lambda p: int(p.name.split(".")[2]),
+    )
+    data = b"".join(
+        gzip.decompress(p.read_bytes()) if p.suffix == ".gz" else p.read_bytes() for p in chunks
+    )
+    return data + (run_dir / f"{name}.txt").read_bytes()
+
+
+def test_small_output_is_untouched(tmp_path):
+    w = CappedWriter(str(tmp_path / "stdout.txt"), cap=1000, head=200)
+    w.write(b"hello\n")
+    w.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["stdout.txt"]
+    assert (tmp_path / "stdout.txt").read_bytes() == b"hello\n"
+
+
+def test_keeps_head_and_tail_under_cap(tmp_path):
+    data = _lines(1000)  # 10 KB
+    w = CappedWriter(str(tmp_path / "stdout.txt"), cap=2000, head=400)
+    for i in range(0, len(data), 64):
+        w.write(data[i : i + 64])
+    w.close()
+
+    head = (tmp_path / "stdout.head.txt").read_bytes()
+    tail = _tail_bytes(tmp_path)
+    assert head == data[: len(head)] and 300 < len(head) <= 400
+    assert data.endswith(tail) and tail
+    assert len(head) + len(tail) <= 2000
+    assert w.dropped == len(data) - len(head) - len(tail)
+    assert not (tmp_path / "stdout.txt.1").exists()  # oldest chunks were pruned
+
+
+def test_chunks_break_after_newlines(tmp_path):
+    w = CappedWriter(str(tmp_path / "stdout.txt"), cap=400, head=100)
+    w.write(_lines(100))
+    w.close()
+    for p in tmp_path.iterdir():
+        assert p.read_bytes().endswith(b"\n"), p.name
+
+
+def test_rotated_chunks_can_be_compressed(tmp_path):
+    data = _lines(1000)
+    w = CappedWriter(str(tmp_path / "stdout.txt"), cap=4000, head=0, compress=True)
+    w.write(data)
+    w.close()
+    rotated = [p.name for p in tmp_path.iterdir() if p.name.startswith("stdout.txt.")]
+    assert rotated and all(name.endswith(".gz") for name in rotated)
+    assert data.endswith(_tail_bytes(tmp_path))
+
+
+def test_previous_attempt_is_cleared(tmp_path):
+    for name in ("stdout.head.txt", "stdout.txt.7", "stdout.txt.8.gz", "stdout.txt"):
+        (tmp_path / name).write_text("old")
+    (tmp_path / "stdout.txt.bak").write_text("not ours")
+    CappedWriter(str(tmp_path / "stdout.txt"), cap=1000, head=100).close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["stdout.txt", "stdout.txt.bak"]
+    assert (tmp_path / "stdout.txt").read_text() == ""
+
+
+def test_run_captures_both_streams_and_exit_code(tmp_path):
+    code = "import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)"
+    assert run([sys.executable, "-c", code], str(tmp_path), cap=1000, head=100) == 3
+    assert (tmp_path / "stdout.txt").read_text() == "out\n"
+    assert (tmp_path / "stderr.txt").read_text() == "err\n"
+
+
+def test_signals_are_forwarded(tmp_path):
+    script = (
+        "import signal, sys, time\n"
+        "signal.signal(signal.SIGTERM, lambda *a: (print('bye', flush=True), sys.exit(7)))\n"
+        "print('ready', flush=True)\n"
+        "time.sleep(30)\n"
+    )
+    capture = [sys.executable, "-m", "baircondor.capture", "--dir", str(tmp_path), "--cap", "1000"]
+    proc = subprocess.Popen(capture + ["--", sys.executable, "-c", script])
+    deadline = time.monotonic() + 10
+    while b"ready" not in _read(tmp_path / "stdout.txt") and time.monotonic() < deadline:
+        time.sleep(0.05)
+    proc.send_signal(signal.SIGTERM)
+    assert proc.wait(timeout=10) == 7
+    assert (tmp_path / "stdout.txt").read_text() == "ready\nbye\n"
+
+
+def _read(path):
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return b""
+
+
+def test_run_sh_wraps_command(tmp_path):
+    run_dir = tmp_path / "run"
+    run_dir.mkdir()
+    output = {"cap": 2000, "head": 400, "compress": False}
+    text = _render_run_sh(run_dir, tmp_path, "job", {"gpus": 0}, {}, output)
+    (run_dir / "run.sh").write_text(text)
+    (run_dir / "capture.py").write_text(capture_script())
+
+    code = "import sys\nfor i in range(1000): print('%09d' % i)\nprint('oops', file=sys.stderr)"
+    env = {k: v for k, v in os.environ.items() if k != "BAIRCONDOR_CAPTURED"}
+    result = subprocess.run(
+        ["/bin/bash", str(run_dir / "run.sh"), "--", sys.executable, "-c", code + "\nsys.exit(5)"],
+        env=env,
+        capture_output=True,
+    )
+    assert result.returncode == 5
+    assert b"dropped" in result.stderr  # the wrapper's note goes to condor's stderr
+    assert (run_dir / "stdout.head.txt").read_bytes().startswith(b"000000000\n")
+    assert _tail_bytes(run_dir).endswith(b"000000999\n")
+    assert (run_dir / "stderr.txt").read_text() == "oops\n"
+
+
+def test_run_sh_without_capture_execs_directly(tmp_path):
+    text = _render_run_sh(tmp_path, tmp_path, "job", {"gpus": 0}, {})
+    assert "capture.py" not in text
+
+
+@pytest.mark.parametrize(
+    "cfg_output,args,expected",
+    [
+        ({}, {}, None),
+        ({"cap": "2G"}, {}, {"cap": 2 << 30, "head": 512 << 20, "compress": False}),
+        ({"cap": "2G", "compress": True}, {"output_cap": "0"}, None),
+        (
+            {},
+            {"output_cap": "1M", "compress_output": True},
+            {"cap": 1 << 20, "head": 256 << 10, "compress": True},
+        ),
+        ({"cap": 1000, "head": 900}, {}, {"cap": 1000, "head": 500, "compress": False}),
+    ],
+)
+def test_resolve_output(cfg_output, args, expected):
+    assert resolve_output({"output": cfg_output}, SimpleNamespace(**args)) == expected
+
+
+def test_resolve_output_rejects_bad_size():
+    with pytest.raises(SystemExit, match="invalid output cap"):
+        resolve_output({"output": {"cap": "lots"}}, SimpleNamespace())
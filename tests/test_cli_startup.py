@@ -0,0 +1,64 @@
+"""Tests that lightweight CLI commands stay cheap to start."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ("rich", "yaml", "pydantic", "asyncio")
+# generous next to the ~25ms these take, so only a regression (e.g. importing rich or
+# pydantic again, ~250ms) trips it on a loaded machine
+BUDGET = 0.2  # seconds for importing the CLI and running the command, in-process
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+sys.argv = ["baircondor"] + sys.argv[1:]
+from baircondor import cli
+try:
+    cli.main()
+except SystemExit:
+    pass
+elapsed = time.perf_counter() - start
+heavy = sorted(m for m in sys.modules if m.split(".")[0] in {heavy!r})
+print(json.dumps({{"heavy": heavy, "elapsed": elapsed}}))
+"""
+
+
+def _startup(tmp_path, *argv):
+    env = {"HOME": str(tmp_path), "PATH": "/usr/bin:/bin", "USER": "alice"}
+    code = PROBE.format(heavy=set(HEAVY))
+    result = subprocess.run(
+        [sys.executable, "-c", code, *argv],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("command", ["last", "config"])
+def test_light_commands_do_not_import_heavy_modules(tmp_path, command):
+    assert _startup(tmp_path, command)["heavy"] == []
+
+
+@pytest.mark.parametrize("command", ["last", "config"])
+def test_light_commands_start_within_budget(tmp_path, command):
+    # best of a few runs, so one slow start on a busy machine doesn't fail the test
+    elapsed = min(_startup(tmp_path, command)["elapsed"] for _ in range(3))
+    assert elapsed < BUDGET, f"baircondor {command} took {elapsed * 1000:.0f}ms"
+
+
+def test_package_import_is_lazy(tmp_path):
+    env = {"HOME": str(tmp_path), "PATH": "/usr/bin:/bin"}
+    code = "import sys, baircondor; print('pydantic' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert out.stdout.strip() == "False"
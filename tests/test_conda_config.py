@@ -1,9 +1,11 @@
 """Tests for conda base resolution."""
 
+import asyncio
+import os
 import subprocess
 from types import SimpleNamespace
 
-from baircondor.config import resolve_conda, resolve_pin_submit_host
+from baircondor.config import _autodetect_conda_base, resolve_conda, resolve_pin_submit_host
 
 
 def _args(conda_env=None, conda_base=None):
@@ -69,3 +71,107 @@ def test_pin_submit_host_cli_override():
     args = _args()
     args.pin_submit_host = False
     assert resolve_pin_submit_host(cfg, args) is False
+
+
+# ── conda base cache ──────────────────────────────────────────────────────────
+
+
+def _fake_conda(tmp_path, monkeypatch):
+    """A conda install whose `conda info --base` calls are counted."""
+    base = tmp_path / "miniconda3"
+    (base / "bin").mkdir(parents=True)
+    exe = base / "bin" / "conda"
+    exe.write_text("#!/bin/sh\n")
+    monkeypatch.setenv("CONDA_EXE", str(exe))
+    calls = []
+
+    def fake_run(*args, **kwargs):
+        calls.append(args[0])
+        return subprocess.CompletedProcess(args=args[0], returncode=0, stdout=f"{base}\n")
+
+    monkeypatch.setattr("baircondor.config.subprocess.run", fake_run)
+    return base, exe, calls
+
+
+def test_conda_base_cached_across_calls(tmp_path, monkeypatch):
+    base, _, calls = _fake_conda(tmp_path, monkeypatch)
+    cfg = {"conda": {"conda_base": None}}
+    assert resolve_conda(cfg, _args(conda_env="myenv"))["conda_base"] == str(base)
+    assert resolve_conda(cfg, _args(conda_env="myenv"))["conda_base"] == str(base)
+    assert len(calls) == 1
+
+
+def test_conda_base_cache_invalidated_by_binary_mtime(tmp_path, monkeypatch):
+    base, exe, calls = _fake_conda(tmp_path, monkeypatch)
+    _autodetect_conda_base()
+    st = exe.stat()
+    os.utime(exe, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    _autodetect_conda_base()
+    assert len(calls) == 2
+
+
+def test_conda_base_cache_invalidated_by_path(tmp_path, monkeypatch):
+    _, _, calls = _fake_conda(tmp_path, monkeypatch)
+    _autodetect_conda_base()
+    monkeypatch.setenv("PATH", "/somewhere/else:" + os.environ.get("PATH", ""))
+    _autodetect_conda_base()
+    assert len(calls) == 2
+
+
+def test_conda_base_cache_ignores_vanished_base(tmp_path, monkeypatch):
+    base, _, calls = _fake_conda(tmp_path, monkeypatch)
+    _autodetect_conda_base()
+    (base / "bin" / "conda").rename(tmp_path / "conda")
+    (base / "bin").rmdir()
+    base.rmdir()
+    _autodetect_conda_base()
+    assert len(calls) == 2
+
+
+def test_wizard_shares_the_cache(tmp_path, monkeypatch):
+    from baircondor import setup
+
+    base, _, calls = _fake_conda(tmp_path, monkeypatch)
+    _autodetect_conda_base()
+
+    answers = iter(["~/scratch", "", "24G", "8G"])
+    monkeypatch.setattr("rich.prompt.Prompt.ask", lambda *a, **k: next(answers) or k["default"])
+    monkeypatch.setattr("builtins.input", lambda *a: "n")
+    monkeypatch.setattr(setup, "detect_gpu_memory", lambda: "24G")
+    setup.run_wizard(tmp_path / "config.yaml")
+
+    assert len(calls) == 1
+    assert f"conda_base: {base}" in (tmp_path / "config.yaml").read_text()
+
+
+def test_async_probe_shares_the_cache(tmp_path, monkeypatch):
+    from baircondor import aio
+
+    base, _, calls = _fake_conda(tmp_path, monkeypatch)
+    runs = []
+
+    async def fake_run(cmd, **kwargs):
+        runs.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout=f"{base}\n", stderr="")
+
+    monkeypatch.setattr(aio, "_run", fake_run)
+    assert asyncio.run(aio._conda_base({"env": "myenv"})) == str(base)
+    assert asyncio.run(aio._conda_base({"env": "myenv"})) == str(base)
+    assert _autodetect_conda_base() == str(base)
+    assert len(runs) == 1 and calls == []
+
+
+def test_detection_runs_in_the_given_environment(tmp_path, monkeypatch):
+    base, exe, _ = _fake_conda(tmp_path, monkeypatch)
+    envs = []
+
+    def fake_run(cmd, **kwargs):
+        envs.append(kwargs.get("env"))
+        return subprocess.CompletedProcess(cmd, 0, stdout=f"{base}\n")
+
+    monkeypatch.setattr("baircondor.config.subprocess.run", fake_run)
+    client = {"PATH": "/client/bin", "CONDA_EXE": str(exe)}
+    assert _autodetect_conda_base(client) == str(base)
+    assert envs == [client]
+    _autodetect_conda_base()  # our own PATH differs, so this isn't the client's entry
+    assert envs == [client, None]
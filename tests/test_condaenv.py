@@ -0,0 +1,249 @@
+"""Tests for cached conda activation and packed envs (condaenv.py and the run.sh it feeds)."""
+
+import fcntl
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from baircondor import condaenv
+from baircondor.api import submit
+from baircondor.condaenv import _delta, cached_activation, env_hash, env_prefix, packed_env
+from baircondor.templates import _render_run_sh
+
+# stands in for etc/profile.d/conda.sh: `conda activate` prepends the env's bin to PATH,
+# sets CONDA_PREFIX and leaves a trace so tests can tell a real activation from a replay
+CONDA_SH = """\
+conda() {
+    [[ "$1" == activate ]] || return 1
+    export CONDA_PREFIX="$BASE/envs/$2"
+    export PATH="$CONDA_PREFIX/bin:$PATH"
+    export MY_TOOL_HOME="$CONDA_PREFIX/share/tool"
+    unset GONE
+    touch "$BASE/activated"
+}
+"""
+
+
+@pytest.fixture
+def base(tmp_path, monkeypatch):
+    base = tmp_path / "conda"
+    (base / "etc" / "profile.d").mkdir(parents=True)
+    (base / "etc" / "profile.d" / "conda.sh").write_text(f"BASE={base}\n" + CONDA_SH)
+    (base / "envs" / "train" / "conda-meta").mkdir(parents=True)
+    (base / "envs" / "train" / "conda-meta" / "history").write_text("==> install\n")
+    monkeypatch.setenv("GONE", "1")
+    return base
+
+
+def _run_sh(tmp_path, conda, command):
+    run_dir = Path(tempfile.mkdtemp(prefix="run", dir=tmp_path))
+    (run_dir / "run.sh").write_text(_render_run_sh(run_dir, tmp_path, "job", {"gpus": 0}, conda))
+    result = subprocess.run(
+        ["/bin/bash", str(run_dir / "run.sh"), "--", "bash", "-c", command],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout
+
+
+def test_delta_keeps_path_edits_relative():
+    before = {"PATH": "/usr/bin", "GONE": "1", "SAME": "x", "LIB": "/a"}
+    after = {"PATH": "/env/bin:/usr/bin", "SAME": "x", "LIB": "/a:/env/lib", "NEW": "it's"}
+    assert _delta(before, after) == [
+        "unset GONE",
+        'export LIB="${LIB:-}":/env/lib',
+        "export NEW='it'\"'\"'s'",
+        'export PATH=/env/bin:"${PATH:-}"',
+    ]
+
+
+def test_env_prefix(base, tmp_path):
+    assert env_prefix(str(base), "train") == base / "envs" / "train"
+    assert env_prefix(str(base), str(base / "envs" / "train")) == base / "envs" / "train"
+    assert env_prefix(str(base), "missing") is None
+
+
+def test_activation_is_captured_once(base, tmp_path, monkeypatch):
+    conda = {"env": "train", "conda_base": str(base)}
+    first = cached_activation(conda, tmp_path / "cache")
+    assert (base / "activated").exists()
+    monkeypatch.setattr(condaenv, "_capture", lambda *a: pytest.fail("activated again"))
+    assert cached_activation(conda, tmp_path / "cache") == first
+
+
+def test_activation_is_captured_per_starting_environment(base, tmp_path, monkeypatch):
+    conda = {"env": "train", "conda_base": str(base)}
+    plain = cached_activation(conda, tmp_path / "cache")
+    monkeypatch.setenv("CONDA_PREFIX", str(base / "envs" / "other"))
+    monkeypatch.setenv("PATH", f"{base}/envs/other/bin:{os.environ['PATH']}")
+    from_other = cached_activation(conda, tmp_path / "cache")
+    assert from_other["script"] != plain["script"]
+
+
+def test_activation_is_captured_in_the_given_environment(base, tmp_path):
+    conda = {"env": "train", "conda_base": str(base)}
+    ours = cached_activation(conda, tmp_path / "cache")
+    client = {k: v for k, v in os.environ.items() if k != "GONE"}
+    client["CONDA_PREFIX"] = str(base / "envs" / "other")
+    theirs = cached_activation(conda, tmp_path / "cache", client)
+    assert theirs["script"] != ours["script"]
+    assert "unset GONE" in Path(ours["script"]).read_text()
+    assert "unset GONE" not in Path(theirs["script"]).read_text()
+
+
+def test_run_sh_replays_cached_activation(base, tmp_path):
+    conda = {"env": "train", "conda_base": str(base)}
+    conda["activation"] = cached_activation(conda, tmp_path / "cache")
+    (base / "activated").unlink()
+
+    out = _run_sh(tmp_path, conda, 'echo "$CONDA_PREFIX|${PATH%%:*}|${GONE:-unset}"')
+    prefix = base / "envs" / "train"
+    assert out == f"{prefix}|{prefix}/bin|unset\n"
+    assert not (base / "activated").exists()  # conda never ran
+
+
+def test_run_sh_activates_for_real_when_env_changed(base, tmp_path):
+    conda = {"env": "train", "conda_base": str(base)}
+    conda["activation"] = cached_activation(conda, tmp_path / "cache")
+    (base / "activated").unlink()
+    history = base / "envs" / "train" / "conda-meta" / "history"
+    os.utime(history, (1, 1))  # e.g. a package was installed after submission
+
+    out = _run_sh(tmp_path, conda, 'echo "$CONDA_PREFIX"')
+    assert out == f"{base}/envs/train\n"
+    assert (base / "activated").exists()
+
+
+def test_failed_activation_is_not_cached(base, tmp_path):
+    conda = {"env": "train", "conda_base": str(base)}
+    (base / "etc" / "profile.d" / "conda.sh").write_text("conda() { return 1; }\n")
+    assert cached_activation(conda, tmp_path / "cache") is None
+    assert not (tmp_path / "cache").exists()
+
+
+def test_submit_records_cached_activation(base, tmp_path):
+    run_dir = submit(
+        [sys.executable, "-c", "pass"],
+        gpus=0,
+        scratch=str(tmp_path / "scratch"),
+        conda_env="train",
+        conda_base=str(base),
+        cache_conda_activation=True,
+        dry_run=True,
+    )
+    activation = json.loads((run_dir / "meta.json").read_text())["conda"]["activation"]
+    assert activation["script"].startswith(str(tmp_path / "scratch" / "condor-runs"))
+    assert f'source "{activation["script"]}"' in (run_dir / "run.sh").read_text()
+
+
+# ── packed envs ──────────────────────────────────────────────────────────────
+
+# stands in for conda-pack: tars up the prefix as is
+FAKE_CONDA_PACK = """\
+#!/bin/bash
+while [[ $# -gt 0 ]]; do
+    case "$1" in
+        --prefix) prefix="$2"; shift 2 ;;
+        --output) output="$2"; shift 2 ;;
+        *) shift ;;
+    esac
+done
+tar -czf "$output" -C "$prefix" .
+"""
+
+
+@pytest.fixture
+def packable(base, tmp_path, monkeypatch):
+    """The ``train`` env with what a conda-pack tarball provides, and conda-pack on PATH."""
+    bin_dir = base / "envs" / "train" / "bin"
+    bin_dir.mkdir()
+    os.symlink(sys.executable, bin_dir / "python")
+    (bin_dir / "conda-unpack").write_text(
+        f"with open({str(tmp_path / 'unpacked')!r}, 'a') as f:\n    f.write('x')\n"
+    )
+    (bin_dir / "activate").write_text(textwrap.dedent("""\
+            export CONDA_PREFIX="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
+            export PATH="$CONDA_PREFIX/bin:$PATH"
+            """))
+    tools = tmp_path / "tools"
+    tools.mkdir()
+    (tools / "conda-pack").write_text(FAKE_CONDA_PACK)
+    (tools / "conda-pack").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tools}:{os.environ['PATH']}")
+    return {"env": "train", "conda_base": str(base)}
+
+
+def _packed(conda, tmp_path, keep=3):
+    packed = packed_env(conda, tmp_path / "cache")
+    return {**conda, "packed": {**packed, "local_dir": str(tmp_path / "node"), "keep": keep}}
+
+
+def test_env_hash_follows_installed_packages(base):
+    prefix = base / "envs" / "train"
+    before = env_hash(prefix)
+    assert env_hash(prefix) == before
+    (prefix / "conda-meta" / "numpy-2.0.0-py312_0.json").write_text("{}")
+    assert env_hash(prefix) != before
+
+
+def test_env_is_packed_once(packable, tmp_path, monkeypatch):
+    first = packed_env(packable, tmp_path / "cache")
+    assert first["tarball"] == str(tmp_path / "cache" / "packs" / f"{first['hash']}.tar.gz")
+    monkeypatch.setattr(condaenv, "_pack", lambda *a: pytest.fail("packed again"))
+    assert packed_env(packable, tmp_path / "cache") == first
+
+
+def test_missing_conda_pack_is_an_error(base, tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", "/nonexistent")
+    with pytest.raises(RuntimeError, match="conda-pack is not installed"):
+        packed_env({"env": "train", "conda_base": str(base)}, tmp_path / "cache")
+
+
+def test_concurrent_jobs_unpack_once_per_node(packable, tmp_path):
+    conda = _packed(packable, tmp_path)
+    with ThreadPoolExecutor(6) as pool:
+        outs = list(pool.map(lambda _: _run_sh(tmp_path, conda, 'echo "$CONDA_PREFIX"'), range(6)))
+    local = tmp_path / "node" / conda["packed"]["hash"]
+    assert set(outs) == {f"{local}\n"}
+    assert (tmp_path / "unpacked").read_text() == "x"
+
+
+def test_least_recently_used_envs_are_evicted_unless_in_use(packable, tmp_path):
+    old = _packed(packable, tmp_path, keep=1)
+    _run_sh(tmp_path, old, "true")
+    old_dir = tmp_path / "node" / old["packed"]["hash"]
+    meta = Path(packable["conda_base"]) / "envs" / "train" / "conda-meta"
+
+    (meta / "torch-2.5.0-py312_0.json").write_text("{}")  # a new version of the env
+    newer = _packed(packable, tmp_path, keep=1)
+    with open(f"{old_dir}.lock") as lock:
+        fcntl.flock(lock, fcntl.LOCK_SH)  # a job still running from the old env
+        _run_sh(tmp_path, newer, "true")
+        assert old_dir.is_dir()
+
+    (meta / "jax-0.4.0-py312_0.json").write_text("{}")
+    _run_sh(tmp_path, _packed(packable, tmp_path, keep=1), "true")
+    assert not old_dir.exists() and not (tmp_path / "node" / newer["packed"]["hash"]).exists()
+
+
+def test_shared_local_dir_falls_back_to_the_env_in_place(packable, tmp_path):
+    conda = _packed(packable, tmp_path)
+    (tmp_path / "node").mkdir()
+    (tmp_path / "node").chmod(0o777)  # e.g. pre-created by another user
+    out = _run_sh(tmp_path, conda, 'echo "$CONDA_PREFIX"')
+    assert out == f"{packable['conda_base']}/envs/train\n"
+    assert not (tmp_path / "unpacked").exists()
+    assert not list((tmp_path / "node").iterdir())
+
+
+def test_local_dir_is_created_private(packable, tmp_path):
+    _run_sh(tmp_path, _packed(packable, tmp_path), "true")
+    assert (tmp_path / "node").stat().st_mode & 0o777 == 0o700
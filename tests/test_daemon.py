@@ -0,0 +1,162 @@
+"""Tests for the submit daemon and its client."""
+
+import asyncio
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from baircondor import client
+from baircondor.client import forward_submit, private_dir, request, socket_path
+from baircondor.daemon import SubmitDaemon, _error_reply, _group_key
+
+
+@pytest.fixture
+def daemon_socket(tmp_path):
+    # keep the path short: AF_UNIX paths are limited to ~108 bytes
+    path = Path(f"/tmp/bc-test-{os.getpid()}-{time.monotonic_ns()}.sock")
+    loop = asyncio.new_event_loop()
+    daemon = SubmitDaemon(window=0.3)
+    task = loop.create_task(daemon.serve(path))
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            loop.close()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if path.exists():
+            break
+        time.sleep(0.01)
+    yield path
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(timeout=5)
+    path.unlink(missing_ok=True)
+
+
+def _submit_payload(tmp_path, command, tag=None):
+    return {
+        "op": "submit",
+        "cwd": str(tmp_path),
+        "env": {"PATH": "/usr/bin:/bin"},
+        "args": {
+            "command": ["--"] + command,
+            "config": str(tmp_path / "missing-config.yaml"),
+            "scratch": str(tmp_path / "scratch"),
+            "jobname": "daemon-test",
+            "gpus": 0,
+            "cpus": None,
+            "mem": None,
+            "disk": None,
+            "tag": tag,
+            "dry_run": True,
+            "quiet": True,
+        },
+    }
+
+
+def test_request_without_daemon_returns_none(tmp_path):
+    assert request({"op": "ping"}, tmp_path / "nope.sock") is None
+
+
+def test_ping(daemon_socket):
+    reply = request({"op": "ping"}, daemon_socket, timeout=5)
+    assert reply["ok"] is True
+    assert reply["pid"] == os.getpid()
+
+
+def test_rejects_empty_command(daemon_socket, tmp_path):
+    reply = request(_submit_payload(tmp_path, []), daemon_socket, timeout=5)
+    assert reply["ok"] is False
+
+
+def test_coalesces_concurrent_submissions(daemon_socket, tmp_path):
+    payloads = [_submit_payload(tmp_path, ["echo", str(i)], tag=f"t{i}") for i in range(3)]
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        replies = list(ex.map(lambda p: request(p, daemon_socket, timeout=10), payloads))
+
+    assert all(r["ok"] for r in replies), replies
+    run_dirs = [Path(r["run_dir"]) for r in replies]
+    assert len(set(run_dirs)) == 3
+    # all three were rendered into a single multi-proc submit file
+    sweep_subs = list((tmp_path / "scratch").rglob("sweep.sub"))
+    assert len(sweep_subs) == 1
+    text = sweep_subs[0].read_text()
+    for run_dir in run_dirs:
+        assert f"  {run_dir}, {run_dir}/run.sh -- echo" in text
+
+
+def test_group_key_ignores_per_task_args(tmp_path):
+    a = _submit_payload(tmp_path, ["echo", "a"], tag="x")
+    b = _submit_payload(tmp_path, ["echo", "b"], tag="y")
+    assert _group_key(a) == _group_key(b)
+
+    c = _submit_payload(tmp_path, ["echo", "c"])
+    c["args"]["gpus"] = 2
+    assert _group_key(a) != _group_key(c)
+
+    d = _submit_payload(tmp_path, ["echo", "d"])
+    d["env"] = {"PATH": "/opt/bin"}
+    assert _group_key(a) != _group_key(d)
+
+
+def test_socket_defaults_to_a_private_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    path = socket_path("alice")
+    assert path == tmp_path / "baircondor-alice" / "baircondor-alice.sock"
+    private_dir(path.parent)
+    assert path.parent.stat().st_mode & 0o777 == 0o700
+
+
+def test_private_dir_rejects_a_shared_dir(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir(mode=0o777)
+    shared.chmod(0o777)
+    with pytest.raises(SystemExit, match="must be a directory private to you"):
+        private_dir(shared)
+
+
+def test_request_refuses_other_users_daemon(daemon_socket, monkeypatch):
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(daemon_socket).st_uid + 1)
+    assert request({"op": "ping"}, daemon_socket, timeout=5) is None
+
+
+def test_forward_submit_makes_paths_absolute(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sent = []
+    monkeypatch.setattr(client, "request", lambda payload, path: sent.append(payload) or None)
+    args = Namespace(command=["--", "true"], config="cfg.yaml", scratch="~/s", conda_base=None)
+    assert forward_submit(args) is False
+    assert sent[0]["args"]["config"] == str(tmp_path / "cfg.yaml")
+    assert sent[0]["args"]["scratch"] == os.path.expanduser("~/s")
+    assert sent[0]["args"]["conda_base"] is None
+
+
+def test_unsweepable_requests_are_submitted_one_by_one(daemon_socket, tmp_path):
+    payloads = [_submit_payload(tmp_path, ["echo", str(i)]) for i in range(2)]
+    for payload in payloads:
+        payload["args"]["scratch"] = str(tmp_path / "my scratch")
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        replies = list(ex.map(lambda p: request(p, daemon_socket, timeout=10), payloads))
+
+    assert all(r["ok"] for r in replies), replies
+    assert len({r["run_dir"] for r in replies}) == 2
+    assert not list((tmp_path / "my scratch").rglob("sweep.sub"))
+
+
+def test_condor_submit_failure_reaches_the_client():
+    e = subprocess.CalledProcessError(1, ["condor_submit"], "", "ERROR: quota exceeded\n")
+    assert _error_reply(e) == {"ok": False, "error": "ERROR: quota exceeded", "exit_code": 1}
+    assert _error_reply(SystemExit("error: bad flag"))["error"] == "bad flag"
@@ -0,0 +1,150 @@
+"""Tests for `baircondor du` / `baircondor gc` (disk usage and cleanup of run dirs)."""
+
+import json
+import os
+import sys
+from datetime import timedelta
+
+import pytest
+
+from baircondor import disk
+from baircondor.disk import delete_runs, gc_candidates, parse_age, run_sizes, run_states
+from baircondor.history import append_entry, record_states
+from baircondor.runs import scan
+
+SUBMIT = "000 (7.000.000) 2026-05-15 14:23:01 Job submitted from host: <10.0.0.1:9618>\n...\n"
+EXECUTE = "001 (7.000.000) 2026-05-15 14:23:09 Job executing on host: <10.0.0.7:9618>\n...\n"
+DONE = "005 (7.000.000) 2026-05-15 16:00:00 Job terminated.\n\t(1) Normal termination (return value 0)\n...\n"  # noqa: E501
+
+
+def _run(root, jobname, run_id, *events, timestamp="2026-01-01T12:00:00+00:00", size=0):
+    run_dir = root / "alice" / jobname / run_id
+    run_dir.mkdir(parents=True)
+    (run_dir / "meta.json").write_text(json.dumps({"jobname": jobname, "timestamp": timestamp}))
+    (run_dir / "condor.log").write_text("".join(events))
+    if size:
+        (run_dir / "ckpt.bin").write_bytes(os.urandom(size))
+    return run_dir
+
+
+def _record(run_dir, timestamp, project=None, jobname="train"):
+    return {
+        "run_dir": str(run_dir),
+        "user": "alice",
+        "project": project,
+        "jobname": jobname,
+        "timestamp": timestamp,
+    }
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [("30d", timedelta(days=30)), ("12h", timedelta(hours=12)), ("2w", timedelta(weeks=2)),
+     ("1.5", timedelta(days=1.5))],
+)  # fmt: skip
+def test_parse_age(text, expected):
+    assert parse_age(text) == expected
+
+
+def test_parse_age_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_age("30 days")
+
+
+def test_tree_size_counts_hardlinks_once(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "a").write_bytes(b"x" * 100_000)
+    os.link(tmp_path / "sub" / "a", tmp_path / "b")
+    once = disk._tree_size(str(tmp_path))
+    assert 100_000 <= once < 200_000
+
+
+def test_finished_run_sizes_are_cached(tmp_path, monkeypatch):
+    done = _run(tmp_path, "train", "r1", SUBMIT, EXECUTE, DONE, size=50_000)
+    running = _run(tmp_path, "train", "r2", SUBMIT, EXECUTE, size=10_000)
+    records = [{"run_dir": str(done)}, {"run_dir": str(running)}]
+    first = run_sizes(records)
+    assert first[str(done)] >= 50_000 and first[str(running)] >= 10_000
+
+    walked = []
+    real = disk._tree_size
+    monkeypatch.setattr(disk, "_tree_size", lambda p: walked.append(p) or real(p))
+    assert run_sizes(records) == first
+    assert walked == [str(running)]  # the finished run came from the cache
+
+
+def test_vanished_run_has_no_size(tmp_path):
+    assert run_sizes([{"run_dir": str(tmp_path / "gone")}]) == {str(tmp_path / "gone"): 0}
+
+
+def test_run_states_never_let_history_override_a_live_log(tmp_path):
+    hfile = tmp_path / "history.jsonl"
+    requeued = _run(tmp_path, "train", "r1", SUBMIT)
+    append_entry(requeued, "train", "7.0", 1, ["python"], "alice", hfile)
+    record_states({str(requeued): {"status": "done", "exit_code": 0}}, hfile)
+    with open(requeued / "condor.log", "a") as log:
+        log.write(EXECUTE)  # the log moved on after the state was recorded
+    finished = _run(tmp_path, "train", "r2", SUBMIT, EXECUTE, DONE)
+    unknown = _run(tmp_path, "train", "r3")
+    records = [{"run_dir": str(d)} for d in (requeued, finished, unknown)]
+    assert run_states(records, hfile) == {
+        str(requeued): "running",
+        str(finished): "done",
+        str(unknown): "?",
+    }
+
+
+def test_gc_candidates_never_include_active_or_unknown_runs():
+    records = [_record(f"/r/{s}", "2026-01-01T00:00:00") for s in ("running", "idle", "held", "?")]
+    statuses = {r["run_dir"]: r["run_dir"][3:] for r in records}
+    assert gc_candidates(records, statuses) == []
+
+
+def test_gc_candidates_filters():
+    records = [  # newest first, like scan()
+        _record("/r/new", "2099-01-01T00:00:00"),
+        _record("/r/a", "2026-01-03T00:00:00"),
+        _record("/r/b", "2026-01-02T00:00:00"),
+        _record("/r/c", "2026-01-01T00:00:00"),
+        _record("/r/other", "2026-01-01T00:00:00", jobname="eval"),
+    ]
+    statuses = {r["run_dir"]: "done" for r in records}
+    statuses["/r/b"] = "failed"
+
+    def dirs(**kw):
+        return [r["run_dir"] for r in gc_candidates(records, statuses, **kw)]
+
+    assert dirs(older_than=timedelta(days=30)) == ["/r/a", "/r/b", "/r/c", "/r/other"]
+    assert dirs(keep_last=2) == ["/r/b", "/r/c"]  # per jobname; "eval" has only one
+    assert dirs(keep_last=1, status={"done"}) == ["/r/a", "/r/c"]
+
+
+def test_delete_runs_reports_failures(tmp_path):
+    a = _run(tmp_path, "train", "r1", size=1000)
+    missing = tmp_path / "alice" / "train" / "gone"
+    assert [d for d, _ in delete_runs([str(a), str(missing)])] == [str(missing)]
+    assert not a.exists()
+
+
+def test_gc_cli_keeps_running_jobs(tmp_path, monkeypatch, capsys):
+    from baircondor import cli, history
+
+    root = tmp_path / "condor-runs"
+    done = _run(root, "train", "r1", SUBMIT, EXECUTE, DONE)
+    running = _run(root, "train", "r2", SUBMIT, EXECUTE)
+    monkeypatch.setattr(history, "HISTORY_FILE", tmp_path / "history.jsonl")
+    monkeypatch.setattr(cli, "get_user", lambda: "alice")
+    argv = ["baircondor", "gc", "--older-than", "1d", "--yes", "--scratch", str(tmp_path)]
+    monkeypatch.setattr(sys, "argv", argv)
+    cli.main()
+    assert not done.exists()
+    assert running.exists()
+    assert [r["run_dir"] for r in scan(root, user="alice")] == [str(running)]
+
+
+def test_gc_cli_requires_a_limit(monkeypatch):
+    from baircondor import cli
+
+    monkeypatch.setattr(sys, "argv", ["baircondor", "gc", "--yes"])
+    with pytest.raises(SystemExit, match="--older-than"):
+        cli.main()
@@ -0,0 +1,106 @@
+"""Tests for the incremental condor.log event-log reader."""
+
+import subprocess
+
+import pytest
+
+from baircondor import cache
+from baircondor.eventlog import log_states, read_log
+from baircondor.history import append_entry, get_entries, job_states, load_states
+
+SUBMIT = "000 (1234.000.000) 2026-05-15 14:23:01 Job submitted from host: <10.0.0.1:9618>\n...\n"
+EXECUTE = (
+    "001 (1234.000.000) 2026-05-15 14:23:09 Job executing on host: "
+    "<10.0.0.7:9618?addrs=10.0.0.7-9618&alias=gpu7.example.com&noUDP>\n...\n"
+)
+HOLD = """012 (1234.000.000) 2026-05-15 15:00:00 Job was held.
+\tOut of memory
+\tCode 34 Subcode 0
+...
+"""
+RELEASE = """013 (1234.000.000) 2026-05-15 15:01:00 Job was released.
+\tvia condor_release (by user alice)
+...
+"""
+
+
+def _terminate(rv: int) -> str:
+    return f"""005 (1234.000.000) 2026-05-15 16:00:00 Job terminated.
+\t(1) Normal termination (return value {rv})
+\t\tUsr 0 00:10:00, Sys 0 00:00:01  -  Run Remote Usage
+\t0  -  Run Bytes Sent By Job
+...
+"""
+
+
+@pytest.fixture
+def run_dir(tmp_path):
+    d = tmp_path / "run"
+    d.mkdir()
+    return d
+
+
+def _write(run_dir, *events, mode="a"):
+    with open(run_dir / "condor.log", mode) as f:
+        f.write("".join(events))
+
+
+def test_running_job(run_dir):
+    _write(run_dir, SUBMIT, EXECUTE)
+    state = log_states([str(run_dir)])[str(run_dir)]
+    assert state == {"cluster_id": "1234.0", "status": "running", "host": "gpu7.example.com"}
+
+
+@pytest.mark.parametrize("rv,status", [(0, "done"), (3, "failed")])
+def test_terminated_job(run_dir, rv, status):
+    _write(run_dir, SUBMIT, EXECUTE, _terminate(rv))
+    state = log_states([str(run_dir)])[str(run_dir)]
+    assert state["status"] == status
+    assert state["exit_code"] == rv
+    assert state["completed"] == "2026-05-15T16:00:00"
+
+
+def test_reads_incrementally_from_cached_offset(run_dir):
+    _write(run_dir, SUBMIT, EXECUTE, HOLD)
+    first = read_log(run_dir / "condor.log")
+    assert first["state"]["status"] == "held"
+
+    _write(run_dir, RELEASE)
+    second = read_log(run_dir / "condor.log", first)
+    assert second["state"]["status"] == "idle"
+    assert second["offset"] == (run_dir / "condor.log").stat().st_size
+
+    # the cached entry carries state across calls; only the new event is decoded
+    assert read_log(run_dir / "condor.log", second) is second
+
+
+def test_incomplete_trailing_event_is_left_for_later(run_dir):
+    _write(run_dir, SUBMIT, EXECUTE[:40])
+    entry = read_log(run_dir / "condor.log")
+    assert entry["state"]["status"] == "idle"
+    _write(run_dir, EXECUTE[40:])
+    assert read_log(run_dir / "condor.log", entry)["state"]["status"] == "running"
+
+
+def test_cache_drops_finished_runs(run_dir):
+    _write(run_dir, SUBMIT)
+    log_states([str(run_dir)])
+    assert str(run_dir) in cache.load("eventlog.json")["runs"]
+    _write(run_dir, _terminate(0))
+    log_states([str(run_dir)])
+    assert str(run_dir) not in cache.load("eventlog.json")["runs"]
+
+
+def test_missing_log(tmp_path):
+    assert log_states([str(tmp_path / "nope")]) == {}
+
+
+def test_job_states_prefers_event_log(run_dir, tmp_path, monkeypatch):
+    hfile = tmp_path / "history.jsonl"
+    append_entry(run_dir, "job", "1234", 1, ["echo"], "alice", hfile)
+    _write(run_dir, SUBMIT, EXECUTE, _terminate(0))
+    monkeypatch.setattr(subprocess, "run", lambda *a, **k: pytest.fail("queried condor"))
+
+    [state] = job_states(get_entries(n=1, history_file=hfile), hfile)
+    assert state["status"] == "done"
+    assert load_states([str(run_dir)], hfile)[str(run_dir)]["exit_code"] == 0
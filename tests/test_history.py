@@ -6,7 +6,19 @@ from pathlib import Path
 
 import pytest
 
-from baircondor.history import append_entry, get_entries, get_job_status, get_last_dirs
+from baircondor.history import (
+    append_entry,
+    get_entries,
+    get_job_status,
+    get_last_dirs,
+    iter_entries,
+    job_states,
+    load_states,
+    migrate_to_sqlite,
+    query_job_states,
+    record_states,
+    rotate,
+)
 
 
 @pytest.fixture
@@ -93,6 +105,34 @@ def test_get_entries_respects_n(hfile):
     assert entries[0]["cluster_id"] == "9"  # most recent
 
 
+def test_get_entries_skips_torn_trailing_line(hfile):
+    append_entry(Path("/tmp/run0"), "job", "0", 1, ["echo"], "alice", hfile)
+    with open(hfile, "a") as f:
+        f.write('{"user": "alice", "run_dir": "/tmp/ha')
+    entries = get_entries(n=5, user="alice", history_file=hfile)
+    assert [e["cluster_id"] for e in entries] == ["0"]
+
+
+def test_iter_entries_across_chunk_boundaries(hfile):
+    for i in range(20):
+        append_entry(Path(f"/tmp/run{i}"), "job", str(i), 1, ["echo"], "alice", hfile)
+    entries = list(iter_entries(user="alice", history_file=hfile, chunk_size=7))
+    assert [e["cluster_id"] for e in entries] == [str(i) for i in reversed(range(20))]
+
+
+def test_get_entries_parses_only_what_it_returns(hfile, monkeypatch):
+    from baircondor import history
+
+    for i in range(1000):
+        append_entry(Path(f"/tmp/run{i}"), "job", str(i), 1, ["echo"], "alice", hfile)
+    parsed = []
+    real_loads = json.loads
+    monkeypatch.setattr(history.json, "loads", lambda s: parsed.append(s) or real_loads(s))
+    entries = get_entries(n=2, history_file=hfile)
+    assert [e["cluster_id"] for e in entries] == ["999", "998"]
+    assert len(parsed) == 2
+
+
 # ── get_job_status ────────────────────────────────────────────────────────────
 
 
@@ -148,3 +188,307 @@ def test_get_job_status_timeout_returns_question_mark(monkeypatch):
 
 def test_get_job_status_none_cluster_id():
     assert get_job_status(None) == "?"
+
+
+# ── filters / SQLite backend ──────────────────────────────────────────────────
+
+
+def _populate(history_file):
+    append_entry(Path("/tmp/a"), "train", "1", 1, ["echo"], "alice", history_file, project="p1")
+    append_entry(Path("/tmp/b"), "eval", "2.0", 1, ["echo"], "alice", history_file, project="p2")
+    append_entry(Path("/tmp/c"), "eval", "2.1", 1, ["echo"], "bob", history_file, project="p2")
+    append_entry(Path("/tmp/d"), "train", "20", 1, ["echo"], "alice", history_file, project="p1")
+
+
+@pytest.fixture(params=["jsonl", "sqlite"])
+def any_backend(request, tmp_path):
+    return tmp_path / f"history.{request.param}"
+
+
+def test_filters_by_jobname_and_project(any_backend):
+    _populate(any_backend)
+    entries = get_entries(n=10, user="alice", history_file=any_backend, jobname="train")
+    assert [e["run_dir"] for e in entries] == ["/tmp/d", "/tmp/a"]
+    entries = get_entries(n=10, history_file=any_backend, project="p2")
+    assert [e["run_dir"] for e in entries] == ["/tmp/c", "/tmp/b"]
+
+
+def test_cluster_filter_matches_sweep_procs_only(any_backend):
+    _populate(any_backend)
+    entries = get_entries(n=10, history_file=any_backend, cluster_id="2")
+    assert [e["cluster_id"] for e in entries] == ["2.1", "2.0"]
+
+
+def test_date_filters(any_backend):
+    _populate(any_backend)
+    assert len(get_entries(n=10, history_file=any_backend, since="2000-01-01")) == 4
+    assert get_entries(n=10, history_file=any_backend, until="2000-01-01") == []
+
+
+def test_sqlite_uses_wal(tmp_path):
+    import sqlite3
+
+    db = tmp_path / "history.sqlite"
+    append_entry(Path("/tmp/a"), "job", "1", 1, ["echo"], "alice", db)
+    mode = sqlite3.connect(db).execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_migrate_to_sqlite_imports_and_takes_over(hfile):
+    _populate(hfile)
+    db, count = migrate_to_sqlite(hfile)
+    assert (db, count) == (hfile.with_suffix(".sqlite"), 4)
+    assert get_last_dirs(n=2, user="alice", history_file=hfile) == [Path("/tmp/d"), Path("/tmp/b")]
+
+    # new submissions go to the database, not the JSONL file
+    before = hfile.read_text()
+    append_entry(Path("/tmp/e"), "job", "3", 1, ["echo"], "alice", hfile)
+    assert hfile.read_text() == before
+    assert get_last_dirs(n=1, user="alice", history_file=hfile) == [Path("/tmp/e")]
+    assert migrate_to_sqlite(hfile) == (db, None)
+
+
+# ── rotation ──────────────────────────────────────────────────────────────────
+
+
+def test_rotate_by_size_and_read_across_segments(hfile):
+    for i in range(6):
+        append_entry(Path(f"/tmp/run{i}"), "job", str(i), 1, ["echo"], "alice", hfile)
+        if i % 2 == 1:
+            assert rotate(hfile, max_bytes=1) is not None
+    assert not hfile.exists()
+    segments = sorted(hfile.parent.glob("history.*.jsonl.gz"))
+    assert len(segments) == 3
+    append_entry(Path("/tmp/run6"), "job", "6", 1, ["echo"], "alice", hfile)
+
+    entries = get_entries(n=10, user="alice", history_file=hfile)
+    assert [e["cluster_id"] for e in entries] == ["6", "5", "4", "3", "2", "1", "0"]
+    manifest = json.loads((hfile.parent / "history.segments.json").read_text())
+    assert [m["entries"] for m in manifest] == [2, 2, 2]
+    assert all(m["min_ts"] <= m["max_ts"] for m in manifest)
+
+
+def test_append_rotates_old_live_file(hfile):
+    old = {"timestamp": "2000-01-01T00:00:00", "user": "alice", "run_dir": "/tmp/old"}
+    hfile.write_text(json.dumps(old) + "\n")
+    append_entry(Path("/tmp/new"), "job", "1", 1, ["echo"], "alice", hfile)
+    assert len(hfile.read_text().splitlines()) == 1
+    assert get_last_dirs(n=2, user="alice", history_file=hfile) == [
+        Path("/tmp/new"),
+        Path("/tmp/old"),
+    ]
+
+
+def test_readers_see_every_entry_once_during_rotation(hfile, monkeypatch):
+    from baircondor import history
+
+    for i in range(3):
+        append_entry(Path(f"/tmp/run{i}"), "job", str(i), 1, ["echo"], "alice", hfile)
+    seen = []
+    real = history._write_manifest
+
+    def write_manifest(*args):
+        # the segment exists but isn't listed yet, then is listed while the live file stays
+        seen.append(get_last_dirs(n=10, user="alice", history_file=hfile))
+        real(*args)
+        seen.append(get_last_dirs(n=10, user="alice", history_file=hfile))
+
+    monkeypatch.setattr(history, "_write_manifest", write_manifest)
+    rotate(hfile, force=True)
+    seen.append(get_last_dirs(n=10, user="alice", history_file=hfile))
+    assert seen == [[Path("/tmp/run2"), Path("/tmp/run1"), Path("/tmp/run0")]] * 3
+
+
+def test_interrupted_rotation_is_finished_by_the_next(hfile, monkeypatch):
+    from baircondor import history
+
+    append_entry(Path("/tmp/a"), "job", "1", 1, ["echo"], "alice", hfile)
+    real = history._write_manifest
+
+    def crash(*args):
+        real(*args)
+        raise KeyboardInterrupt  # e.g. killed before the live file was removed
+
+    monkeypatch.setattr(history, "_write_manifest", crash)
+    with pytest.raises(KeyboardInterrupt):
+        rotate(hfile, force=True)
+    assert hfile.exists()
+    assert get_last_dirs(n=10, user="alice", history_file=hfile) == [Path("/tmp/a")]
+
+    monkeypatch.setattr(history, "_write_manifest", real)
+    assert rotate(hfile, force=True) is None
+    assert not hfile.exists()
+    assert get_last_dirs(n=10, user="alice", history_file=hfile) == [Path("/tmp/a")]
+
+
+def test_segments_not_opened_when_live_file_suffices(hfile, monkeypatch):
+    from baircondor import history
+
+    append_entry(Path("/tmp/a"), "job", "1", 1, ["echo"], "alice", hfile)
+    rotate(hfile, force=True)
+    append_entry(Path("/tmp/b"), "job", "2", 1, ["echo"], "alice", hfile)
+
+    opened = []
+    real = history._segment_lines
+    monkeypatch.setattr(history, "_segment_lines", lambda p: opened.append(p) or real(p))
+    assert get_last_dirs(n=1, user="alice", history_file=hfile) == [Path("/tmp/b")]
+    assert opened == []
+    assert get_entries(n=10, history_file=hfile, since="2999-01-01") == []
+    assert opened == []
+    assert len(get_entries(n=10, history_file=hfile)) == 2
+    assert len(opened) == 1
+
+
+# ── recorded job states ───────────────────────────────────────────────────────
+
+
+def _condor(queue, history):
+    """Fake subprocess.run: ``queue``/``history`` map cluster ids to command output."""
+    calls = []
+
+    def run(cmd, **kwargs):
+        calls.append(cmd[0])
+        table = queue if cmd[0] == "condor_q" else history
+        return subprocess.CompletedProcess(cmd, 0, stdout=table.get(cmd[1], ""), stderr="")
+
+    return run, calls
+
+
+def test_history_state_parses_exit_code_and_completion(monkeypatch):
+    run, _ = _condor({}, {"42": "4 3 1700000000\n"})
+    monkeypatch.setattr(subprocess, "run", run)
+    assert get_job_status("42") == "failed"
+
+
+def _bulk_condor(queue, history):
+    """Fake subprocess.run for bulk lookups: ``queue``/``history`` are -af output lines."""
+    calls = []
+
+    def run(cmd, **kwargs):
+        calls.append(cmd)
+        lines = queue if cmd[0] == "condor_q" else history
+        return subprocess.CompletedProcess(cmd, 0, stdout="".join(lines), stderr="")
+
+    return run, calls
+
+
+def test_query_job_states_uses_one_call_per_tool(monkeypatch):
+    run, calls = _bulk_condor(
+        ["20 0 2\n", "2 0 1\n"],
+        ["2 1 4 0 1700000000\n", "1 0 4 1 1700000000\n", "2 0 1 undefined 0\n"],
+    )
+    monkeypatch.setattr(subprocess, "run", run)
+    states = query_job_states(["20", "2.0", "2.1", "1", "7"])
+    assert {cid: st["status"] for cid, st in states.items()} == {
+        "20": "running",
+        "2.0": "idle",
+        "2.1": "done",
+        "1": "failed",
+        "7": "?",
+    }
+    assert [c[0] for c in calls] == ["condor_q", "condor_history"]
+    assert "member(ClusterId, {1, 2, 7, 20})" in calls[0]
+    # only procs still unresolved after condor_q are looked up in the history, and
+    # -match counts exactly those (a bare cluster id is proc 0)
+    assert calls[1][calls[1].index("-constraint") + 1] == (
+        "(ClusterId == 1 && member(ProcId, {0}))"
+        " || (ClusterId == 2 && member(ProcId, {1}))"
+        " || (ClusterId == 7 && member(ProcId, {0}))"
+    )
+    assert calls[1][calls[1].index("-match") + 1] == "3"
+
+
+def test_query_job_states_shares_one_timeout(monkeypatch):
+    timeouts = []
+
+    def run(cmd, timeout, **kwargs):
+        timeouts.append(timeout)
+        raise subprocess.TimeoutExpired(cmd, timeout)
+
+    monkeypatch.setattr(subprocess, "run", run)
+    assert query_job_states(["1", "2"], timeout=0.5) == {"1": {"status": "?"}, "2": {"status": "?"}}
+    assert len(timeouts) == 2 and timeouts[1] <= timeouts[0] <= 0.5
+
+
+def test_job_states_records_terminal_states_once(any_backend, monkeypatch):
+    _populate(any_backend)
+    entries = get_entries(n=4, history_file=any_backend)  # clusters 20, 2.1, 2.0, 1
+    run, calls = _bulk_condor(["20 0 2\n"], ["2 1 4 0 1700000000\n", "2 0 3 undefined 0\n"])
+    monkeypatch.setattr(subprocess, "run", run)
+
+    states = job_states(entries, any_backend)
+    assert [s["status"] for s in states] == ["running", "done", "removed", "?"]
+    assert states[1]["exit_code"] == 0 and "completed" in states[1]
+
+    calls.clear()
+    again = job_states(entries, any_backend)
+    assert again == states
+    # only the running job and the unknown one are asked about again
+    assert "member(ClusterId, {1, 20})" in calls[0]
+
+
+def test_recorded_states_are_per_run_dir(any_backend, monkeypatch):
+    # cluster ids are per-schedd: the same id from another submit host is another job
+    append_entry(Path("/tmp/host1"), "train", "1234", 1, ["echo"], "alice", any_backend)
+    append_entry(Path("/tmp/host2"), "train", "1234", 1, ["echo"], "alice", any_backend)
+    record_states({"/tmp/host1": {"status": "done", "exit_code": 0}}, any_backend)
+    assert load_states(["/tmp/host1", "/tmp/host2"], any_backend) == {
+        "/tmp/host1": {"status": "done", "exit_code": 0}
+    }
+    run, _ = _bulk_condor(["1234 0 2\n"], [])
+    monkeypatch.setattr(subprocess, "run", run)
+    states = job_states(get_entries(n=2, history_file=any_backend), any_backend)
+    assert [s["status"] for s in states] == ["running", "done"]
+
+
+def test_job_states_skips_entries_without_cluster(hfile, monkeypatch):
+    append_entry(Path("/tmp/i"), "interactive", None, 0, ["bash"], "alice", hfile)
+    monkeypatch.setattr(subprocess, "run", lambda *a, **k: pytest.fail("queried condor"))
+    assert job_states(get_entries(n=1, history_file=hfile), hfile) == [{"status": "?"}]
+
+
+# ── concurrent appends ────────────────────────────────────────────────────────
+
+
+def _hammer(history_file, writer, n, rotate_bytes):
+    from baircondor import history
+
+    history.ROTATE_BYTES = rotate_bytes
+    for i in range(n):
+        # ~9 KiB per entry: well past what a single unlocked write keeps atomic
+        append_entry(
+            Path(f"/tmp/{writer}/{i}"), "x" * 9000, f"{writer}.{i}", 0, [], "alice", history_file
+        )
+
+
+@pytest.mark.parametrize("rotate_bytes", [10**9, 200_000], ids=["no-rotation", "rotating"])
+def test_concurrent_writers_lose_nothing(hfile, rotate_bytes):
+    import multiprocessing
+
+    writers, n = 8, 40
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_hammer, args=(hfile, w, n, rotate_bytes)) for w in range(writers)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+        assert p.exitcode == 0
+
+    entries = get_entries(n=10**6, history_file=hfile)
+    assert sorted(e["cluster_id"] for e in entries) == sorted(
+        f"{w}.{i}" for w in range(writers) for i in range(n)
+    )
+    if rotate_bytes < 10**9:
+        assert list(hfile.parent.glob("history.*.jsonl.gz"))
+
+
+def test_link_lock_fallback_when_lockf_unsupported(hfile, monkeypatch):
+    import fcntl
+
+    def no_locks(fd, op):
+        raise OSError(37, "No locks available")
+
+    monkeypatch.setattr(fcntl, "lockf", no_locks)
+    append_entry(Path("/tmp/a"), "job", "1", 1, ["echo"], "alice", hfile)
+    assert get_last_dirs(n=1, history_file=hfile) == [Path("/tmp/a")]
+    assert list(hfile.parent.iterdir()) == [hfile]  # lock files cleaned up
@@ -6,8 +6,8 @@ from types import SimpleNamespace
 
 import pytest
 
-from baircondor.submit import _condor_escape_arg, _patch_args
-from baircondor.templates import write_job_sub
+from baircondor.submit import _condor_escape_arg, _format_args
+from baircondor.templates import _render_job_sub, _render_sweep_sub, write_job_sub
 
 submit_mod = importlib.import_module("baircondor.submit")
 
@@ -88,12 +88,38 @@ def test_job_batch_name(run_dir, repo_dir):
 
 
 def test_arguments_placeholder_present(run_dir, repo_dir):
-    """Template should emit the placeholder that _patch_args will replace."""
+    """Without explicit arguments, write_job_sub emits a placeholder line."""
     resources = {"gpus": 1, "cpus": 6, "mem": "24G", "disk": None}
     text = _sub_text(run_dir, repo_dir, resources)
     assert "arguments = __ARGS_PLACEHOLDER__" in text
 
 
+def test_sweep_sub_uses_queue_from(repo_dir):
+    resources = {"gpus": 1, "cpus": 6, "mem": "24G", "disk": None}
+    tasks = [
+        (Path("/runs/a"), "/runs/a/run.sh -- python train.py --lr 1e-4"),
+        (Path("/runs/b"), "/runs/b/run.sh -- python train.py --tags x,y"),
+    ]
+    text = _render_sweep_sub(repo_dir, resources, "sweep", "host", True, True, tasks)
+    assert 'arguments = "$(task_args)"' in text
+    assert "output = $(run_dir)/stdout.txt" in text
+    assert "log    = $(run_dir)/condor.log" in text
+    assert text.endswith(
+        "queue run_dir, task_args from (\n"
+        "  /runs/a, /runs/a/run.sh -- python train.py --lr 1e-4\n"
+        "  /runs/b, /runs/b/run.sh -- python train.py --tags x,y\n"
+        ")\n"
+    )
+
+
+def test_capture_moves_condor_streams_out_of_the_way(run_dir, repo_dir):
+    resources = {"gpus": 1, "cpus": 6, "mem": "24G", "disk": None}
+    text = _render_job_sub(run_dir, repo_dir, resources, "job", "host", True, True, "x", True)
+    assert "output = /dev/null" in text
+    assert f"error  = {run_dir}/capture.err" in text
+    assert "stdout.txt" not in text
+
+
 # --- HTCondor argument escaping tests ---
 
 
@@ -120,40 +146,32 @@ class TestCondorEscapeArg:
         assert _condor_escape_arg("/usr/local/bin/python") == "/usr/local/bin/python"
 
 
-class TestPatchArgs:
-    def test_simple_command(self, tmp_path):
-        job_sub = tmp_path / "job.sub"
-        job_sub.write_text("arguments = __ARGS_PLACEHOLDER__\n")
+class TestFormatArgs:
+    def test_simple_command(self):
         run_sh = Path("/home/user/runs/run.sh")
-        _patch_args(job_sub, run_sh, ["python", "train.py"])
-        text = job_sub.read_text()
-        assert text == 'arguments = "/home/user/runs/run.sh -- python train.py"\n'
+        assert _format_args(run_sh, ["python", "train.py"]) == (
+            "/home/user/runs/run.sh -- python train.py"
+        )
 
-    def test_path_with_spaces(self, tmp_path):
-        job_sub = tmp_path / "job.sub"
-        job_sub.write_text("arguments = __ARGS_PLACEHOLDER__\n")
+    def test_path_with_spaces(self):
         run_sh = Path("/my dir/runs/run.sh")
-        _patch_args(job_sub, run_sh, ["echo", "hello"])
-        text = job_sub.read_text()
-        assert text == """arguments = "'/my dir/runs/run.sh' -- echo hello"\n"""
+        assert _format_args(run_sh, ["echo", "hello"]) == "'/my dir/runs/run.sh' -- echo hello"
 
-    def test_args_with_double_quotes(self, tmp_path):
-        job_sub = tmp_path / "job.sub"
-        job_sub.write_text("arguments = __ARGS_PLACEHOLDER__\n")
+    def test_args_with_double_quotes(self):
         run_sh = Path("/home/user/run.sh")
-        _patch_args(job_sub, run_sh, ["echo", 'say "hi"'])
-        text = job_sub.read_text()
-        assert 'arguments = "/home/user/run.sh -- echo \'say ""hi""\'"\n' == text
-
-    def test_preserves_surrounding_content(self, tmp_path):
-        job_sub = tmp_path / "job.sub"
-        job_sub.write_text("universe = vanilla\narguments = __ARGS_PLACEHOLDER__\ngetenv = True\n")
-        run_sh = Path("/home/user/run.sh")
-        _patch_args(job_sub, run_sh, ["python", "test.py"])
-        text = job_sub.read_text()
+        assert (
+            _format_args(run_sh, ["echo", 'say "hi"'])
+            == """/home/user/run.sh -- echo 'say ""hi""'"""
+        )
+
+    def test_rendered_into_job_sub(self, run_dir, repo_dir):
+        resources = {"gpus": 1, "cpus": 6, "mem": "24G", "disk": None}
+        args = _format_args(Path("/home/user/run.sh"), ["python", "test.py"])
+        text = _render_job_sub(run_dir, repo_dir, resources, "job", "host", True, True, args)
         assert "universe = vanilla\n" in text
         assert "getenv = True\n" in text
-        assert 'arguments = "/home/user/run.sh -- python test.py"' in text
+        assert 'arguments = "/home/user/run.sh -- python test.py"\n' in text
+        assert "__ARGS_PLACEHOLDER__" not in text
 
 
 def test_get_submit_host_uses_hostname_f(monkeypatch):
@@ -166,6 +184,16 @@ def test_get_submit_host_uses_hostname_f(monkeypatch):
     assert submit_mod._get_submit_host() == "redlradadm35840.ad.medctr.ucla.edu"
 
 
+def test_get_submit_host_falls_back_to_getfqdn(monkeypatch):
+    def missing(cmd, text):
+        raise FileNotFoundError(cmd[0])
+
+    monkeypatch.setattr(submit_mod.subprocess, "check_output", missing)
+    monkeypatch.setattr(submit_mod.socket, "getfqdn", lambda: "Node1.Example.COM")
+
+    assert submit_mod._get_submit_host() == "node1.example.com"
+
+
 def test_run_submit_pins_to_hostname_f(monkeypatch, tmp_path):
     monkeypatch.setattr(
         submit_mod,
@@ -192,7 +220,7 @@ def test_run_submit_pins_to_hostname_f(monkeypatch, tmp_path):
     monkeypatch.setattr(submit_mod, "resolve_conda", lambda cfg, args: {})
     monkeypatch.setattr(submit_mod, "_validate_conda", lambda conda: None)
     monkeypatch.setattr(submit_mod, "_submit", lambda *args, **kwargs: None)
-    monkeypatch.setattr(submit_mod, "write_meta", lambda *args, **kwargs: None)
+    monkeypatch.setattr(submit_mod, "render_meta", lambda *args, **kwargs: "{}\n")
     monkeypatch.setattr(
         submit_mod.subprocess,
         "check_output",
@@ -1,10 +1,14 @@
 """Tests for meta.json generation."""
 
+import importlib
 import json
+import subprocess
 
 import pytest
 
-from baircondor.meta import write_meta
+from baircondor.meta import _git_info, write_meta
+
+meta = importlib.import_module("baircondor.meta")
 
 
 @pytest.fixture
@@ -77,3 +81,104 @@ def test_mode_values(run_dir, repo_dir):
 def test_command_stored_as_list(run_dir, repo_dir):
     meta = _load_meta(run_dir, repo_dir, command=["python", "train.py", "--lr", "1e-3"])
     assert meta["command"] == ["python", "train.py", "--lr", "1e-3"]
+
+
+# ── git info cache ────────────────────────────────────────────────────────────
+
+CACHED = {"cache_ttl": 60}
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    d = tmp_path / "gitrepo"
+    d.mkdir()
+    env = ["-c", "user.name=t", "-c", "user.email=t@example.com"]
+    subprocess.run(["git", "init", "-q", str(d)], check=True)
+    (d / "a.txt").write_text("a\n")
+    subprocess.run(["git", "-C", str(d), "add", "a.txt"], check=True)
+    subprocess.run(["git", "-C", str(d), *env, "commit", "-qm", "init"], check=True)
+    return d
+
+
+def _forbid_subprocess(monkeypatch):
+    def boom(*args, **kwargs):
+        raise AssertionError("git should not have been run")
+
+    monkeypatch.setattr(meta.subprocess, "check_output", boom)
+    monkeypatch.setattr(meta.subprocess, "run", boom)
+
+
+def test_git_info_reads_repo(git_repo):
+    info = _git_info(git_repo)
+    assert info["is_repo"] is True
+    assert len(info["commit"]) == 40
+    assert info["dirty"] is False
+
+
+def test_git_info_non_repo_needs_no_subprocess(tmp_path, monkeypatch):
+    _forbid_subprocess(monkeypatch)
+    assert _git_info(tmp_path) == {"is_repo": False}
+
+
+def test_git_info_cached_for_unchanged_tree(git_repo, monkeypatch):
+    first = _git_info(git_repo, CACHED)
+    _forbid_subprocess(monkeypatch)
+    assert _git_info(git_repo, CACHED) == first
+
+
+def test_git_info_cache_invalidated_by_commit(git_repo):
+    first = _git_info(git_repo, CACHED)
+    (git_repo / "a.txt").write_text("b\n")
+    env = ["-c", "user.name=t", "-c", "user.email=t@example.com"]
+    subprocess.run(["git", "-C", str(git_repo), *env, "commit", "-qam", "next"], check=True)
+    assert _git_info(git_repo, CACHED)["commit"] != first["commit"]
+
+
+def test_git_info_cache_invalidated_by_new_top_level_file(git_repo):
+    assert _git_info(git_repo, CACHED)["dirty"] is False
+    (git_repo / "new.txt").write_text("x\n")
+    assert _git_info(git_repo, CACHED)["dirty"] is True
+
+
+def test_git_info_is_not_cached_by_default(git_repo, monkeypatch):
+    calls = []
+    real_check_output = subprocess.check_output
+
+    def counting(cmd, **kwargs):
+        calls.append(cmd)
+        return real_check_output(cmd, **kwargs)
+
+    monkeypatch.setattr(meta.subprocess, "check_output", counting)
+    _git_info(git_repo)
+    _git_info(git_repo)
+    assert len(calls) == 4  # rev-parse HEAD and --abbrev-ref, twice
+
+
+def test_default_git_info_sees_edits_to_tracked_files(git_repo):
+    assert _git_info(git_repo)["dirty"] is False
+    (git_repo / "a.txt").write_text("edited\n")
+    assert _git_info(git_repo)["dirty"] is True
+
+
+def test_git_info_can_skip_untracked(git_repo):
+    (git_repo / "untracked.bin").write_text("data\n")
+    assert _git_info(git_repo)["dirty"] is True
+    info = _git_info(git_repo, {"untracked": False})
+    assert info["dirty"] is False
+    assert info["untracked_checked"] is False
+
+
+def test_git_status_timeout_falls_back_to_tracked_only(git_repo, monkeypatch):
+    (git_repo / "untracked.bin").write_text("data\n")
+    real_run = subprocess.run
+
+    def slow_untracked_status(cmd, **kwargs):
+        if cmd[:2] == ["git", "status"] and "--untracked-files=no" not in cmd:
+            raise subprocess.TimeoutExpired(cmd, kwargs.get("timeout"))
+        return real_run(cmd, **kwargs)
+
+    monkeypatch.setattr(meta.subprocess, "run", slow_untracked_status)
+    info = _git_info(git_repo, {"status_timeout": 0.01, "cache_ttl": 0})
+    assert info["is_repo"] is True
+    assert info["dirty"] is False
+    assert info["untracked_checked"] is False
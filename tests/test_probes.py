@@ -0,0 +1,29 @@
+"""Tests for the concurrent probe runner."""
+
+import time
+
+import pytest
+
+from baircondor.probes import run_probes
+
+
+def test_returns_results_by_name():
+    assert run_probes({"a": lambda: 1, "b": lambda: "two"}) == {"a": 1, "b": "two"}
+
+
+def test_probes_run_concurrently():
+    start = time.monotonic()
+    run_probes({name: (lambda: time.sleep(0.2)) for name in ("host", "conda", "git")})
+    assert time.monotonic() - start < 0.5
+
+
+def test_single_probe_runs_inline():
+    assert run_probes({"only": lambda: 42}) == {"only": 42}
+
+
+def test_exception_propagates():
+    def boom():
+        raise RuntimeError("probe failed")
+
+    with pytest.raises(RuntimeError, match="probe failed"):
+        run_probes({"ok": lambda: 1, "bad": boom})
@@ -1,6 +1,11 @@
 """Tests for run directory naming and creation."""
 
-from baircondor.submit import _make_run_dir
+import importlib
+import os
+
+import pytest
+
+from baircondor.submit import _make_run_dir, _new_run_dir, _run_id, _stage_run_dir
 
 
 def test_run_dir_structure(tmp_path):
@@ -44,3 +49,80 @@ def test_run_dir_is_unique(tmp_path):
 def test_run_dir_tag_is_appended(tmp_path):
     run_dir = _make_run_dir(str(tmp_path), "condor-runs", "myjob", None, "experiment-a")
     assert run_dir.name.endswith("_experiment-a")
+
+
+# ── _stage_run_dir ────────────────────────────────────────────────────────────
+
+
+def test_stage_run_dir_writes_all_files(tmp_path):
+    run_dir = tmp_path / "run"
+    _stage_run_dir(run_dir, {"run.sh": ("#!/bin/bash\n", 0o777), "meta.json": ("{}\n", 0o666)})
+    assert (run_dir / "run.sh").read_text() == "#!/bin/bash\n"
+    assert (run_dir / "meta.json").read_text() == "{}\n"
+    assert os.access(run_dir / "run.sh", os.X_OK)
+    assert not os.access(run_dir / "meta.json", os.X_OK)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["run"]
+
+
+def test_stage_run_dir_failure_leaves_nothing_behind(tmp_path):
+    run_dir = tmp_path / "run"
+    with pytest.raises(TypeError):
+        _stage_run_dir(run_dir, {"run.sh": ("ok\n", 0o777), "bad": (None, 0o666)})
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stage_run_dir_refuses_existing_run_dir(tmp_path):
+    run_dir = tmp_path / "run"
+    run_dir.mkdir()
+    (run_dir / "job.sub").write_text("old\n")
+    with pytest.raises(OSError):
+        _stage_run_dir(run_dir, {"job.sub": ("new\n", 0o666)})
+    assert (run_dir / "job.sub").read_text() == "old\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["run"]
+
+
+# ── run ids ───────────────────────────────────────────────────────────────────
+
+
+def _ids_in_child(conn, n):
+    conn.send([_run_id() for _ in range(n)])
+    conn.close()
+
+
+def test_run_ids_sortable_and_unique_across_processes():
+    import multiprocessing
+
+    ctx = multiprocessing.get_context("fork")
+    pipes, procs = [], []
+    for _ in range(4):
+        parent, child = ctx.Pipe()
+        proc = ctx.Process(target=_ids_in_child, args=(child, 500))
+        proc.start()
+        pipes.append(parent)
+        procs.append(proc)
+    batches = [p.recv() for p in pipes]
+    for proc in procs:
+        proc.join()
+
+    all_ids = [i for batch in batches for i in batch]
+    assert len(set(all_ids)) == len(all_ids)
+    for batch in batches:
+        assert batch == sorted(batch)  # monotonic within a process
+
+
+def test_new_run_dir_retries_on_collision(tmp_path, monkeypatch):
+    submit_mod = importlib.import_module("baircondor.submit")
+    taken = tmp_path / "runs" / "taken"
+    taken.mkdir(parents=True)
+    names = iter([taken, taken, tmp_path / "runs" / "free"])
+    monkeypatch.setattr(submit_mod, "_make_run_dir", lambda *a: next(names))
+    job = {"scratch": "", "runs_subdir": "", "jobname": "", "project": None}
+    assert _new_run_dir(job, None) == tmp_path / "runs" / "free"
+    assert (tmp_path / "runs" / "free").is_dir()
+
+
+def test_stage_run_dir_replaces_claimed_empty_dir(tmp_path):
+    run_dir = tmp_path / "run"
+    run_dir.mkdir()
+    _stage_run_dir(run_dir, {"meta.json": ("{}\n", 0o666)})
+    assert (run_dir / "meta.json").read_text() == "{}\n"
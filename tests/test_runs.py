@@ -0,0 +1,132 @@
+"""Tests for the scratch run-dir indexer behind `baircondor runs`."""
+
+import json
+import os
+import sys
+
+import pytest
+
+from baircondor import runs
+from baircondor.runs import scan
+
+OLD = 1_700_000_000  # an mtime safely outside the racy window
+
+
+def _make_run(root, *parts, timestamp="2026-05-15T12:00:00+00:00", jobname=None):
+    run_dir = root.joinpath(*parts)
+    run_dir.mkdir(parents=True)
+    meta = {
+        "user": parts[0],
+        "timestamp": timestamp,
+        "jobname": jobname or parts[-2],
+        "mode": "batch",
+        "command": ["python", "train.py"],
+        "hostname": "submit1",
+        "git": {"commit": "abc123"},
+    }
+    (run_dir / "meta.json").write_text(json.dumps(meta))
+    return run_dir
+
+
+def _age(root, when=OLD):
+    """Backdate every directory so the index trusts its mtime."""
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, (when, when))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "condor-runs"
+    _make_run(root, "alice", "train", "20260515_120000_000001_aaaa00")
+    _make_run(root, "alice", "eegfm", "pretrain", "20260516_120000_000001_aaaa00",
+              timestamp="2026-05-16T12:00:00+00:00")  # fmt: skip
+    _make_run(root, "bob", "train", "20260514_120000_000001_bbbb00")
+    _age(root)
+    return root
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Record which run dirs had their meta.json read."""
+    seen = []
+    record = runs._record
+
+    def counting(run_dir, root, mtime):
+        seen.append(run_dir.name)
+        return record(run_dir, root, mtime)
+
+    monkeypatch.setattr(runs, "_record", counting)
+    return seen
+
+
+def test_scan_finds_runs_with_and_without_project(tree):
+    found = scan(tree, user="alice")
+    assert [(r["project"], r["jobname"]) for r in found] == [("eegfm", "pretrain"), (None, "train")]
+    assert found[1]["commit"] == "abc123"
+    assert found[1]["user"] == "alice"
+    assert {r["user"] for r in scan(tree)} == {"alice", "bob"}
+
+
+def test_rescan_of_unchanged_tree_reads_no_meta(tree, reads):
+    scan(tree, user="alice")
+    assert len(reads) == 2
+    reads.clear()
+    assert len(scan(tree, user="alice")) == 2
+    assert reads == []
+
+
+def test_rescan_reads_only_new_runs(tree, reads):
+    scan(tree, user="alice")
+    reads.clear()
+    new = _make_run(
+        tree, "alice", "train", "20260517_120000_000001_aaaa00", timestamp="2026-05-17T12:00:00Z"
+    )
+    for d in (new, new.parent):
+        os.utime(d, (OLD + 60, OLD + 60))
+    found = scan(tree, user="alice")
+    assert reads == ["20260517_120000_000001_aaaa00"]
+    assert found[0]["run_dir"].endswith("20260517_120000_000001_aaaa00")
+
+
+def test_deleted_runs_drop_out(tree):
+    import shutil
+
+    assert len(scan(tree, user="alice")) == 2
+    shutil.rmtree(tree / "alice" / "eegfm")
+    _age(tree, OLD + 60)
+    assert [r["jobname"] for r in scan(tree, user="alice")] == ["train"]
+
+
+def test_recently_modified_runs_are_rechecked(tree, reads):
+    # just now: inside the racy window
+    os.utime(tree / "alice" / "train" / "20260515_120000_000001_aaaa00", None)
+    scan(tree, user="alice")
+    reads.clear()
+    scan(tree, user="alice")
+    assert reads == ["20260515_120000_000001_aaaa00"]
+
+
+def test_corrupt_meta_is_still_a_run(tmp_path):
+    run_dir = tmp_path / "alice" / "job" / "20260515_120000_000001_aaaa00"
+    run_dir.mkdir(parents=True)
+    (run_dir / "meta.json").write_text("{not json")
+    [record] = scan(tmp_path)
+    assert (record["user"], record["jobname"], record["command"]) == ("alice", "job", [])
+
+
+def test_missing_root_is_empty(tmp_path):
+    assert scan(tmp_path / "nope") == []
+
+
+def test_runs_cli_paths(tree, monkeypatch, capsys):
+    from baircondor import cli
+
+    monkeypatch.setattr(cli, "get_user", lambda: "alice")
+    monkeypatch.setattr(
+        sys, "argv", ["baircondor", "runs", "--paths", "--scratch", str(tree.parent),
+                      "--runs-subdir", tree.name, "--project", "eegfm"],
+    )  # fmt: skip
+    cli.main()
+    assert capsys.readouterr().out.split() == [
+        str(tree / "alice" / "eegfm" / "pretrain" / "20260516_120000_000001_aaaa00")
+    ]
@@ -0,0 +1,108 @@
+"""Tests for content-addressed repo snapshots (snapshot.py and submit --snapshot)."""
+
+import json
+import os
+import subprocess
+
+import pytest
+
+from baircondor import snapshot as snapshot_mod
+from baircondor.api import submit, submit_many
+from baircondor.snapshot import snapshot
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "pkg").mkdir(parents=True)
+    (repo / "train.py").write_text("print('v1')\n")
+    (repo / "pkg" / "run.sh").write_text("#!/bin/sh\n")
+    (repo / "pkg" / "run.sh").chmod(0o755)
+    os.symlink("train.py", repo / "latest.py")
+    _git(repo, "init", "-q")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-qm", "init")
+    return repo
+
+
+def _files(tree):
+    return sorted(str(p.relative_to(tree)) for p in tree.rglob("*") if not p.is_dir())
+
+
+def test_snapshot_has_tracked_files_as_in_the_worktree(repo, tmp_path):
+    (repo / "train.py").write_text("print('edited')\n")  # unstaged edits are included
+    (repo / "scratch.txt").write_text("untracked\n")  # untracked files are not
+    info = snapshot(repo / "pkg", tmp_path / "store")
+
+    tree = tmp_path / "store" / "trees" / info["id"]
+    assert info["tree"] == str(tree) and info["initialdir"] == str(tree / "pkg")
+    assert _files(tree) == ["latest.py", "pkg/run.sh", "train.py"]
+    assert (tree / "train.py").read_text() == "print('edited')\n"
+    assert os.readlink(tree / "latest.py") == "train.py"
+    assert os.access(tree / "pkg" / "run.sh", os.X_OK)
+    assert not os.access(tree / "train.py", os.X_OK)
+
+
+def test_unchanged_checkout_reuses_its_tree(repo, tmp_path, monkeypatch):
+    first = snapshot(repo, tmp_path / "store")
+    monkeypatch.setattr(snapshot_mod, "_materialize", lambda *a: pytest.fail("rebuilt"))
+    assert snapshot(repo, tmp_path / "store") == first
+
+
+def test_edit_makes_a_new_tree_sharing_unchanged_blobs(repo, tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_mod._Linker, "_reflink", lambda *a: False)  # hardlink
+    store = tmp_path / "store"
+    before = snapshot(repo, store)
+    (repo / "train.py").write_text("print('v2')\n")
+    after = snapshot(repo, store)
+
+    old, new = store / "trees" / before["id"], store / "trees" / after["id"]
+    assert before["id"] != after["id"]
+    assert (old / "train.py").read_text() == "print('v1')\n"  # queued jobs keep v1
+    assert (new / "train.py").read_text() == "print('v2')\n"
+    assert os.path.samefile(old / "pkg" / "run.sh", new / "pkg" / "run.sh")
+    blobs = [p for p in (store / "objects").rglob("*") if p.is_file()]
+    assert len(blobs) == 3  # run.sh plus both versions of train.py
+
+
+def test_stored_objects_are_read_only(repo, tmp_path):
+    snapshot(repo, tmp_path / "store")
+    for p in (tmp_path / "store" / "objects").rglob("*"):
+        if p.is_file():
+            assert not p.stat().st_mode & 0o222
+
+
+def test_not_a_checkout(tmp_path):
+    with pytest.raises(ValueError, match="not inside a git checkout"):
+        snapshot(tmp_path, tmp_path / "store")
+
+
+def test_sweep_runs_every_task_from_one_snapshot(repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(repo)
+    scratch = str(tmp_path / "scratch")
+    run_dirs = submit_many(
+        [["python", "train.py"]] * 3, gpus=0, scratch=scratch, snapshot=True, dry_run=True
+    )
+    trees = {json.loads((d / "meta.json").read_text())["snapshot"]["tree"] for d in run_dirs}
+    (tree,) = trees
+    assert f"initialdir = {tree}\n" in (run_dirs[0] / "sweep.sub").read_text()
+    assert f"initialdir = {tree}\n" in (run_dirs[1] / "job.sub").read_text()
+    assert f"export BAIRCONDOR_SNAPSHOT_DIR={tree}\n" in (run_dirs[2] / "run.sh").read_text()
+    assert json.loads((run_dirs[0] / "meta.json").read_text())["repo_dir"] == str(repo)
+
+
+def test_submit_without_snapshot_uses_the_live_checkout(repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(repo)
+    run_dir = submit(["python", "train.py"], gpus=0, scratch=str(tmp_path), dry_run=True)
+    assert f"initialdir = {repo}\n" in (run_dir / "job.sub").read_text()
+    assert "snapshot" not in json.loads((run_dir / "meta.json").read_text())
+    assert not list(tmp_path.glob("condor-runs/*/.snapshots"))
@@ -0,0 +1,65 @@
+"""Tests for following many runs' stdout/stderr."""
+
+import io
+import threading
+import time
+
+import pytest
+
+from baircondor import tail
+from baircondor.tail import follow
+
+
+def _follow_in_thread(run_dirs, **kwargs):
+    out = io.StringIO()
+    done = threading.Event()
+    t = threading.Thread(
+        target=follow, args=(run_dirs,), kwargs={"out": out, "stop": done.is_set, **kwargs}
+    )
+    t.start()
+    return out, done, t
+
+
+def _wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_interleaves_runs_and_picks_up_new_files(tmp_path, monkeypatch, use_inotify):
+    monkeypatch.setattr(tail, "POLL", 0.05)
+    a, b = tmp_path / "run_a", tmp_path / "run_b"
+    a.mkdir()
+    b.mkdir()
+    (a / "stdout.txt").write_text("old line\n")
+
+    out, done, t = _follow_in_thread([a, b], use_inotify=use_inotify)
+    time.sleep(0.1)
+    with open(a / "stdout.txt", "a") as f:
+        f.write("epoch 1\nepo")
+    (b / "stderr.txt").write_text("warning: started\n")  # created after follow began
+    _wait_for(lambda: "warning" in out.getvalue() and "epoch 1" in out.getvalue())
+    with open(a / "stdout.txt", "a") as f:
+        f.write("ch 2\n")
+    _wait_for(lambda: "epoch 2" in out.getvalue())
+    done.set()
+    t.join()
+
+    lines = out.getvalue().splitlines()
+    assert "run_a out | epoch 1" in lines
+    assert "run_a out | epoch 2" in lines
+    assert "run_b err | warning: started" in lines
+    assert not any("old line" in line for line in lines)
+
+
+def test_from_start_and_truncation(tmp_path, monkeypatch):
+    monkeypatch.setattr(tail, "POLL", 0.05)
+    (tmp_path / "stdout.txt").write_text("first\n")
+    out, done, t = _follow_in_thread([tmp_path], from_start=True, use_inotify=False)
+    _wait_for(lambda: "first" in out.getvalue())
+    (tmp_path / "stdout.txt").write_text("new\n")  # rewritten from scratch
+    _wait_for(lambda: "new" in out.getvalue())
+    done.set()
+    t.join()
@@ -0,0 +1,115 @@
+"""Tests for the `baircondor top` polling loop."""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from baircondor import top
+from baircondor.history import append_entry, load_states
+
+
+@pytest.fixture
+def hfile(tmp_path, monkeypatch):
+    monkeypatch.setattr(top, "get_user", lambda: "alice")
+    path = tmp_path / "history.jsonl"
+    for cid in ("10", "11.0", "11.1"):
+        append_entry(Path(f"/tmp/{cid}"), "job", cid, 1, ["echo"], "alice", path)
+    return path
+
+
+def _fake_condor(monkeypatch, queue, history=()):
+    calls = []
+
+    def run(cmd, **kwargs):
+        calls.append(cmd)
+        lines = queue() if cmd[0] == "condor_q" else history
+        # -af prints exactly the requested attributes
+        width = len(cmd) - cmd.index("-af") - 1
+        stdout = "".join(" ".join(line.split()[:width]) + "\n" for line in lines)
+        return subprocess.CompletedProcess(cmd, 0, stdout=stdout, stderr="")
+
+    monkeypatch.setattr(subprocess, "run", run)
+    return calls
+
+
+def test_refresh_polls_active_jobs_in_one_query(hfile, monkeypatch):
+    queue = ["10 0 2 slot1_1@gpu3.example.com 1700000000 2097152 3600 2\n", "11 0 1\n", "11 1 1\n"]
+    calls = _fake_condor(monkeypatch, lambda: queue)
+    rows = top.seed(10, history_file=hfile)
+    calls.clear()
+
+    assert top.refresh(rows, history_file=hfile) is True  # host and usage are new
+    assert len(calls) == 1 and calls[0][0] == "condor_q"
+    assert rows["10"]["host"] == "gpu3"
+    assert rows["10"]["rss_kb"] == 2097152
+    assert rows["10"]["gpus"] == 2
+
+    assert top.refresh(rows, history_file=hfile) is False
+
+    queue[1] = "11 0 2 slot1@gpu4 1700000000 1024 10 1\n"
+    assert top.refresh(rows, history_file=hfile) is True
+    assert rows["11.0"]["status"] == "running"
+
+
+def test_jobs_leaving_the_queue_are_resolved_once(hfile, monkeypatch):
+    queue = ["10 0 2\n", "11 0 2\n", "11 1 2\n"]
+    history = ["11 1 4 0 1700000000\n"]
+    calls = _fake_condor(monkeypatch, lambda: queue, history)
+    rows = top.seed(10, history_file=hfile)
+
+    del queue[2]
+    calls.clear()
+    assert top.refresh(rows, history_file=hfile) is True
+    assert [c[0] for c in calls] == ["condor_q", "condor_history"]
+    assert rows["11.1"]["status"] == "done"
+    assert load_states(["/tmp/11.1"], hfile)["/tmp/11.1"]["status"] == "done"
+    assert sorted(top._active(rows)) == ["10", "11.0"]
+
+    calls.clear()
+    top.refresh(rows, history_file=hfile)
+    assert "member(ClusterId, {10, 11})" in calls[0]
+    assert len(calls) == 1
+
+
+def test_unresolved_jobs_are_looked_up_again(hfile, monkeypatch):
+    queue = ["10 0 2\n", "11 0 2\n", "11 1 2\n"]
+    _fake_condor(monkeypatch, lambda: queue)
+    rows = top.seed(10, history_file=hfile)
+    del queue[2]
+    real_run = subprocess.run
+
+    def history_down(cmd, **kwargs):
+        if cmd[0] == "condor_history":
+            return subprocess.CompletedProcess(cmd, 1, stdout="", stderr="timed out")
+        return real_run(cmd, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", history_down)
+    top.refresh(rows, history_file=hfile)
+    assert rows["11.1"]["status"] == "?"
+    assert "11.1" in top._active(rows)
+    assert "/tmp/11.1" not in load_states(["/tmp/11.1"], hfile)
+
+    calls = _fake_condor(monkeypatch, lambda: queue, ["11 1 4 0 1700000000\n"])
+    assert top.refresh(rows, history_file=hfile) is True
+    assert [c[0] for c in calls] == ["condor_q", "condor_history"]
+    assert rows["11.1"]["status"] == "done"
+    assert sorted(top._active(rows)) == ["10", "11.0"]
+
+
+def test_failed_query_keeps_rows(hfile, monkeypatch):
+    _fake_condor(monkeypatch, lambda: ["10 0 2\n", "11 0 2\n", "11 1 2\n"])
+    rows = top.seed(10, history_file=hfile)
+
+    def broken(cmd, **kwargs):
+        return subprocess.CompletedProcess(cmd, 1, stdout="", stderr="schedd down")
+
+    monkeypatch.setattr(subprocess, "run", broken)
+    assert top.refresh(rows, history_file=hfile) is False
+    assert len(top._active(rows)) == 3
+
+
+def test_render_handles_partial_rows(hfile, monkeypatch):
+    _fake_condor(monkeypatch, lambda: ["10 0 2 slot1@gpu1 1700000000 1024 5 1\n"])
+    table = top.render(top.seed(10, history_file=hfile), interval=2)
+    assert table.row_count == 3
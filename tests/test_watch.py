@@ -0,0 +1,71 @@
+"""Tests for waiting on runs via their condor.log event logs."""
+
+import threading
+import time
+
+import pytest
+
+from baircondor import watch
+from baircondor.watch import wait_for_runs
+
+SUBMIT = "000 (7.000.000) 2026-05-15 14:23:01 Job submitted from host: <10.0.0.1:9618>\n...\n"
+TERMINATE = (
+    "005 (7.000.000) 2026-05-15 16:00:00 Job terminated.\n"
+    "\t(1) Normal termination (return value {rv})\n...\n"
+)
+
+
+@pytest.fixture
+def runs(tmp_path):
+    dirs = []
+    for i in range(3):
+        d = tmp_path / f"run{i}"
+        d.mkdir()
+        (d / "condor.log").write_text(SUBMIT)
+        dirs.append(d)
+    return dirs
+
+
+def _finish_later(run_dir, rv, delay=0.1):
+    def finish():
+        time.sleep(delay)
+        with open(run_dir / "condor.log", "a") as f:
+            f.write(TERMINATE.format(rv=rv))
+
+    t = threading.Thread(target=finish)
+    t.start()
+    return t
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_waits_for_all_runs(runs, use_inotify, monkeypatch):
+    monkeypatch.setattr(watch, "POLL", 0.02)
+    (runs[0] / "condor.log").write_text(SUBMIT + TERMINATE.format(rv=0))
+    threads = [_finish_later(runs[1], 0), _finish_later(runs[2], 3, delay=0.2)]
+
+    start = time.monotonic()
+    states = wait_for_runs(runs, timeout=5, use_inotify=use_inotify)
+    for t in threads:
+        t.join()
+
+    assert time.monotonic() - start < 2
+    assert [states[d]["status"] for d in runs] == ["done", "done", "failed"]
+    assert states[runs[2]]["exit_code"] == 3
+
+
+def test_inotify_wakes_without_waiting_for_recheck(runs, monkeypatch):
+    if watch._Inotify.create() is None:
+        pytest.skip("inotify unavailable")
+    monkeypatch.setattr(watch, "RECHECK", 60)
+    t = _finish_later(runs[0], 0)
+    start = time.monotonic()
+    states = wait_for_runs(runs[:1], timeout=5)
+    t.join()
+    assert states[runs[0]]["status"] == "done"
+    assert time.monotonic() - start < 2
+
+
+def test_timeout_returns_current_states(runs, tmp_path):
+    missing = tmp_path / "never-submitted"
+    states = wait_for_runs([runs[0], missing], timeout=0.1, use_inotify=False)
+    assert states == {runs[0]: {"status": "idle"}, missing: {"status": "?"}}